@@ -0,0 +1,75 @@
+// Copyright © 2023 Apple Inc.
+
+#include <iostream>
+
+#include "mlx/mlx.h"
+#include "time_utils.h"
+
+using namespace mlx::core;
+
+// A chain of n scalar additions, the deepest graph with n arrays
+array chain(const array& x, int n) {
+  auto y = x;
+  for (int i = 0; i < n; ++i) {
+    y = add(y, x);
+  }
+  return y;
+}
+
+// A balanced tree of n scalar additions, a wide graph with n arrays
+array tree(const array& x, int n) {
+  std::vector<array> level(n / 2 + 1, x);
+  while (level.size() > 1) {
+    std::vector<array> next;
+    for (int i = 0; i + 1 < level.size(); i += 2) {
+      next.push_back(add(level[i], level[i + 1]));
+    }
+    if (level.size() % 2 == 1) {
+      next.push_back(level.back());
+    }
+    level = std::move(next);
+  }
+  return level[0];
+}
+
+template <typename F>
+void time_per_node(const std::string& msg, int n, F fn) {
+  int num_iters = std::max(1, 1000000 / n);
+  double total = 0;
+  for (int i = 0; i < num_iters; ++i) {
+    total += fn();
+  }
+  std::cout << "Timing (" << msg << ", " << n << " nodes) ... "
+            << std::setprecision(5) << 1e6 * total / num_iters / n
+            << " nsec per node" << std::endl;
+}
+
+void time_graph(const std::string& name, array (*make)(const array&, int)) {
+  auto x = array(1.0f);
+  for (int n : {10000, 100000, 1000000}) {
+    time_per_node(name + " eval", n, [&]() {
+      auto y = make(x, n);
+      auto start = time_now();
+      eval(y);
+      return milliseconds(time_now() - start);
+    });
+    time_per_node(name + " simplify", n, [&]() {
+      auto y = make(x, n);
+      auto start = time_now();
+      simplify(y);
+      return milliseconds(time_now() - start);
+    });
+    time_per_node(name + " vjp", n, [&]() {
+      auto start = time_now();
+      auto [out, dfdx] = vjp(
+          [&](array x) { return make(x, n); }, array(1.0f), array(1.0f));
+      return milliseconds(time_now() - start);
+    });
+  }
+}
+
+int main() {
+  std::cout << "Benchmarks for " << default_device() << std::endl;
+  time_graph("chain", chain);
+  time_graph("tree", tree);
+}
@@ -0,0 +1,53 @@
+// Copyright © 2023 Apple Inc.
+
+#include <iostream>
+
+#include "mlx/mlx.h"
+#include "time_utils.h"
+
+using namespace mlx::core;
+
+// Pin a CPU stream and the workers to the cores of a node
+void pin(const Stream& s, int node) {
+  auto cpus = get_numa_node_cpus(node);
+  set_stream_affinity(s, cpus);
+  set_thread_pool_affinity(cpus);
+}
+
+// The bandwidth in GB/s of an elementwise op on data written by threads
+// pinned to node src and read by threads pinned to node dst
+double bandwidth(int src, int dst, size_t size) {
+  auto s = new_stream(Device::cpu);
+  int n = size / sizeof(float);
+
+  // The pages are placed on the node of the threads which first write them
+  pin(s, src);
+  auto x = full({n}, 1.0f, s);
+  eval(x);
+
+  pin(s, dst);
+  int num_iters = 20;
+  double total = 0;
+  for (int i = 0; i < num_iters; ++i) {
+    auto y = multiply(x, x, s);
+    auto start = time_now();
+    eval(y);
+    total += milliseconds(time_now() - start);
+  }
+  // One read of x and one write of y
+  return 2.0 * size * num_iters / (total * 1e6);
+}
+
+int main() {
+  int n_nodes = get_num_numa_nodes();
+  size_t size = size_t(1) << 28;
+  std::cout << "Bandwidth in GB/s from the node of the data (rows) to the "
+            << "node of the threads (columns)" << std::endl;
+  for (int src = 0; src < n_nodes; ++src) {
+    for (int dst = 0; dst < n_nodes; ++dst) {
+      std::cout << std::setprecision(4) << bandwidth(src, dst, size) << "\t";
+    }
+    std::cout << std::endl;
+  }
+  set_thread_pool_affinity({});
+}
@@ -0,0 +1,75 @@
+// Copyright © 2023 Apple Inc.
+
+#include <iostream>
+
+#include "mlx/mlx.h"
+#include "mlx/scheduler.h"
+#include "time_utils.h"
+
+using namespace mlx::core;
+
+template <typename F>
+void time_per_task(const std::string& msg, int n, F fn) {
+  int num_iters = 20;
+  double total = 0;
+  for (int i = 0; i < num_iters; ++i) {
+    total += fn();
+  }
+  std::cout << "Timing (" << msg << ", " << n << " tasks) ... "
+            << std::setprecision(5) << 1e6 * total / num_iters / n
+            << " nsec per task" << std::endl;
+}
+
+// Submit n empty tasks to a stream one at a time, as eval did for every
+// primitive, or in a single batch and wait for them
+void time_submission(int n) {
+  auto s = new_stream(Device::cpu);
+  auto run = [s](bool batched, int n) {
+    std::promise<void> done;
+    auto task = [s]() {
+      scheduler::notify_new_task(s);
+      scheduler::notify_task_completion(s);
+    };
+    auto start = time_now();
+    if (batched) {
+      std::vector<std::function<void()>> tasks(n, task);
+      scheduler::enqueue_batch(s, std::move(tasks));
+    } else {
+      for (int i = 0; i < n; ++i) {
+        scheduler::enqueue(s, task);
+      }
+    }
+    scheduler::enqueue(s, [&done]() { done.set_value(); });
+    done.get_future().wait();
+    return milliseconds(time_now() - start);
+  };
+  time_per_task("one at a time", n, [&]() { return run(false, n); });
+  time_per_task("batched", n, [&]() { return run(true, n); });
+}
+
+// Evaluate a chain of n small elementwise ops
+void time_small_ops(const std::string& name, const Device& d, int n) {
+  auto x = ones({16});
+  eval(x);
+  time_per_task("small ops eval on " + name, n, [&]() {
+    auto y = x;
+    for (int i = 0; i < n; ++i) {
+      y = add(y, x, d);
+    }
+    auto start = time_now();
+    eval(y);
+    return milliseconds(time_now() - start);
+  });
+}
+
+int main() {
+  for (int n : {1000, 10000, 100000}) {
+    time_submission(n);
+  }
+  for (int n : {1000, 10000}) {
+    time_small_ops("cpu", Device::cpu, n);
+    if (metal::is_available()) {
+      time_small_ops("gpu", Device::gpu, n);
+    }
+  }
+}
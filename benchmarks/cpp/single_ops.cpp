@@ -114,6 +114,13 @@ void time_strided_ops() {
   b = transpose(b, {3, 2, 0, 1});
   eval(a, b);
   TIMEM("strided", add, a, b, device);
+  TIMEM("strided copy", astype, a, float16, device);
+
+  int K = 4096;
+  auto c = transpose(random::uniform({K, K}));
+  eval(c);
+  auto transpose_copy = [&]() { return reshape(c, {K * K}); };
+  TIME(transpose_copy);
 }
 
 void time_comparisons() {
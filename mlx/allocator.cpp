@@ -1,13 +1,87 @@
 // Copyright © 2023 Apple Inc.
 
+#include <unistd.h>
+#include <algorithm>
+#include <cstddef>
 #include <cstdlib>
 #include <sstream>
 
 #include "mlx/allocator.h"
+#include "mlx/backend/common/threading.h"
 #include "mlx/scheduler.h"
 
+namespace mlx::core {
+
+size_t get_active_memory() {
+  return allocator::allocator().get_active_memory();
+}
+
+size_t get_peak_memory() {
+  return allocator::allocator().get_peak_memory();
+}
+
+size_t get_cache_memory() {
+  return allocator::allocator().get_cache_memory();
+}
+
+size_t set_cache_limit(size_t limit) {
+  return allocator::allocator().set_cache_limit(limit);
+}
+
+void clear_cache() {
+  allocator::allocator().clear_cache();
+}
+
+} // namespace mlx::core
+
 namespace mlx::core::allocator {
 
+namespace {
+
+// The size of each block and the NUMA node it was allocated from are stored
+// right before the pointer handed out. The header is a multiple of the
+// alignment of std::malloc so the data stays aligned.
+struct BlockHeader {
+  size_t size;
+  int node;
+};
+constexpr size_t header_size =
+    (sizeof(BlockHeader) + alignof(std::max_align_t) - 1) /
+    alignof(std::max_align_t) * alignof(std::max_align_t);
+
+BlockHeader& block_header(void* block) {
+  return *static_cast<BlockHeader*>(block);
+}
+
+// Cached buffers are only reused by threads on the node they were allocated
+// from so that they stay in the local memory of the threads using them
+size_t bin_key(size_t size, int node) {
+  return size * 64 + std::min(node, 63);
+}
+
+// Round size up to one of four evenly spaced classes between consecutive
+// powers of two so that at most 25% of a buffer is wasted
+size_t size_class(size_t size) {
+  if (size <= 64) {
+    return std::max<size_t>(16, (size + 15) & ~size_t(15));
+  }
+  int log2 = 63 - __builtin_clzll(size - 1);
+  size_t step = size_t(1) << (log2 - 2);
+  return (size + step - 1) & ~(step - 1);
+}
+
+size_t default_cache_limit() {
+  // A quarter of the physical memory
+  long pages = sysconf(_SC_PHYS_PAGES);
+  long page_size = sysconf(_SC_PAGE_SIZE);
+  if (pages <= 0 || page_size <= 0) {
+    return size_t(1) << 30;
+  }
+  return static_cast<size_t>(pages) * page_size / 4;
+}
+
+} // namespace
+
 Buffer malloc(size_t size) {
   auto buffer = allocator().malloc(size);
   if (size && !buffer.ptr()) {
@@ -22,12 +96,101 @@ void free(Buffer buffer) {
   return allocator().free(buffer);
 }
 
+CommonAllocator::CommonAllocator()
+    : active_memory_(0),
+      peak_memory_(0),
+      cache_memory_(0),
+      cache_limit_(default_cache_limit()) {}
+
 Buffer CommonAllocator::malloc(size_t size) {
-  return Buffer{std::malloc(size)};
+  size = size_class(size);
+  int node = threading::current_numa_node();
+
+  std::unique_lock<std::mutex> lk(mtx_);
+  char* block = nullptr;
+  if (auto it = bins_.find(bin_key(size, node));
+      it != bins_.end() && !it->second.empty()) {
+    // Reuse the most recently freed buffer of this size class
+    auto block_it = it->second.back();
+    it->second.pop_back();
+    block = static_cast<char*>(block_it->second);
+    lru_.erase(block_it);
+    cache_memory_ -= size;
+  } else {
+    lk.unlock();
+    block = static_cast<char*>(std::malloc(size + header_size));
+    if (block == nullptr) {
+      // Give the cached buffers back and try again
+      clear_cache();
+      block = static_cast<char*>(std::malloc(size + header_size));
+      if (block == nullptr) {
+        return Buffer{nullptr};
+      }
+    }
+    block_header(block) = {size, node};
+    lk.lock();
+  }
+  active_memory_ += size;
+  peak_memory_ = std::max(peak_memory_, active_memory_);
+  return Buffer{block + header_size};
 }
 
 void CommonAllocator::free(Buffer buffer) {
-  std::free(buffer.raw_ptr());
+  if (buffer.ptr() == nullptr) {
+    return;
+  }
+  char* block = static_cast<char*>(buffer.ptr()) - header_size;
+  auto [size, node] = block_header(block);
+
+  std::lock_guard<std::mutex> lk(mtx_);
+  active_memory_ -= size;
+  if (size > cache_limit_) {
+    std::free(block);
+    return;
+  }
+  release_cached_buffers(cache_limit_ - size);
+  auto key = bin_key(size, node);
+  lru_.emplace_back(key, block);
+  bins_[key].push_back(std::prev(lru_.end()));
+  cache_memory_ += size;
+}
+
+void CommonAllocator::release_cached_buffers(size_t max_size) {
+  while (cache_memory_ > max_size) {
+    // The least recently freed buffer is also the oldest of its bin
+    auto [key, block] = lru_.front();
+    bins_[key].pop_front();
+    lru_.pop_front();
+    cache_memory_ -= block_header(block).size;
+    std::free(block);
+  }
+}
+
+size_t CommonAllocator::get_active_memory() {
+  std::lock_guard<std::mutex> lk(mtx_);
+  return active_memory_;
+}
+
+size_t CommonAllocator::get_peak_memory() {
+  std::lock_guard<std::mutex> lk(mtx_);
+  return peak_memory_;
+}
+
+size_t CommonAllocator::get_cache_memory() {
+  std::lock_guard<std::mutex> lk(mtx_);
+  return cache_memory_;
+}
+
+size_t CommonAllocator::set_cache_limit(size_t limit) {
+  std::lock_guard<std::mutex> lk(mtx_);
+  std::swap(limit, cache_limit_);
+  release_cached_buffers(cache_limit_);
+  return limit;
+}
+
+void CommonAllocator::clear_cache() {
+  std::lock_guard<std::mutex> lk(mtx_);
+  release_cached_buffers(0);
 }
 
 Buffer malloc_or_wait(size_t size) {
@@ -3,6 +3,36 @@
 #pragma once
 
 #include <cstdlib>
+#include <deque>
+#include <list>
+#include <mutex>
+#include <unordered_map>
+
+namespace mlx::core {
+
+/**
+ * Get the memory in bytes held by the buffers of live arrays. Buffers kept
+ * in the cache are not included.
+ */
+size_t get_active_memory();
+
+/** Get the largest active memory in bytes since the start of the program. */
+size_t get_peak_memory();
+
+/** Get the memory in bytes held by the cache of freed buffers. */
+size_t get_cache_memory();
+
+/**
+ * Set the maximum memory in bytes that the cache of freed buffers may hold.
+ * Least recently freed buffers are released when the limit is exceeded and a
+ * limit of 0 disables the cache. Returns the previous limit.
+ */
+size_t set_cache_limit(size_t limit);
+
+/** Release all the buffers held by the cache. */
+void clear_cache();
+
+} // namespace mlx::core
 
 namespace mlx::core::allocator {
 
@@ -42,6 +72,12 @@ class Allocator {
   virtual Buffer malloc(size_t size) = 0;
   virtual void free(Buffer buffer) = 0;
 
+  virtual size_t get_active_memory() = 0;
+  virtual size_t get_peak_memory() = 0;
+  virtual size_t get_cache_memory() = 0;
+  virtual size_t set_cache_limit(size_t limit) = 0;
+  virtual void clear_cache() = 0;
+
   Allocator() = default;
   Allocator(const Allocator& other) = delete;
   Allocator(Allocator&& other) = delete;
@@ -53,14 +89,41 @@ class Allocator {
 Allocator& allocator();
 
 class CommonAllocator : public Allocator {
-  /** A general CPU allocator. */
+  /**
+   * A general CPU allocator. Sizes are rounded up to size classes and freed
+   * buffers are kept in a cache to be reused by allocations of the same
+   * class.
+   */
  public:
   virtual Buffer malloc(size_t size) override;
   virtual void free(Buffer buffer) override;
 
+  virtual size_t get_active_memory() override;
+  virtual size_t get_peak_memory() override;
+  virtual size_t get_cache_memory() override;
+  virtual size_t set_cache_limit(size_t limit) override;
+  virtual void clear_cache() override;
+
  private:
-  CommonAllocator() = default;
+  CommonAllocator();
   friend Allocator& allocator();
+
+  // Release the least recently freed buffers until the cache holds at most
+  // max_size bytes. Must be called with the mutex held.
+  void release_cached_buffers(size_t max_size);
+
+  std::mutex mtx_;
+
+  // The cached buffers ordered from least to most recently freed and indexed
+  // by size class and NUMA node
+  using Block = std::pair<size_t, void*>;
+  std::list<Block> lru_;
+  std::unordered_map<size_t, std::deque<std::list<Block>::iterator>> bins_;
+
+  size_t active_memory_;
+  size_t peak_memory_;
+  size_t cache_memory_;
+  size_t cache_limit_;
 };
 
 } // namespace mlx::core::allocator
@@ -1,5 +1,6 @@
 // Copyright © 2023 Apple Inc.
 
+#include <atomic>
 #include <functional>
 
 #include "mlx/array.h"
@@ -21,8 +22,27 @@ std::pair<size_t, std::vector<size_t>> cum_prod(const std::vector<int>& shape) {
   return {cum_prod, strides};
 }
 
+std::atomic<int> max_pending_depth{0};
+std::atomic<size_t> auto_eval_count{0};
+
 } // namespace
 
+void set_max_pending_depth(int depth) {
+  if (depth < 0) {
+    throw std::invalid_argument(
+        "[set_max_pending_depth] The depth must be non-negative.");
+  }
+  max_pending_depth = depth;
+}
+
+int get_max_pending_depth() {
+  return max_pending_depth;
+}
+
+size_t get_auto_eval_count() {
+  return auto_eval_count;
+}
+
 array::array(const std::complex<float>& val, Dtype dtype /* = complex64 */)
     : array_desc_(std::make_shared<ArrayDesc>(std::vector<int>{}, dtype)) {
   auto cval = static_cast<complex64_t>(val);
@@ -32,13 +52,29 @@ array::array(const std::complex<float>& val, Dtype dtype /* = complex64 */)
 array::array(
     const std::vector<int>& shape,
     Dtype dtype,
-    std::unique_ptr<Primitive> primitive,
+    std::shared_ptr<Primitive> primitive,
     const std::vector<array>& inputs)
     : array_desc_(std::make_shared<ArrayDesc>(
           shape,
           dtype,
           std::move(primitive),
-          inputs)) {}
+          inputs)) {
+  // Evaluate the inputs once the graph is too deep. Tracers are only
+  // evaluated by the transforms.
+  int max_depth = max_pending_depth;
+  if (max_depth > 0 && array_desc_->depth > max_depth &&
+      !array_desc_->is_tracer) {
+    std::vector<array> pending;
+    for (auto& in : inputs) {
+      if (!in.is_evaled() && !in.is_pending()) {
+        pending.push_back(in);
+      }
+    }
+    mlx::core::eval(pending);
+    array_desc_->depth = 1;
+    auto_eval_count++;
+  }
+}
 
 array::array(std::initializer_list<float> data)
     : array_desc_(std::make_shared<ArrayDesc>(
@@ -108,6 +144,14 @@ void array::copy_shared_buffer(const array& other) {
   copy_shared_buffer(other, other.strides(), other.flags(), other.data_size());
 }
 
+void array::move_shared_buffer(array other) {
+  array_desc_->data = std::move(other.array_desc_->data);
+  array_desc_->strides = other.strides();
+  array_desc_->flags = other.flags();
+  array_desc_->data_size = other.data_size();
+  array_desc_->data_ptr = other.array_desc_->data_ptr;
+}
+
 array::ArrayDesc::ArrayDesc(const std::vector<int>& shape, Dtype dtype)
     : shape(shape), dtype(dtype) {
   std::tie(size, strides) = cum_prod(shape);
@@ -116,21 +160,45 @@ array::ArrayDesc::ArrayDesc(const std::vector<int>& shape, Dtype dtype)
 array::ArrayDesc::ArrayDesc(
     const std::vector<int>& shape,
     Dtype dtype,
-    std::unique_ptr<Primitive> primitive,
+    std::shared_ptr<Primitive> primitive,
     const std::vector<array>& inputs)
     : shape(shape),
       dtype(dtype),
       primitive(std::move(primitive)),
       inputs(inputs) {
   std::tie(size, strides) = cum_prod(shape);
+  // Placeholders without a primitive can not be evaluated
+  depth = this->primitive ? 1 : -1;
   for (auto& in : inputs) {
     is_tracer |= in.is_tracer();
+    if (depth < 0 || in.is_evaled() || in.is_pending()) {
+      continue;
+    }
+    int in_depth = in.array_desc_->depth;
+    depth = in_depth < 0 ? -1 : std::max(depth, in_depth + 1);
   }
 }
 
 // Needed because the Primitive type used in array.h is incomplete and the
 // compiler needs to see the call to the desctructor after the type is complete.
-array::ArrayDesc::~ArrayDesc() = default;
+array::ArrayDesc::~ArrayDesc() {
+  // Release the graph iteratively so that destroying a deep graph does not
+  // recurse once per array and overflow the stack
+  std::vector<std::shared_ptr<ArrayDesc>> for_deletion;
+  auto release_inputs = [&for_deletion](std::vector<array>& inputs) {
+    for (auto& in : inputs) {
+      if (in.array_desc_.use_count() == 1) {
+        for_deletion.push_back(std::move(in.array_desc_));
+      }
+    }
+  };
+  release_inputs(inputs);
+  while (!for_deletion.empty()) {
+    auto desc = std::move(for_deletion.back());
+    for_deletion.pop_back();
+    release_inputs(desc->inputs);
+  }
+}
 
 array::ArrayIterator::reference array::ArrayIterator::operator*() const {
   auto start = std::vector<int>(arr.ndim(), 0);
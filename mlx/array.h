@@ -4,6 +4,7 @@
 #include <algorithm>
 #include <cstdint>
 #include <functional>
+#include <future>
 #include <memory>
 #include <vector>
 
@@ -174,7 +175,7 @@ class array {
   array(
       const std::vector<int>& shape,
       Dtype dtype,
-      std::unique_ptr<Primitive> primitive,
+      std::shared_ptr<Primitive> primitive,
       const std::vector<array>& inputs);
 
   /** A unique identifier for an array. */
@@ -209,6 +210,11 @@ class array {
     return *(array_desc_->primitive);
   };
 
+  /** A shared pointer to the array's primitive. */
+  std::shared_ptr<Primitive>& primitive_ptr() const {
+    return array_desc_->primitive;
+  };
+
   /** Check if the array has an attached primitive or is a leaf node. */
   bool has_primitive() const {
     return array_desc_->primitive != nullptr;
@@ -257,7 +263,32 @@ class array {
 
   // Check if the array has been evaluated
   bool is_evaled() const {
-    return array_desc_->data != nullptr;
+    return !is_pending() && array_desc_->data != nullptr;
+  }
+
+  // Check if the array's buffer can be reused by the output of a primitive.
+  // This is the case when the graph holds the only reference to the array
+  // and no other array shares its buffer.
+  bool is_donatable() const {
+    return array_desc_.use_count() == 1 &&
+        (array_desc_->data.use_count() == 1);
+  }
+
+  // Set the event which is signaled once an asynchronous eval has computed
+  // the array
+  void set_event(std::shared_future<void> event) {
+    array_desc_->event = std::move(event);
+  }
+
+  // Check if the array is being computed by an asynchronous eval
+  bool is_pending() const {
+    auto& event = array_desc_->event;
+    return event.valid() &&
+        event.wait_for(std::chrono::seconds(0)) != std::future_status::ready;
+  }
+
+  const std::shared_future<void>& event() const {
+    return array_desc_->event;
   }
 
   // Mark the array as a tracer array (true) or not.
@@ -287,6 +318,8 @@ class array {
 
   void copy_shared_buffer(const array& other);
 
+  void move_shared_buffer(array other);
+
   void overwrite_descriptor(const array& other) {
     array_desc_ = other.array_desc_;
   }
@@ -301,7 +334,7 @@ class array {
     std::vector<size_t> strides;
     size_t size;
     Dtype dtype;
-    std::unique_ptr<Primitive> primitive{nullptr};
+    std::shared_ptr<Primitive> primitive{nullptr};
 
     // Indicates an array is being used in a graph transform
     // and should not be detached from the graph
@@ -322,6 +355,13 @@ class array {
     // Contains useful meta data about the array
     Flags flags;
 
+    // Signaled when an asynchronous eval has computed the array
+    std::shared_future<void> event;
+
+    // The depth of the part of the graph which is not evaluated or -1 if it
+    // contains arrays which can not be evaluated
+    int depth{0};
+
     std::vector<array> inputs;
 
     explicit ArrayDesc(const std::vector<int>& shape, Dtype dtype);
@@ -329,7 +369,7 @@ class array {
     explicit ArrayDesc(
         const std::vector<int>& shape,
         Dtype dtype,
-        std::unique_ptr<Primitive> primitive,
+        std::shared_ptr<Primitive> primitive,
         const std::vector<array>& inputs);
 
     ~ArrayDesc();
@@ -27,8 +27,12 @@ DEFAULT(ArgSort)
 DEFAULT(AsStrided)
 DEFAULT(Broadcast)
 DEFAULT(Ceil)
+DEFAULT(Checkpoint)
+DEFAULT(Compiled)
 DEFAULT(Concatenate)
 DEFAULT(Copy)
+DEFAULT(CustomTransforms)
+DEFAULT(Depends)
 DEFAULT(Equal)
 DEFAULT(Erf)
 DEFAULT(ErfInv)
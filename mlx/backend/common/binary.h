@@ -4,6 +4,7 @@
 
 #include "mlx/allocator.h"
 #include "mlx/array.h"
+#include "mlx/backend/common/threading.h"
 #include "mlx/backend/common/utils.h"
 
 namespace mlx::core {
@@ -41,25 +42,49 @@ void set_binary_op_output_data(
     const array& b,
     array& out,
     BinaryOpType bopt) {
+  // Write the output in place of an input that is not used anywhere else
+  auto donatable = [&out](const array& in) {
+    return in.is_donatable() && in.itemsize() == out.itemsize();
+  };
   switch (bopt) {
     case ScalarScalar:
       out.set_data(
           allocator::malloc_or_wait(out.itemsize()), 1, a.strides(), a.flags());
       break;
     case ScalarVector:
-      out.set_data(
-          allocator::malloc_or_wait(b.data_size() * out.itemsize()),
-          b.data_size(),
-          b.strides(),
-          b.flags());
+      if (donatable(b)) {
+        out.move_shared_buffer(b);
+      } else {
+        out.set_data(
+            allocator::malloc_or_wait(b.data_size() * out.itemsize()),
+            b.data_size(),
+            b.strides(),
+            b.flags());
+      }
       break;
     case VectorScalar:
+      if (donatable(a)) {
+        out.move_shared_buffer(a);
+      } else {
+        out.set_data(
+            allocator::malloc_or_wait(a.data_size() * out.itemsize()),
+            a.data_size(),
+            a.strides(),
+            a.flags());
+      }
+      break;
     case VectorVector:
-      out.set_data(
-          allocator::malloc_or_wait(a.data_size() * out.itemsize()),
-          a.data_size(),
-          a.strides(),
-          a.flags());
+      if (donatable(a)) {
+        out.move_shared_buffer(a);
+      } else if (donatable(b)) {
+        out.move_shared_buffer(b);
+      } else {
+        out.set_data(
+            allocator::malloc_or_wait(a.data_size() * out.itemsize()),
+            a.data_size(),
+            a.strides(),
+            a.flags());
+      }
       break;
     case General:
       out.set_data(allocator::malloc_or_wait(out.nbytes()));
@@ -123,14 +148,24 @@ struct DefaultVectorVector {
   }
 };
 
+// Each of the following loops handles the range [start, end) of the first axis
+// so that the work can be split across the threads of the pool. The output is
+// always row contiguous in the general case.
+
 template <typename T, typename U, typename Op>
-void binary_op_dims1(const array& a, const array& b, array& out, Op op) {
+void binary_op_dims1(
+    const array& a,
+    const array& b,
+    array& out,
+    Op op,
+    size_t start,
+    size_t end) {
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
   U* dst = out.data<U>();
-  size_t a_idx = 0;
-  size_t b_idx = 0;
-  for (size_t i = 0; i < out.size(); ++i) {
+  size_t a_idx = start * a.strides()[0];
+  size_t b_idx = start * b.strides()[0];
+  for (size_t i = start; i < end; ++i) {
     dst[i] = op(a_ptr[a_idx], b_ptr[b_idx]);
     a_idx += a.strides()[0];
     b_idx += b.strides()[0];
@@ -143,13 +178,15 @@ void binary_op_dims1(
     const array& b,
     array& out,
     Op op,
-    int stride) {
+    int stride,
+    size_t start,
+    size_t end) {
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
-  U* dst = out.data<U>();
-  size_t a_idx = 0;
-  size_t b_idx = 0;
-  for (size_t i = 0; i < a.shape()[0]; i++) {
+  U* dst = out.data<U>() + start * stride;
+  size_t a_idx = start * a.strides()[0];
+  size_t b_idx = start * b.strides()[0];
+  for (size_t i = start; i < end; i++) {
     op(a_ptr + a_idx, b_ptr + b_idx, dst, stride);
     a_idx += a.strides()[0];
     b_idx += b.strides()[0];
@@ -158,14 +195,20 @@ void binary_op_dims1(
 }
 
 template <typename T, typename U, typename Op>
-void binary_op_dims2(const array& a, const array& b, array& out, Op op) {
+void binary_op_dims2(
+    const array& a,
+    const array& b,
+    array& out,
+    Op op,
+    size_t start,
+    size_t end) {
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
   U* dst = out.data<U>();
-  size_t a_idx = 0;
-  size_t b_idx = 0;
-  size_t out_idx = 0;
-  for (size_t i = 0; i < a.shape()[0]; ++i) {
+  size_t a_idx = start * a.strides()[0];
+  size_t b_idx = start * b.strides()[0];
+  size_t out_idx = start * out.strides()[0];
+  for (size_t i = start; i < end; ++i) {
     for (size_t j = 0; j < a.shape()[1]; ++j) {
       dst[out_idx++] = op(a_ptr[a_idx], b_ptr[b_idx]);
       a_idx += a.strides()[1];
@@ -182,13 +225,15 @@ void binary_op_dims2(
     const array& b,
     array& out,
     Op op,
-    int stride) {
+    int stride,
+    size_t start,
+    size_t end) {
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
-  U* dst = out.data<U>();
-  size_t a_idx = 0;
-  size_t b_idx = 0;
-  for (size_t i = 0; i < a.shape()[0]; ++i) {
+  U* dst = out.data<U>() + start * a.shape()[1] * stride;
+  size_t a_idx = start * a.strides()[0];
+  size_t b_idx = start * b.strides()[0];
+  for (size_t i = start; i < end; ++i) {
     for (size_t j = 0; j < a.shape()[1]; ++j) {
       op(a_ptr + a_idx, b_ptr + b_idx, dst, stride);
       a_idx += a.strides()[1];
@@ -201,14 +246,20 @@ void binary_op_dims2(
 }
 
 template <typename T, typename U, typename Op>
-void binary_op_dims3(const array& a, const array& b, array& out, Op op) {
+void binary_op_dims3(
+    const array& a,
+    const array& b,
+    array& out,
+    Op op,
+    size_t start,
+    size_t end) {
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
   U* dst = out.data<U>();
-  size_t a_idx = 0;
-  size_t b_idx = 0;
-  size_t out_idx = 0;
-  for (size_t i = 0; i < a.shape()[0]; ++i) {
+  size_t a_idx = start * a.strides()[0];
+  size_t b_idx = start * b.strides()[0];
+  size_t out_idx = start * out.strides()[0];
+  for (size_t i = start; i < end; ++i) {
     for (size_t j = 0; j < a.shape()[1]; ++j) {
       for (size_t k = 0; k < a.shape()[2]; ++k) {
         dst[out_idx++] = op(a_ptr[a_idx], b_ptr[b_idx]);
@@ -224,14 +275,20 @@ void binary_op_dims3(const array& a, const array& b, array& out, Op op) {
 }
 
 template <typename T, typename U, typename Op>
-void binary_op_dims4(const array& a, const array& b, array& out, Op op) {
+void binary_op_dims4(
+    const array& a,
+    const array& b,
+    array& out,
+    Op op,
+    size_t start,
+    size_t end) {
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
   U* dst = out.data<U>();
-  size_t a_idx = 0;
-  size_t b_idx = 0;
-  size_t out_idx = 0;
-  for (size_t i = 0; i < a.shape()[0]; ++i) {
+  size_t a_idx = start * a.strides()[0];
+  size_t b_idx = start * b.strides()[0];
+  size_t out_idx = start * out.strides()[0];
+  for (size_t i = start; i < end; ++i) {
     for (size_t j = 0; j < a.shape()[1]; ++j) {
       for (size_t k = 0; k < a.shape()[2]; ++k) {
         for (size_t ii = 0; ii < a.shape()[3]; ++ii) {
@@ -256,29 +313,44 @@ void binary_op_dispatch_dims(
     const array& b,
     array& out,
     Op op) {
+  // Split the first axis across threads, each item of which corresponds to a
+  // row of out.strides()[0] elements.
+  auto dispatch = [&](auto loop) {
+    threading::parallel_for(out.shape(0), loop, out.strides()[0]);
+  };
   switch (out.ndim()) {
     case 1:
-      binary_op_dims1<T, U, Op>(a, b, out, op);
+      dispatch([&](size_t start, size_t end) {
+        binary_op_dims1<T, U, Op>(a, b, out, op, start, end);
+      });
       return;
     case 2:
-      binary_op_dims2<T, U, Op>(a, b, out, op);
+      dispatch([&](size_t start, size_t end) {
+        binary_op_dims2<T, U, Op>(a, b, out, op, start, end);
+      });
       return;
     case 3:
-      binary_op_dims3<T, U, Op>(a, b, out, op);
+      dispatch([&](size_t start, size_t end) {
+        binary_op_dims3<T, U, Op>(a, b, out, op, start, end);
+      });
       return;
     case 4:
-      binary_op_dims4<T, U, Op>(a, b, out, op);
+      dispatch([&](size_t start, size_t end) {
+        binary_op_dims4<T, U, Op>(a, b, out, op, start, end);
+      });
       return;
   }
 
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
   U* dst = out.data<U>();
-  for (size_t i = 0; i < out.size(); i++) {
-    int a_idx = elem_to_loc(i, a.shape(), a.strides());
-    int b_idx = elem_to_loc(i, b.shape(), b.strides());
-    dst[i] = op(a_ptr[a_idx], b_ptr[b_idx]);
-  }
+  threading::parallel_for(out.size(), [&](size_t start, size_t end) {
+    for (size_t i = start; i < end; i++) {
+      int a_idx = elem_to_loc(i, a.shape(), a.strides());
+      int b_idx = elem_to_loc(i, b.shape(), b.strides());
+      dst[i] = op(a_ptr[a_idx], b_ptr[b_idx]);
+    }
+  });
 }
 
 template <typename T, typename U, typename Op>
@@ -290,24 +362,35 @@ void binary_op_dispatch_dims(
     int dim,
     int stride) {
   // Number of dimensions to loop over for vectorized ops
+  auto dispatch = [&](auto loop) {
+    threading::parallel_for(out.shape(0), loop, out.strides()[0]);
+  };
   switch (dim) {
     case 1:
-      binary_op_dims1<T, U, Op>(a, b, out, op, stride);
+      dispatch([&](size_t start, size_t end) {
+        binary_op_dims1<T, U, Op>(a, b, out, op, stride, start, end);
+      });
       return;
     case 2:
-      binary_op_dims2<T, U, Op>(a, b, out, op, stride);
+      dispatch([&](size_t start, size_t end) {
+        binary_op_dims2<T, U, Op>(a, b, out, op, stride, start, end);
+      });
       return;
   }
 
   const T* a_ptr = a.data<T>();
   const T* b_ptr = b.data<T>();
   U* dst = out.data<U>();
-  for (size_t i = 0; i < out.size(); i += stride) {
-    int a_idx = elem_to_loc(i, a.shape(), a.strides());
-    int b_idx = elem_to_loc(i, b.shape(), b.strides());
-    op(a_ptr + a_idx, b_ptr + b_idx, dst, stride);
-    dst += stride;
-  }
+  threading::parallel_for(
+      out.size() / stride,
+      [&](size_t start, size_t end) {
+        for (size_t i = start * stride; i < end * stride; i += stride) {
+          int a_idx = elem_to_loc(i, a.shape(), a.strides());
+          int b_idx = elem_to_loc(i, b.shape(), b.strides());
+          op(a_ptr + a_idx, b_ptr + b_idx, dst + i, stride);
+        }
+      },
+      stride);
 }
 
 template <
@@ -336,19 +419,31 @@ void binary_op(
 
   // The full computation is scalar vector so delegate to the op
   if (bopt == ScalarVector) {
-    opsv(a.data<T>(), b.data<T>(), out.data<U>(), b.data_size());
+    threading::parallel_for(b.data_size(), [&](size_t start, size_t end) {
+      opsv(
+          a.data<T>(), b.data<T>() + start, out.data<U>() + start, end - start);
+    });
     return;
   }
 
   // The full computation is vector scalar so delegate to the op
   if (bopt == VectorScalar) {
-    opvs(a.data<T>(), b.data<T>(), out.data<U>(), a.data_size());
+    threading::parallel_for(a.data_size(), [&](size_t start, size_t end) {
+      opvs(
+          a.data<T>() + start, b.data<T>(), out.data<U>() + start, end - start);
+    });
     return;
   }
 
   // The full computation is vector vector so delegate to the op
   if (bopt == VectorVector) {
-    opvv(a.data<T>(), b.data<T>(), out.data<U>(), out.size());
+    threading::parallel_for(out.size(), [&](size_t start, size_t end) {
+      opvv(
+          a.data<T>() + start,
+          b.data<T>() + start,
+          out.data<U>() + start,
+          end - start);
+    });
     return;
   }
 
@@ -0,0 +1,98 @@
+// Copyright © 2023 Apple Inc.
+
+#include <cassert>
+#include <unordered_map>
+
+#include "mlx/allocator.h"
+#include "mlx/backend/common/copy.h"
+#include "mlx/backend/common/threading.h"
+#include "mlx/primitives.h"
+
+namespace mlx::core {
+
+namespace {
+
+// The number of elements of the tiles the fused chain is run on. It is small
+// enough for the intermediate tiles to stay in the cache.
+constexpr size_t tile_size = 16384;
+
+// A view of the elements [offset, offset + n) of a row contiguous array or
+// of a broadcast scalar
+array tile_view(const array& in, int n, size_t offset) {
+  array view({n}, in.dtype(), nullptr, {});
+  if (in.data_size() == 1) {
+    array::Flags flags{true, n == 1, n == 1};
+    view.copy_shared_buffer(in, {0}, flags, 1);
+  } else {
+    array::Flags flags{true, true, true};
+    view.copy_shared_buffer(in, {1}, flags, n, offset);
+  }
+  return view;
+}
+
+} // namespace
+
+void Compiled::eval(const std::vector<array>& inputs, array& out) {
+  assert(inputs.size() == inputs_.size());
+
+  // Run the primitives of the chain on the given values of the inputs
+  auto run_tape = [this](
+                      std::unordered_map<std::uintptr_t, array>& values,
+                      const std::vector<int>* shape) {
+    for (auto& a : tape_) {
+      std::vector<array> a_inputs;
+      for (auto& in : a.inputs()) {
+        a_inputs.push_back(values.at(in.id()));
+      }
+      array a_out(shape ? *shape : a.shape(), a.dtype(), nullptr, {});
+      a.primitive().eval_cpu(a_inputs, a_out);
+      values.insert_or_assign(a.id(), std::move(a_out));
+    }
+    return values.at(tape_.back().id());
+  };
+
+  // The chain is run in one pass over memory when every input can be split
+  // in tiles. Otherwise each primitive is run on the whole arrays.
+  bool tiled = true;
+  for (auto& in : inputs) {
+    tiled &= in.data_size() == 1 ||
+        (in.flags().row_contiguous && in.size() == out.size());
+  }
+  if (!tiled) {
+    std::unordered_map<std::uintptr_t, array> values;
+    for (int i = 0; i < inputs.size(); i++) {
+      values.insert({inputs_[i].id(), inputs[i]});
+    }
+    out.copy_shared_buffer(run_tape(values, nullptr));
+    return;
+  }
+
+  out.set_data(allocator::malloc_or_wait(out.nbytes()));
+  size_t size = out.size();
+  size_t n_tiles = (size + tile_size - 1) / tile_size;
+  threading::parallel_for(
+      n_tiles,
+      [&](size_t start, size_t end) {
+        for (size_t t = start; t < end; t++) {
+          size_t offset = t * tile_size;
+          int n = std::min(tile_size, size - offset);
+          std::vector<int> shape = {n};
+
+          std::unordered_map<std::uintptr_t, array> values;
+          for (int i = 0; i < inputs.size(); i++) {
+            values.insert({inputs_[i].id(), tile_view(inputs[i], n, offset)});
+          }
+          auto result = run_tape(values, &shape);
+
+          array out_tile(shape, out.dtype(), nullptr, {});
+          out_tile.copy_shared_buffer(out, {1}, out.flags(), n, offset);
+          copy_inplace(
+              result,
+              out_tile,
+              result.data_size() == 1 ? CopyType::Scalar : CopyType::Vector);
+        }
+      },
+      tile_size);
+}
+
+} // namespace mlx::core
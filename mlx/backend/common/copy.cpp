@@ -1,180 +1,225 @@
 // Copyright © 2023 Apple Inc.
 
+#include <algorithm>
 #include <numeric>
 
 #include "mlx/allocator.h"
 #include "mlx/backend/common/copy.h"
+#include "mlx/backend/common/threading.h"
 
 namespace mlx::core {
 
 namespace {
 
+// Elements per side of the square tiles used to copy transposed dims
+constexpr int copy_tile_size = 32;
+
+// The offsets in the input and output of the positions of a strided copy in
+// row major order
+struct StridedIterator {
+  StridedIterator(
+      std::vector<int> shape,
+      std::vector<size_t> src_strides,
+      std::vector<size_t> dst_strides)
+      : shape(std::move(shape)),
+        src_strides(std::move(src_strides)),
+        dst_strides(std::move(dst_strides)),
+        pos(this->shape.size(), 0) {}
+
+  void seek(size_t elem) {
+    src_offset = 0;
+    dst_offset = 0;
+    for (int i = shape.size() - 1; i >= 0; --i) {
+      pos[i] = elem % shape[i];
+      elem /= shape[i];
+      src_offset += pos[i] * src_strides[i];
+      dst_offset += pos[i] * dst_strides[i];
+    }
+  }
+
+  void step() {
+    for (int i = shape.size() - 1; i >= 0; --i) {
+      src_offset += src_strides[i];
+      dst_offset += dst_strides[i];
+      if (++pos[i] < shape[i]) {
+        return;
+      }
+      src_offset -= shape[i] * src_strides[i];
+      dst_offset -= shape[i] * dst_strides[i];
+      pos[i] = 0;
+    }
+  }
+
+  std::vector<int> shape;
+  std::vector<size_t> src_strides;
+  std::vector<size_t> dst_strides;
+  std::vector<int> pos;
+  size_t src_offset{0};
+  size_t dst_offset{0};
+};
+
 template <typename SrcT, typename DstT>
 void copy_single(const array& src, array& dst) {
   auto val = static_cast<DstT>(src.data<SrcT>()[0]);
   auto dst_ptr = dst.data<DstT>();
-  for (int i = 0; i < dst.size(); ++i) {
-    dst_ptr[i] = val;
-  }
+  threading::parallel_for(dst.size(), [&](size_t start, size_t end) {
+    std::fill(dst_ptr + start, dst_ptr + end, val);
+  });
 }
 
 template <typename SrcT, typename DstT>
 void copy_vector(const array& src, array& dst) {
   auto src_ptr = src.data<SrcT>();
   auto dst_ptr = dst.data<DstT>();
-  std::copy(src_ptr, src_ptr + src.data_size(), dst_ptr);
+  threading::parallel_for(src.data_size(), [&](size_t start, size_t end) {
+    std::copy(src_ptr + start, src_ptr + end, dst_ptr + start);
+  });
 }
 
+// Copy the rows of the last dim, with std::copy if they are contiguous in
+// both the input and the output
 template <typename SrcT, typename DstT>
-void copy_general_dim1(const array& src, array& dst) {
-  const SrcT* src_ptr = src.data<SrcT>();
-  DstT* dst_ptr = dst.data<DstT>();
-  size_t src_idx = 0;
-  size_t dst_idx = 0;
-  for (size_t i = 0; i < src.shape()[0]; ++i) {
-    dst_ptr[dst_idx++] = static_cast<DstT>(src_ptr[src_idx]);
-    src_idx += src.strides()[0];
-  }
-}
+void copy_rows(
+    const SrcT* src_ptr,
+    DstT* dst_ptr,
+    const std::vector<int>& shape,
+    const std::vector<size_t>& src_strides,
+    const std::vector<size_t>& dst_strides) {
+  int n = shape.back();
+  auto src_stride = src_strides.back();
+  auto dst_stride = dst_strides.back();
+  StridedIterator rows(
+      {shape.begin(), shape.end() - 1},
+      {src_strides.begin(), src_strides.end() - 1},
+      {dst_strides.begin(), dst_strides.end() - 1});
+  size_t n_rows = std::accumulate(
+      rows.shape.begin(), rows.shape.end(), size_t(1), std::multiplies<>());
 
-template <typename SrcT, typename DstT>
-void copy_general_dim2(const array& src, array& dst) {
-  const SrcT* src_ptr = src.data<SrcT>();
-  DstT* dst_ptr = dst.data<DstT>();
-  size_t src_idx = 0;
-  size_t dst_idx = 0;
-  for (size_t i = 0; i < src.shape()[0]; ++i) {
-    for (size_t j = 0; j < src.shape()[1]; ++j) {
-      dst_ptr[dst_idx++] = static_cast<DstT>(src_ptr[src_idx]);
-      src_idx += src.strides()[1];
-    }
-    src_idx += src.strides()[0] - src.strides()[1] * src.shape()[1];
-  }
+  threading::parallel_for(
+      n_rows,
+      [&](size_t start, size_t end) {
+        auto it = rows;
+        it.seek(start);
+        for (size_t r = start; r < end; r++, it.step()) {
+          auto src = src_ptr + it.src_offset;
+          auto dst = dst_ptr + it.dst_offset;
+          if (src_stride == 1 && dst_stride == 1) {
+            std::copy(src, src + n, dst);
+          } else {
+            for (int i = 0; i < n; i++) {
+              dst[i * dst_stride] = static_cast<DstT>(src[i * src_stride]);
+            }
+          }
+        }
+      },
+      n);
 }
 
+// Copy in square tiles of the dim which is contiguous in the input and the
+// last dim so that the strided reads of a tile stay in cache
 template <typename SrcT, typename DstT>
-void copy_general_dim3(const array& src, array& dst) {
-  const SrcT* src_ptr = src.data<SrcT>();
-  DstT* dst_ptr = dst.data<DstT>();
-  size_t src_idx = 0;
-  size_t dst_idx = 0;
-  for (size_t i = 0; i < src.shape()[0]; ++i) {
-    for (size_t j = 0; j < src.shape()[1]; ++j) {
-      for (size_t k = 0; k < src.shape()[2]; ++k) {
-        dst_ptr[dst_idx++] = static_cast<DstT>(src_ptr[src_idx]);
-        src_idx += src.strides()[2];
-      }
-      src_idx += src.strides()[1] - src.strides()[2] * src.shape()[2];
+void copy_tiled(
+    const SrcT* src_ptr,
+    DstT* dst_ptr,
+    const std::vector<int>& shape,
+    const std::vector<size_t>& src_strides,
+    const std::vector<size_t>& dst_strides,
+    int axis) {
+  int last = shape.size() - 1;
+  StridedIterator outer({}, {}, {});
+  for (int i = 0; i < last; i++) {
+    if (i != axis) {
+      outer.shape.push_back(shape[i]);
+      outer.src_strides.push_back(src_strides[i]);
+      outer.dst_strides.push_back(dst_strides[i]);
     }
-    src_idx += src.strides()[0] - src.strides()[1] * src.shape()[1];
   }
-}
+  outer.pos.resize(outer.shape.size());
+  size_t n_outer = std::accumulate(
+      outer.shape.begin(), outer.shape.end(), size_t(1), std::multiplies<>());
 
-template <typename SrcT, typename DstT>
-void copy_general_dim4(const array& src, array& dst) {
-  const SrcT* src_ptr = src.data<SrcT>();
-  DstT* dst_ptr = dst.data<DstT>();
-  size_t src_idx = 0;
-  size_t dst_idx = 0;
-  for (size_t i = 0; i < src.shape()[0]; ++i) {
-    for (size_t j = 0; j < src.shape()[1]; ++j) {
-      for (size_t k = 0; k < src.shape()[2]; ++k) {
-        for (size_t ii = 0; ii < src.shape()[3]; ++ii) {
-          dst_ptr[dst_idx++] = static_cast<DstT>(src_ptr[src_idx]);
-          src_idx += src.strides()[3];
+  int rows = shape[axis];
+  int cols = shape[last];
+  auto src_row_stride = src_strides[axis];
+  auto dst_row_stride = dst_strides[axis];
+  auto src_col_stride = src_strides[last];
+  auto dst_col_stride = dst_strides[last];
+  size_t n_row_tiles = (rows + copy_tile_size - 1) / copy_tile_size;
+
+  threading::parallel_for(
+      n_outer * n_row_tiles,
+      [&](size_t start, size_t end) {
+        auto it = outer;
+        for (size_t t = start; t < end; t++) {
+          it.seek(t / n_row_tiles);
+          int r0 = (t % n_row_tiles) * copy_tile_size;
+          int r1 = std::min(rows, r0 + copy_tile_size);
+          for (int c0 = 0; c0 < cols; c0 += copy_tile_size) {
+            int c1 = std::min(cols, c0 + copy_tile_size);
+            for (int r = r0; r < r1; r++) {
+              auto src = src_ptr + it.src_offset + r * src_row_stride;
+              auto dst = dst_ptr + it.dst_offset + r * dst_row_stride;
+              for (int c = c0; c < c1; c++) {
+                dst[c * dst_col_stride] =
+                    static_cast<DstT>(src[c * src_col_stride]);
+              }
+            }
+          }
         }
-        src_idx += src.strides()[2] - src.strides()[3] * src.shape()[3];
-      }
-      src_idx += src.strides()[1] - src.strides()[2] * src.shape()[2];
-    }
-    src_idx += src.strides()[0] - src.strides()[1] * src.shape()[1];
-  }
+      },
+      copy_tile_size * cols);
 }
 
 template <typename SrcT, typename DstT>
-void copy_general(const array& src, array& dst) {
-  switch (src.ndim()) {
-    case 1:
-      copy_general_dim1<SrcT, DstT>(src, dst);
-      return;
-    case 2:
-      copy_general_dim2<SrcT, DstT>(src, dst);
-      return;
-    case 3:
-      copy_general_dim3<SrcT, DstT>(src, dst);
-      return;
-    case 4:
-      copy_general_dim4<SrcT, DstT>(src, dst);
-      return;
+void copy_strided(
+    const array& src,
+    array& dst,
+    const std::vector<size_t>& dst_strides) {
+  if (src.size() == 0) {
+    return;
   }
-
+  auto [shape, strides] =
+      collapse_contiguous_dims(src.shape(), {src.strides(), dst_strides});
   auto src_ptr = src.data<SrcT>();
   auto dst_ptr = dst.data<DstT>();
-  for (size_t i = 0; i < dst.size(); ++i) {
-    size_t src_elem = elem_to_loc(i, src.shape(), src.strides());
-    dst_ptr[i] = static_cast<DstT>(src_ptr[src_elem]);
+
+  // Both are contiguous so the copy is a single run
+  if (shape.size() == 1 && strides[0][0] == 1 && strides[1][0] == 1) {
+    threading::parallel_for(shape[0], [&](size_t start, size_t end) {
+      std::copy(src_ptr + start, src_ptr + end, dst_ptr + start);
+    });
+    return;
   }
-}
 
-template <typename SrcT, typename DstT, int D>
-inline void copy_general_general_dims(
-    const array& src,
-    array& dst,
-    size_t offset_src,
-    size_t offset_dst) {
-  if constexpr (D > 1) {
-    int axis = src.ndim() - D;
-    auto stride_src = src.strides()[axis];
-    auto stride_dst = dst.strides()[axis];
-    auto N = src.shape(axis);
-    for (int i = 0; i < N; i++) {
-      copy_general_general_dims<SrcT, DstT, D - 1>(
-          src, dst, offset_src, offset_dst);
-      offset_src += stride_src;
-      offset_dst += stride_dst;
-    }
-  } else {
-    int axis = src.ndim() - 1;
-    auto stride_src = src.strides()[axis];
-    auto stride_dst = dst.strides()[axis];
-    auto N = src.shape(axis);
-    const SrcT* src_ptr = src.data<SrcT>() + offset_src;
-    DstT* dst_ptr = dst.data<DstT>() + offset_dst;
-    for (int i = 0; i < N; i++) {
-      *dst_ptr = static_cast<DstT>(*src_ptr);
-      src_ptr += stride_src;
-      dst_ptr += stride_dst;
-    }
+  // The input is contiguous along another dim than the output so the copy
+  // transposes them
+  int last = shape.size() - 1;
+  int axis =
+      std::find(strides[0].begin(), strides[0].end(), 1) - strides[0].begin();
+  if (axis < last && strides[0][last] != 1 && shape[axis] >= copy_tile_size &&
+      shape[last] >= copy_tile_size) {
+    copy_tiled(src_ptr, dst_ptr, shape, strides[0], strides[1], axis);
+    return;
   }
+
+  copy_rows(src_ptr, dst_ptr, shape, strides[0], strides[1]);
 }
 
 template <typename SrcT, typename DstT>
-void copy_general_general(const array& src, array& dst) {
-  switch (src.ndim()) {
-    case 1:
-      copy_general_general_dims<SrcT, DstT, 1>(src, dst, 0, 0);
-      return;
-    case 2:
-      copy_general_general_dims<SrcT, DstT, 2>(src, dst, 0, 0);
-      return;
-    case 3:
-      copy_general_general_dims<SrcT, DstT, 3>(src, dst, 0, 0);
-      return;
-    case 4:
-      copy_general_general_dims<SrcT, DstT, 4>(src, dst, 0, 0);
-      return;
-    case 5:
-      copy_general_general_dims<SrcT, DstT, 5>(src, dst, 0, 0);
-      return;
+void copy_general(const array& src, array& dst) {
+  // The output is row contiguous with the shape of the input
+  std::vector<size_t> dst_strides(src.ndim());
+  size_t size = 1;
+  for (int i = src.ndim() - 1; i >= 0; --i) {
+    dst_strides[i] = size;
+    size *= src.shape(i);
   }
+  copy_strided<SrcT, DstT>(src, dst, dst_strides);
+}
 
-  int size = std::accumulate(
-      src.shape().begin() - 5, src.shape().end(), 1, std::multiplies<int>());
-  for (int i = 0; i < src.size(); i += size) {
-    size_t offset_src = elem_to_loc(i, src.shape(), src.strides());
-    size_t offset_dst = elem_to_loc(i, dst.shape(), dst.strides());
-    copy_general_general_dims<SrcT, DstT, 5>(src, dst, offset_src, offset_dst);
-  }
+template <typename SrcT, typename DstT>
+void copy_general_general(const array& src, array& dst) {
+  copy_strided<SrcT, DstT>(src, dst, dst.strides());
 }
 
 template <typename SrcT, typename DstT>
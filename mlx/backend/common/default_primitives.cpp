@@ -6,8 +6,12 @@
 #include <cblas.h>
 #endif
 
+#include <cstring>
+#include <optional>
+
 #include "mlx/array.h"
 #include "mlx/backend/common/copy.h"
+#include "mlx/backend/common/threading.h"
 #include "mlx/backend/common/utils.h"
 #include "mlx/primitives.h"
 
@@ -34,11 +38,15 @@ DEFAULT(AsType)
 DEFAULT(AsStrided)
 DEFAULT(Broadcast)
 DEFAULT(Ceil)
+DEFAULT(Checkpoint)
+DEFAULT(Compiled)
 DEFAULT(Concatenate)
 DEFAULT(Convolution)
 DEFAULT(Copy)
 DEFAULT(Cos)
 DEFAULT(Cosh)
+DEFAULT(CustomTransforms)
+DEFAULT(Depends)
 DEFAULT(Divide)
 DEFAULT(Remainder)
 DEFAULT(Equal)
@@ -88,53 +96,236 @@ DEFAULT(Tan)
 DEFAULT(Tanh)
 DEFAULT(Transpose)
 
-void Matmul::eval_cpu(const std::vector<array>& inputs, array& out) {
-  if (out.dtype() != float32) {
-    throw std::runtime_error(
-        "[Matmul::eval_cpu] Currently only supports float32.");
+namespace {
+
+// Batches of matrices smaller than this (in M * N * K) are split across the
+// thread pool. Larger ones are left to the BLAS library's own threading.
+constexpr size_t max_batch_parallel_gemm_size = 1 << 21;
+
+// Check whether the last two axes of arr can be passed to gemm as is. Returns
+// whether the matrix is transposed and its leading dimension or nullopt if a
+// copy is needed.
+std::optional<std::pair<bool, size_t>> gemm_layout(const array& arr) {
+  int rows = arr.shape(-2);
+  int cols = arr.shape(-1);
+  size_t stx = arr.strides()[arr.ndim() - 2];
+  size_t sty = arr.strides()[arr.ndim() - 1];
+  // The stride of an axis of size 1 is never used
+  if (rows == 1) {
+    stx = cols;
   }
-  out.set_data(allocator::malloc_or_wait(out.nbytes()));
+  if (cols == 1) {
+    sty = 1;
+    stx = std::max<size_t>(stx, 1);
+  }
+  if (sty == 1 && stx >= cols) {
+    return std::make_pair(false, stx);
+  } else if (stx == 1 && sty >= rows) {
+    return std::make_pair(true, sty);
+  }
+  return std::nullopt;
+}
+
+std::tuple<bool, size_t, array> check_transpose(const array& arr) {
+  if (auto layout = gemm_layout(arr); layout) {
+    return std::make_tuple(layout->first, layout->second, arr);
+  }
+  array arr_copy(arr.shape(), arr.dtype(), nullptr, {});
+  copy(arr, arr_copy, CopyType::General);
+  size_t stx = arr.shape(-1);
+  return std::make_tuple(false, stx, arr_copy);
+}
+
+// The offsets of the matrices of a batch. Broadcasted batch axes have a
+// stride of 0 so they point to the same matrix without a copy.
+std::vector<size_t> batch_offsets(const array& arr, size_t batch_size) {
+  std::vector<int> shape(arr.shape().begin(), arr.shape().end() - 2);
+  std::vector<size_t> strides(arr.strides().begin(), arr.strides().end() - 2);
+  std::vector<size_t> offsets(batch_size);
+  for (size_t i = 0; i < batch_size; i++) {
+    offsets[i] = elem_to_loc(i, shape, strides);
+  }
+  return offsets;
+}
 
-  auto& a_pre = inputs[0];
-  auto& b_pre = inputs[1];
-
-  auto check_transpose = [](const array& arr) {
-    auto stx = arr.strides()[arr.ndim() - 2];
-    auto sty = arr.strides()[arr.ndim() - 1];
-    if (stx == arr.shape(-1) && sty == 1) {
-      return std::make_tuple(false, stx, arr);
-    } else if (stx == 1 && sty == arr.shape(-2)) {
-      return std::make_tuple(true, sty, arr);
-    } else {
-      array arr_copy(arr.shape(), arr.dtype(), nullptr, {});
-      copy(arr, arr_copy, CopyType::General);
-      size_t stx = arr.shape(-1);
-      return std::make_tuple(false, stx, arr_copy);
+// Copy a rows x cols matrix with leading dimension ld to a contiguous float
+// matrix
+template <typename T>
+void to_float(const T* src, float* dst, int rows, int cols, size_t ld) {
+  for (int i = 0; i < rows; i++) {
+    for (int j = 0; j < cols; j++) {
+      dst[j] = static_cast<float>(src[j]);
     }
-  };
+    src += ld;
+    dst += cols;
+  }
+}
+
+void sgemm(
+    bool a_transposed,
+    bool b_transposed,
+    int M,
+    int N,
+    int K,
+    const float* a,
+    size_t lda,
+    const float* b,
+    size_t ldb,
+    float* c,
+    size_t ldc) {
+  cblas_sgemm(
+      CblasRowMajor,
+      a_transposed ? CblasTrans : CblasNoTrans, // transA
+      b_transposed ? CblasTrans : CblasNoTrans, // transB
+      M,
+      N,
+      K,
+      1.0f, // alpha
+      a,
+      lda,
+      b,
+      ldb,
+      0.0f, // beta
+      c,
+      ldc);
+}
+
+// Run loop(start, end) over the matrices of the batch, splitting them across
+// the thread pool if they are small enough.
+template <typename F>
+void run_batches(size_t batch_size, size_t gemm_size, F&& loop) {
+  if (gemm_size > max_batch_parallel_gemm_size) {
+    loop(0, batch_size);
+  } else {
+    threading::parallel_for(batch_size, loop, gemm_size);
+  }
+}
 
-  auto [a_transposed, lda, a] = check_transpose(a_pre);
-  auto [b_transposed, ldb, b] = check_transpose(b_pre);
+void matmul_float(
+    const array& a,
+    const array& b,
+    array& out,
+    bool a_transposed,
+    size_t lda,
+    bool b_transposed,
+    size_t ldb) {
   int M = a.shape(-2);
   int N = b.shape(-1);
   int K = a.shape(-1);
-  for (int i = 0; i < (a.size() / (M * K)); ++i) {
-    cblas_sgemm(
-        CblasRowMajor,
-        a_transposed ? CblasTrans : CblasNoTrans, // transA
-        b_transposed ? CblasTrans : CblasNoTrans, // transB
-        M,
-        N,
-        K,
-        1.0f, // alpha
-        a.data<float>() + elem_to_loc(M * K * i, a.shape(), a.strides()),
-        lda,
-        b.data<float>() + elem_to_loc(K * N * i, b.shape(), b.strides()),
-        ldb,
-        0.0f, // beta
-        out.data<float>() + M * N * i,
-        out.shape(-1) // ldc
-    );
+  size_t batch_size = out.size() / (size_t(M) * N);
+  auto a_offsets = batch_offsets(a, batch_size);
+  auto b_offsets = batch_offsets(b, batch_size);
+  run_batches(batch_size, size_t(M) * N * K, [&](size_t start, size_t end) {
+    for (size_t i = start; i < end; i++) {
+      sgemm(
+          a_transposed,
+          b_transposed,
+          M,
+          N,
+          K,
+          a.data<float>() + a_offsets[i],
+          lda,
+          b.data<float>() + b_offsets[i],
+          ldb,
+          out.data<float>() + size_t(M) * N * i,
+          N);
+    }
+  });
+}
+
+// Half precision matrices are converted to float32 one matrix at a time
+// right before the gemm, so only a matrix worth of scratch space is needed
+// per thread instead of upcasting the whole inputs.
+template <typename T>
+void matmul_half(
+    const array& a,
+    const array& b,
+    array& out,
+    bool a_transposed,
+    size_t lda,
+    bool b_transposed,
+    size_t ldb) {
+  int M = a.shape(-2);
+  int N = b.shape(-1);
+  int K = a.shape(-1);
+  size_t batch_size = out.size() / (size_t(M) * N);
+  auto a_offsets = batch_offsets(a, batch_size);
+  auto b_offsets = batch_offsets(b, batch_size);
+
+  // The rows and columns of the matrices as stored in memory
+  int a_rows = a_transposed ? K : M;
+  int a_cols = a_transposed ? M : K;
+  int b_rows = b_transposed ? N : K;
+  int b_cols = b_transposed ? K : N;
+
+  size_t gemm_size = size_t(M) * N * K;
+  size_t scratch_size = size_t(M) * K + size_t(K) * N + size_t(M) * N;
+  auto loop = [&](size_t start, size_t end) {
+    std::vector<float> scratch(scratch_size);
+    float* a_float = scratch.data();
+    float* b_float = a_float + size_t(M) * K;
+    float* out_float = b_float + size_t(K) * N;
+    for (size_t i = start; i < end; i++) {
+      // Matrices shared by consecutive batch entries are only converted once
+      if (i == start || a_offsets[i] != a_offsets[i - 1]) {
+        to_float(a.data<T>() + a_offsets[i], a_float, a_rows, a_cols, lda);
+      }
+      if (i == start || b_offsets[i] != b_offsets[i - 1]) {
+        to_float(b.data<T>() + b_offsets[i], b_float, b_rows, b_cols, ldb);
+      }
+      sgemm(
+          a_transposed,
+          b_transposed,
+          M,
+          N,
+          K,
+          a_float,
+          a_cols,
+          b_float,
+          b_cols,
+          out_float,
+          N);
+      std::copy(
+          out_float,
+          out_float + size_t(M) * N,
+          out.data<T>() + size_t(M) * N * i);
+    }
+  };
+  run_batches(batch_size, gemm_size, loop);
+}
+
+} // namespace
+
+void Matmul::eval_cpu(const std::vector<array>& inputs, array& out) {
+  if (out.dtype() != float32 && out.dtype() != float16 &&
+      out.dtype() != bfloat16) {
+    throw std::runtime_error(
+        "[Matmul::eval_cpu] Currently only supports float32, float16 and "
+        "bfloat16.");
+  }
+  out.set_data(allocator::malloc_or_wait(out.nbytes()));
+  if (out.size() == 0) {
+    return;
+  }
+
+  auto [a_transposed, lda, a] = check_transpose(inputs[0]);
+  auto [b_transposed, ldb, b] = check_transpose(inputs[1]);
+  if (a.shape(-1) == 0) {
+    // An empty inner dimension gives zeros which have the same bits in every
+    // floating point type
+    std::memset(out.data<void>(), 0, out.nbytes());
+    return;
+  }
+
+  switch (out.dtype()) {
+    case float16:
+      matmul_half<float16_t>(a, b, out, a_transposed, lda, b_transposed, ldb);
+      break;
+    case bfloat16:
+      matmul_half<bfloat16_t>(a, b, out, a_transposed, lda, b_transposed, ldb);
+      break;
+    default:
+      matmul_float(a, b, out, a_transposed, lda, b_transposed, ldb);
   }
 }
 
@@ -5,6 +5,8 @@
 #include <utility>
 
 #include "mlx/allocator.h"
+#include "mlx/backend/common/threading.h"
+#include "mlx/backend/metal/metal.h"
 #include "mlx/io/load.h"
 #include "mlx/primitives.h"
 
@@ -27,28 +29,62 @@ void swap_endianess(uint8_t* data_bytes, size_t N) {
   }
 }
 
+// Reads larger than this are split in chunks that are read in parallel
+constexpr size_t load_chunk_size = 1 << 22;
+
 } // namespace
 
 void Load::eval(const std::vector<array>& inputs, array& out) {
   assert(inputs.size() == 0);
-  out.set_data(allocator::malloc_or_wait(out.nbytes()));
 
-  reader_->seek(offset_, std::ios_base::beg);
-  reader_->read(out.data<char>(), out.nbytes());
-
-  if (swap_endianness_) {
-    switch (out.itemsize()) {
-      case 2:
-        swap_endianess<2>(out.data<uint8_t>(), out.data_size());
-        break;
-      case 4:
-        swap_endianess<4>(out.data<uint8_t>(), out.data_size());
-        break;
-      case 8:
-        swap_endianess<8>(out.data<uint8_t>(), out.data_size());
-        break;
-    }
+  // Arrays in native byte order wrap the pages of a memory mapped file
+  // directly. The deleter keeps the mapping alive as long as the array. With
+  // Metal the buffers have to be allocated by Metal so the data is copied.
+  if (auto mapped = std::dynamic_pointer_cast<io::MappedFileReader>(reader_);
+      mapped && !swap_endianness_ && !metal::is_available() &&
+      offset_ % out.itemsize() == 0 &&
+      offset_ + out.nbytes() <= mapped->mapped_file()->size()) {
+    auto file = mapped->mapped_file();
+    out.set_data(
+        allocator::Buffer(file->data() + offset_),
+        [file](allocator::Buffer) {});
+    return;
   }
+
+  out.set_data(allocator::malloc_or_wait(out.nbytes()));
+
+  // Positional reads don't share a cursor so the chunks (and loads on other
+  // streams) can be read concurrently
+  size_t nbytes = out.nbytes();
+  size_t n_chunks = (nbytes + load_chunk_size - 1) / load_chunk_size;
+  threading::parallel_for(
+      n_chunks,
+      [&](size_t start, size_t end) {
+        for (size_t i = start; i < end; i++) {
+          size_t chunk_offset = i * load_chunk_size;
+          size_t chunk_bytes = std::min(load_chunk_size, nbytes - chunk_offset);
+          uint8_t* chunk = out.data<uint8_t>() + chunk_offset;
+          reader_->read(
+              reinterpret_cast<char*>(chunk),
+              chunk_bytes,
+              offset_ + chunk_offset);
+
+          if (swap_endianness_) {
+            switch (out.itemsize()) {
+              case 2:
+                swap_endianess<2>(chunk, chunk_bytes / 2);
+                break;
+              case 4:
+                swap_endianess<4>(chunk, chunk_bytes / 4);
+                break;
+              case 8:
+                swap_endianess<8>(chunk, chunk_bytes / 8);
+                break;
+            }
+          }
+        }
+      },
+      load_chunk_size);
 }
 
 } // namespace mlx::core
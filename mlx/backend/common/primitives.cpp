@@ -178,6 +178,10 @@ void Ceil::eval(const std::vector<array>& inputs, array& out) {
   }
 }
 
+void Checkpoint::eval(const std::vector<array>& inputs, array& out) {
+  out.copy_shared_buffer(inputs.back());
+}
+
 void Concatenate::eval(const std::vector<array>& inputs, array& out) {
   std::vector<int> sizes;
   sizes.push_back(0);
@@ -231,6 +235,14 @@ void Cosh::eval(const std::vector<array>& inputs, array& out) {
   }
 }
 
+void CustomTransforms::eval(const std::vector<array>& inputs, array& out) {
+  out.copy_shared_buffer(inputs[inputs.size() - num_outputs_ + output_]);
+}
+
+void Depends::eval(const std::vector<array>& inputs, array& out) {
+  out.copy_shared_buffer(inputs[0]);
+}
+
 void Erf::eval(const std::vector<array>& inputs, array& out) {
   assert(inputs.size() == 1);
   const auto& in = inputs[0];
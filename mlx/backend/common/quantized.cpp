@@ -2,55 +2,215 @@
 
 #include <cassert>
 
+#ifdef ACCELERATE_NEW_LAPACK
+#include <vecLib/cblas_new.h>
+#else
+#include <cblas.h>
+#endif
+
+#include "mlx/backend/common/threading.h"
 #include "mlx/primitives.h"
 
 namespace mlx::core {
 
 namespace {
 
+// The number of rows of w that are dequantized together in the matrix-matrix
+// product. Each block of rows is dequantized once and multiplied with all the
+// rows of x.
+constexpr int qmm_block_n = 32;
+
+// Dequantize the K values of a row of w to float
 template <typename T, int bits, int group_size>
-void _qmm_t(
+void dequantize_row(
+    const uint32_t* w,
+    const T* scales,
+    const T* biases,
+    float* out,
+    int K) {
+  constexpr uint32_t bitmask = (1 << bits) - 1;
+  constexpr int pack_factor = 32 / bits;
+  constexpr int packs_in_group = group_size / pack_factor;
+
+  for (int k = 0; k < K; k += group_size) {
+    float scale = static_cast<float>(*scales++);
+    float bias = static_cast<float>(*biases++);
+
+    for (int kw = 0; kw < packs_in_group; kw++) {
+      uint32_t wi = *w++;
+
+      // Independent shifts instead of shifting wi in place so that the
+      // unpacking of a word can be vectorized
+#pragma clang loop unroll(full)
+      for (int p = 0; p < pack_factor; p++) {
+        out[p] =
+            scale * static_cast<float>((wi >> (p * bits)) & bitmask) + bias;
+      }
+      out += pack_factor;
+    }
+  }
+}
+
+// Matrix-vector product for M = 1. Since each output only reads its row of w
+// once there is nothing to reuse and the weights are unpacked on the fly. The
+// bias of a group doesn't depend on k so
+//
+//   sum_k x_k (scale * w_k + bias) = scale * sum_k x_k w_k + bias * sum_k x_k
+//
+// and the sums of x over each group are computed once for all the outputs.
+template <typename T, int bits, int group_size>
+void _qmv_t(
     T* result,
-    const T* x,
+    const float* x,
     const uint32_t* w,
     const T* scales,
     const T* biases,
-    int M,
     int N,
     int K) {
-  constexpr int bitmask = (1 << bits) - 1;
+  constexpr uint32_t bitmask = (1 << bits) - 1;
   constexpr int pack_factor = 32 / bits;
   constexpr int packs_in_group = group_size / pack_factor;
   const int Kg = K / group_size;
   const int Kw = K / pack_factor;
 
-  for (int m = 0; m < M; m++) {
-    const uint32_t* w_local = w;
-    const T* scales_local = scales;
-    const T* biases_local = biases;
+  std::vector<float> x_sums(Kg, 0);
+  for (int g = 0; g < Kg; g++) {
+    for (int k = 0; k < group_size; k++) {
+      x_sums[g] += x[g * group_size + k];
+    }
+  }
 
-    for (int n = 0; n < N; n++) {
-      const T* x_local = x;
-      T sum = 0;
-      for (int k = 0; k < K; k += group_size) {
-        T scale = *scales_local++;
-        T bias = *biases_local++;
+  threading::parallel_for(
+      N,
+      [&](size_t start, size_t end) {
+        for (size_t n = start; n < end; n++) {
+          const uint32_t* w_local = w + n * Kw;
+          const T* scales_local = scales + n * Kg;
+          const T* biases_local = biases + n * Kg;
+          const float* x_local = x;
 
-        for (int kw = 0; kw < packs_in_group; kw++) {
-          uint32_t wi = *w_local++;
+          float sum = 0;
+          for (int g = 0; g < Kg; g++) {
+            float group_sum = 0;
+            for (int kw = 0; kw < packs_in_group; kw++) {
+              uint32_t wi = *w_local++;
 
 #pragma clang loop unroll(full)
-          for (int p = 0; p < pack_factor; p++) {
-            sum += (*x_local++) * (scale * static_cast<T>(wi & bitmask) + bias);
-            wi >>= bits;
+              for (int p = 0; p < pack_factor; p++) {
+                group_sum += x_local[p] *
+                    static_cast<float>((wi >> (p * bits)) & bitmask);
+              }
+              x_local += pack_factor;
+            }
+            sum += static_cast<float>(scales_local[g]) * group_sum +
+                static_cast<float>(biases_local[g]) * x_sums[g];
           }
+          result[n] = static_cast<T>(sum);
         }
-      }
-      *result = sum;
-      result++;
-    }
+      },
+      K);
+}
 
-    x += K;
+// Matrix-matrix product. Blocks of qmm_block_n rows of w are dequantized once
+// and multiplied with all of x using sgemm. The blocks are split across the
+// thread pool.
+template <typename T, int bits, int group_size>
+void _qmm_t(
+    T* result,
+    const float* x,
+    const uint32_t* w,
+    const T* scales,
+    const T* biases,
+    int M,
+    int N,
+    int K) {
+  constexpr int pack_factor = 32 / bits;
+  const int Kg = K / group_size;
+  const int Kw = K / pack_factor;
+  const int n_blocks = (N + qmm_block_n - 1) / qmm_block_n;
+
+  threading::parallel_for(
+      n_blocks,
+      [&](size_t start, size_t end) {
+        std::vector<float> w_block(qmm_block_n * K);
+        std::vector<float> out_block;
+        if constexpr (!std::is_same_v<T, float>) {
+          out_block.resize(M * qmm_block_n);
+        }
+
+        for (size_t b = start; b < end; b++) {
+          int n0 = b * qmm_block_n;
+          int bn = std::min(qmm_block_n, N - n0);
+          for (int i = 0; i < bn; i++) {
+            dequantize_row<T, bits, group_size>(
+                w + (n0 + i) * Kw,
+                scales + (n0 + i) * Kg,
+                biases + (n0 + i) * Kg,
+                w_block.data() + i * K,
+                K);
+          }
+
+          float* out_ptr;
+          int ldc;
+          if constexpr (std::is_same_v<T, float>) {
+            out_ptr = result + n0;
+            ldc = N;
+          } else {
+            out_ptr = out_block.data();
+            ldc = bn;
+          }
+          cblas_sgemm(
+              CblasRowMajor,
+              CblasNoTrans, // transA
+              CblasTrans, // transB
+              M,
+              bn,
+              K,
+              1.0f, // alpha
+              x,
+              K, // lda
+              w_block.data(),
+              K, // ldb
+              0.0f, // beta
+              out_ptr,
+              ldc);
+          if constexpr (!std::is_same_v<T, float>) {
+            for (int m = 0; m < M; m++) {
+              std::copy(
+                  out_ptr + m * bn,
+                  out_ptr + (m + 1) * bn,
+                  result + m * N + n0);
+            }
+          }
+        }
+      },
+      size_t(qmm_block_n) * M * K);
+}
+
+template <typename T, int bits, int group_size>
+void _qmm_t_dispatch_shape(
+    T* result,
+    const T* x,
+    const uint32_t* w,
+    const T* scales,
+    const T* biases,
+    int M,
+    int N,
+    int K) {
+  // The kernels compute in float so half precision inputs are converted once
+  const float* x_float;
+  std::vector<float> x_copy;
+  if constexpr (std::is_same_v<T, float>) {
+    x_float = x;
+  } else {
+    x_copy.assign(x, x + size_t(M) * K);
+    x_float = x_copy.data();
+  }
+
+  if (M == 1) {
+    _qmv_t<T, bits, group_size>(result, x_float, w, scales, biases, N, K);
+  } else {
+    _qmm_t<T, bits, group_size>(result, x_float, w, scales, biases, M, N, K);
   }
 }
 
@@ -64,31 +224,37 @@ void _qmm_t_dispatch_typed(
     int M,
     int N,
     int K,
-    int group_size,
-    int bits) {
+    int bits,
+    int group_size) {
   switch (bits) {
     case 2: {
       switch (group_size) {
         case 64:
-          return _qmm_t<T, 2, 64>(result, x, w, scales, biases, M, N, K);
+          return _qmm_t_dispatch_shape<T, 2, 64>(
+              result, x, w, scales, biases, M, N, K);
         case 128:
-          return _qmm_t<T, 2, 128>(result, x, w, scales, biases, M, N, K);
+          return _qmm_t_dispatch_shape<T, 2, 128>(
+              result, x, w, scales, biases, M, N, K);
       }
     }
     case 4: {
       switch (group_size) {
         case 64:
-          return _qmm_t<T, 4, 64>(result, x, w, scales, biases, M, N, K);
+          return _qmm_t_dispatch_shape<T, 4, 64>(
+              result, x, w, scales, biases, M, N, K);
         case 128:
-          return _qmm_t<T, 4, 128>(result, x, w, scales, biases, M, N, K);
+          return _qmm_t_dispatch_shape<T, 4, 128>(
+              result, x, w, scales, biases, M, N, K);
       }
     }
     case 8: {
       switch (group_size) {
         case 64:
-          return _qmm_t<T, 8, 64>(result, x, w, scales, biases, M, N, K);
+          return _qmm_t_dispatch_shape<T, 8, 64>(
+              result, x, w, scales, biases, M, N, K);
         case 128:
-          return _qmm_t<T, 8, 128>(result, x, w, scales, biases, M, N, K);
+          return _qmm_t_dispatch_shape<T, 8, 128>(
+              result, x, w, scales, biases, M, N, K);
       }
     }
   }
@@ -178,7 +344,7 @@ void QuantizedMatmul::eval(const std::vector<array>& inputs, array& out) {
   }
 
   out.set_data(allocator::malloc_or_wait(out.nbytes()));
-  _qmm_t_dispatch(out, x, w, scales, biases, group_size_, bits_);
+  _qmm_t_dispatch(out, x, w, scales, biases, bits_, group_size_);
 }
 
 } // namespace mlx::core
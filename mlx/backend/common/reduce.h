@@ -2,6 +2,7 @@
 
 #pragma once
 
+#include "mlx/backend/common/threading.h"
 #include "mlx/backend/common/utils.h"
 
 namespace mlx::core {
@@ -219,6 +220,95 @@ ReductionPlan get_reduction_plan(const array& x, const std::vector<int> axes) {
   return ReductionPlan(GeneralReduce, shape, strides);
 }
 
+// Reductions are accumulated in blocks of a fixed size and the partial results
+// of the blocks are combined pairwise. The blocks do not depend on the number
+// of threads so the results are deterministic, and the pairwise combination
+// keeps the error of large floating point sums small.
+constexpr int reduce_block_size = 4096;
+constexpr int strided_reduce_block_rows = 256;
+
+// Combine n consecutive partial results of size stride in place so that the
+// first stride elements hold the final result.
+template <typename U, typename Op>
+void pairwise_combine(U* partials, int n, size_t stride, Op& op) {
+  for (int step = 1; step < n; step *= 2) {
+    for (int i = 0; i + step < n; i += 2 * step) {
+      U* dst = partials + i * stride;
+      const U* src = partials + (i + step) * stride;
+      for (size_t j = 0; j < stride; j++) {
+        op(dst + j, src[j]);
+      }
+    }
+  }
+}
+
+// Reduce size contiguous elements into out
+template <typename T, typename U, typename OpC, typename Op>
+void contiguous_reduce(const T* x, U* out, int size, U init, OpC& opc, Op& op) {
+  int n_blocks = (size + reduce_block_size - 1) / reduce_block_size;
+  if (n_blocks <= 1) {
+    *out = init;
+    opc(x, out, size);
+    return;
+  }
+  auto buffer = allocator::malloc_or_wait(n_blocks * sizeof(U));
+  U* partials = static_cast<U*>(buffer.raw_ptr());
+  threading::parallel_for(
+      n_blocks,
+      [&](size_t start, size_t end) {
+        for (size_t i = start; i < end; i++) {
+          int offset = i * reduce_block_size;
+          partials[i] = init;
+          opc(x + offset,
+              &partials[i],
+              std::min(reduce_block_size, size - offset));
+        }
+      },
+      reduce_block_size);
+  pairwise_combine(partials, n_blocks, 1, op);
+  *out = partials[0];
+  allocator::free(buffer);
+}
+
+// Reduce size rows of stride contiguous elements into the stride elements of
+// out
+template <typename T, typename U, typename OpS, typename Op>
+void strided_reduce(
+    const T* x,
+    U* out,
+    int size,
+    size_t stride,
+    U init,
+    OpS& ops,
+    Op& op) {
+  int n_blocks =
+      (size + strided_reduce_block_rows - 1) / strided_reduce_block_rows;
+  if (n_blocks <= 1) {
+    std::fill_n(out, stride, init);
+    ops(x, out, size, stride);
+    return;
+  }
+  auto buffer = allocator::malloc_or_wait(n_blocks * stride * sizeof(U));
+  U* partials = static_cast<U*>(buffer.raw_ptr());
+  threading::parallel_for(
+      n_blocks,
+      [&](size_t start, size_t end) {
+        for (size_t i = start; i < end; i++) {
+          int row = i * strided_reduce_block_rows;
+          U* accumulator = partials + i * stride;
+          std::fill_n(accumulator, stride, init);
+          ops(x + row * stride,
+              accumulator,
+              std::min(strided_reduce_block_rows, size - row),
+              stride);
+        }
+      },
+      strided_reduce_block_rows * stride);
+  pairwise_combine(partials, n_blocks, stride, op);
+  std::copy(partials, partials + stride, out);
+  allocator::free(buffer);
+}
+
 template <typename T, typename U, typename OpS, typename OpC, typename Op>
 void reduction_op(
     const array& x,
@@ -232,23 +322,35 @@ void reduction_op(
   ReductionPlan plan = get_reduction_plan(x, axes);
 
   if (plan.type == ContiguousAllReduce) {
-    U* out_ptr = out.data<U>();
-    *out_ptr = init;
-    opc(x.data<T>(), out_ptr, x.size());
+    contiguous_reduce(x.data<T>(), out.data<U>(), x.size(), init, opc, op);
     return;
   }
 
   std::vector<int> shape;
   std::vector<size_t> strides;
 
+  // The outputs are independent so they are split across threads. The work
+  // per output is used to decide whether it is worth it.
+  size_t output_work = out.size() > 0 ? x.size() / out.size() : 0;
+
   if (plan.type == ContiguousReduce && plan.shape.size() == 1) {
     int reduction_size = plan.shape[0];
     const T* x_ptr = x.data<T>();
     U* out_ptr = out.data<U>();
-    for (int i = 0; i < out.size(); i++, out_ptr++, x_ptr += reduction_size) {
-      *out_ptr = init;
-      opc(x_ptr, out_ptr, reduction_size);
-    }
+    threading::parallel_for(
+        out.size(),
+        [&](size_t start, size_t end) {
+          for (size_t i = start; i < end; i++) {
+            contiguous_reduce(
+                x_ptr + i * reduction_size,
+                out_ptr + i,
+                reduction_size,
+                init,
+                opc,
+                op);
+          }
+        },
+        output_work);
     return;
   }
 
@@ -262,22 +364,34 @@ void reduction_op(
     // ContiguousReduce) should hold extra performance boost.
     std::tie(shape, strides) = shapes_without_reduction_axes(x, axes);
     if (plan.shape.size() == 0) {
-      for (int i = 0; i < out.size(); i++, out_ptr++) {
-        int offset = elem_to_loc(i, shape, strides);
-        *out_ptr = init;
-        opc(x_ptr + offset, out_ptr, reduction_size);
-      }
+      threading::parallel_for(
+          out.size(),
+          [&](size_t start, size_t end) {
+            for (size_t i = start; i < end; i++) {
+              int offset = elem_to_loc(i, shape, strides);
+              contiguous_reduce(
+                  x_ptr + offset, out_ptr + i, reduction_size, init, opc, op);
+            }
+          },
+          output_work);
     } else {
-      for (int i = 0; i < out.size(); i++, out_ptr++) {
-        int offset = elem_to_loc(i, shape, strides);
-        *out_ptr = init;
-        nd_loop(
-            [&](int extra_offset) {
-              opc(x_ptr + offset + extra_offset, out_ptr, reduction_size);
-            },
-            plan.shape,
-            plan.strides);
-      }
+      threading::parallel_for(
+          out.size(),
+          [&](size_t start, size_t end) {
+            for (size_t i = start; i < end; i++) {
+              int offset = elem_to_loc(i, shape, strides);
+              out_ptr[i] = init;
+              nd_loop(
+                  [&](int extra_offset) {
+                    opc(x_ptr + offset + extra_offset,
+                        out_ptr + i,
+                        reduction_size);
+                  },
+                  plan.shape,
+                  plan.strides);
+            }
+          },
+          output_work);
     }
     return;
   }
@@ -289,12 +403,21 @@ void reduction_op(
     plan.strides.pop_back();
     const T* x_ptr = x.data<T>();
     U* out_ptr = out.data<U>();
-    for (int i = 0; i < out.size(); i += reduction_stride) {
-      std::fill_n(out_ptr, reduction_stride, init);
-      ops(x_ptr, out_ptr, reduction_size, reduction_stride);
-      x_ptr += reduction_stride * reduction_size;
-      out_ptr += reduction_stride;
-    }
+    threading::parallel_for(
+        out.size() / reduction_stride,
+        [&](size_t start, size_t end) {
+          for (size_t i = start; i < end; i++) {
+            strided_reduce(
+                x_ptr + i * reduction_stride * reduction_size,
+                out_ptr + i * reduction_stride,
+                reduction_size,
+                reduction_stride,
+                init,
+                ops,
+                op);
+          }
+        },
+        output_work * reduction_stride);
     return;
   }
 
@@ -308,27 +431,42 @@ void reduction_op(
     U* out_ptr = out.data<U>();
     std::tie(shape, strides) = shapes_without_reduction_axes(x, axes);
     if (plan.shape.size() == 0) {
-      for (int i = 0; i < out.size(); i += reduction_stride) {
-        int offset = elem_to_loc(i, shape, strides);
-        std::fill_n(out_ptr, reduction_stride, init);
-        ops(x_ptr + offset, out_ptr, reduction_size, reduction_stride);
-        out_ptr += reduction_stride;
-      }
-    } else {
-      for (int i = 0; i < out.size(); i += reduction_stride) {
-        int offset = elem_to_loc(i, shape, strides);
-        std::fill_n(out_ptr, reduction_stride, init);
-        nd_loop(
-            [&](int extra_offset) {
-              ops(x_ptr + offset + extra_offset,
-                  out_ptr,
+      threading::parallel_for(
+          out.size() / reduction_stride,
+          [&](size_t start, size_t end) {
+            for (size_t i = start; i < end; i++) {
+              int offset = elem_to_loc(i * reduction_stride, shape, strides);
+              strided_reduce(
+                  x_ptr + offset,
+                  out_ptr + i * reduction_stride,
                   reduction_size,
-                  reduction_stride);
-            },
-            plan.shape,
-            plan.strides);
-        out_ptr += reduction_stride;
-      }
+                  reduction_stride,
+                  init,
+                  ops,
+                  op);
+            }
+          },
+          output_work * reduction_stride);
+    } else {
+      threading::parallel_for(
+          out.size() / reduction_stride,
+          [&](size_t start, size_t end) {
+            for (size_t i = start; i < end; i++) {
+              int offset = elem_to_loc(i * reduction_stride, shape, strides);
+              U* accumulator = out_ptr + i * reduction_stride;
+              std::fill_n(accumulator, reduction_stride, init);
+              nd_loop(
+                  [&](int extra_offset) {
+                    ops(x_ptr + offset + extra_offset,
+                        accumulator,
+                        reduction_size,
+                        reduction_stride);
+                  },
+                  plan.shape,
+                  plan.strides);
+            }
+          },
+          output_work * reduction_stride);
     }
     return;
   }
@@ -337,15 +475,22 @@ void reduction_op(
     const T* x_ptr = x.data<T>();
     U* out_ptr = out.data<U>();
     std::tie(shape, strides) = shapes_without_reduction_axes(x, axes);
-    for (int i = 0; i < out.size(); i++, out_ptr++) {
-      int offset = elem_to_loc(i, shape, strides);
-      U val = init;
-      nd_loop(
-          [&](int extra_offset) { op(&val, *(x_ptr + offset + extra_offset)); },
-          plan.shape,
-          plan.strides);
-      *out_ptr = val;
-    }
+    threading::parallel_for(
+        out.size(),
+        [&](size_t start, size_t end) {
+          for (size_t i = start; i < end; i++) {
+            int offset = elem_to_loc(i, shape, strides);
+            U val = init;
+            nd_loop(
+                [&](int extra_offset) {
+                  op(&val, *(x_ptr + offset + extra_offset));
+                },
+                plan.shape,
+                plan.strides);
+            out_ptr[i] = val;
+          }
+        },
+        output_work);
   }
 }
 
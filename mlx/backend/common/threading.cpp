@@ -0,0 +1,477 @@
+// Copyright © 2023 Apple Inc.
+
+#include <atomic>
+#include <cstdlib>
+#include <exception>
+#include <fstream>
+#include <memory>
+#include <numeric>
+#include <sstream>
+
+#ifdef __linux__
+#include <pthread.h>
+#include <sched.h>
+#endif
+
+#include "mlx/backend/common/threading.h"
+#include "mlx/scheduler.h"
+
+namespace mlx::core {
+
+namespace threading {
+
+namespace {
+
+// Set in the pool workers so that nested parallel regions run serially
+thread_local ThreadPool* current_pool = nullptr;
+
+int default_num_threads() {
+  if (auto env = std::getenv("MLX_NUM_THREADS"); env != nullptr) {
+    int n = std::atoi(env);
+    if (n > 0) {
+      return n;
+    }
+  }
+  return std::max(1u, std::thread::hardware_concurrency());
+}
+
+int default_max_concurrency() {
+  if (auto env = std::getenv("MLX_MAX_CONCURRENCY"); env != nullptr) {
+    int n = std::atoi(env);
+    if (n > 0) {
+      return n;
+    }
+  }
+  return 4;
+}
+
+// Parse a list of cores or nodes such as 0-3,8,10-11
+std::vector<int> parse_list(const std::string& list) {
+  std::vector<int> out;
+  std::istringstream ss(list);
+  std::string range;
+  while (std::getline(ss, range, ',')) {
+    if (range.empty()) {
+      continue;
+    }
+    auto dash = range.find('-');
+    int first = std::stoi(range.substr(0, dash));
+    int last =
+        dash == std::string::npos ? first : std::stoi(range.substr(dash + 1));
+    for (int i = first; i <= last; i++) {
+      out.push_back(i);
+    }
+  }
+  return out;
+}
+
+// The contents of a file of the sysfs, empty if it does not exist
+std::string read_sysfs(const std::string& path) {
+  std::ifstream f(path);
+  std::string contents;
+  std::getline(f, contents);
+  return contents;
+}
+
+// The node of every core, empty on hosts with a single node
+const std::vector<int>& cpu_nodes() {
+  static std::vector<int> cpu_nodes_ = []() {
+    std::vector<int> nodes;
+    int n_nodes = get_num_numa_nodes();
+    if (n_nodes <= 1) {
+      return nodes;
+    }
+    for (int node = 0; node < n_nodes; node++) {
+      for (auto cpu : get_numa_node_cpus(node)) {
+        if (cpu >= nodes.size()) {
+          nodes.resize(cpu + 1, 0);
+        }
+        nodes[cpu] = node;
+      }
+    }
+    return nodes;
+  }();
+  return cpu_nodes_;
+}
+
+// The state shared between the caller of ThreadPool::run and the workers
+// helping it. Tasks are claimed from an atomic counter so it does not matter
+// how many (if any) of the helpers actually get to run.
+struct ParallelRegion {
+  const std::function<void(int)>* fn;
+  int n_tasks;
+  std::atomic<int> next{0};
+  std::atomic<int> done{0};
+  std::mutex mtx;
+  std::condition_variable cond;
+  std::exception_ptr error{nullptr};
+
+  ParallelRegion(const std::function<void(int)>* fn, int n_tasks)
+      : fn(fn), n_tasks(n_tasks) {}
+
+  void work() {
+    int i;
+    while ((i = next.fetch_add(1)) < n_tasks) {
+      try {
+        (*fn)(i);
+      } catch (...) {
+        std::unique_lock<std::mutex> lk(mtx);
+        if (!error) {
+          error = std::current_exception();
+        }
+      }
+      if (done.fetch_add(1) + 1 == n_tasks) {
+        std::unique_lock<std::mutex> lk(mtx);
+        cond.notify_all();
+      }
+    }
+  }
+
+  void wait() {
+    std::unique_lock<std::mutex> lk(mtx);
+    cond.wait(lk, [this] { return done.load() == n_tasks; });
+  }
+};
+
+// The state shared between the caller of ThreadPool::run_graph and the
+// workers running its nodes. A node is ready once its pending count, the
+// number of its inputs plus one for the caller's wait, drops to zero.
+struct TaskGraph : public std::enable_shared_from_this<TaskGraph> {
+  ThreadPool& pool;
+  const std::vector<std::vector<int>>* outputs;
+  const std::function<void(int)>* fn;
+  std::vector<int> pending;
+  std::queue<int> ready;
+  int n_done{0};
+  std::mutex mtx;
+  std::condition_variable cond;
+  std::exception_ptr error{nullptr};
+
+  TaskGraph(
+      ThreadPool& pool,
+      const std::vector<std::vector<int>>* outputs,
+      const std::function<void(int)>* fn,
+      std::vector<int> pending)
+      : pool(pool), outputs(outputs), fn(fn), pending(std::move(pending)) {}
+
+  // Must be called with the lock held
+  void release(int i) {
+    if (--pending[i] == 0) {
+      ready.push(i);
+    }
+  }
+
+  // Run a ready node and release its outputs. Must be called with the lock
+  // held and returns with it held.
+  void run_one(std::unique_lock<std::mutex>& lk) {
+    int i = ready.front();
+    ready.pop();
+    bool failed = error != nullptr;
+    lk.unlock();
+    if (!failed) {
+      try {
+        (*fn)(i);
+      } catch (...) {
+        lk.lock();
+        if (!error) {
+          error = std::current_exception();
+        }
+        lk.unlock();
+      }
+    }
+    lk.lock();
+    n_done++;
+    auto n_ready = ready.size();
+    for (auto j : (*outputs)[i]) {
+      release(j);
+    }
+    // The current thread keeps running one of the new ready nodes
+    if (ready.size() > n_ready) {
+      dispatch(ready.size() - n_ready - 1);
+    } else {
+      cond.notify_all();
+    }
+  }
+
+  // Ask the workers to help with n_helpers more ready nodes and wake up the
+  // caller
+  void dispatch(size_t n_helpers) {
+    for (size_t k = 0; k < n_helpers; k++) {
+      pool.enqueue([graph = shared_from_this()]() { graph->work(); });
+    }
+    cond.notify_all();
+  }
+
+  void work() {
+    std::unique_lock<std::mutex> lk(mtx);
+    while (!ready.empty()) {
+      run_one(lk);
+    }
+  }
+};
+
+} // namespace
+
+ThreadPool::ThreadPool(int n_threads) : n_threads_(1), stop_(false) {
+  start(n_threads);
+}
+
+ThreadPool::~ThreadPool() {
+  stop();
+}
+
+void ThreadPool::start(int n_threads) {
+  stop_ = false;
+  n_threads_ = n_threads;
+  // The calling thread is always one of the threads
+  for (int i = 1; i < n_threads; i++) {
+    workers_.emplace_back(&ThreadPool::thread_fn, this);
+    if (!affinity_.empty()) {
+      threading::set_affinity(workers_.back(), affinity_);
+    }
+  }
+}
+
+void ThreadPool::stop() {
+  {
+    std::unique_lock<std::mutex> lk(mtx_);
+    stop_ = true;
+  }
+  cond_.notify_all();
+  for (auto& w : workers_) {
+    w.join();
+  }
+  workers_.clear();
+}
+
+void ThreadPool::resize(int n_threads) {
+  if (n_threads < 1) {
+    std::ostringstream msg;
+    msg << "[set_num_threads] The number of threads must be positive but got "
+        << n_threads << ".";
+    throw std::invalid_argument(msg.str());
+  }
+  if (n_threads == n_threads_) {
+    return;
+  }
+  stop();
+  start(n_threads);
+}
+
+void ThreadPool::set_affinity(const std::vector<int>& cpus) {
+  std::unique_lock<std::mutex> lk(mtx_);
+  for (auto& w : workers_) {
+    threading::set_affinity(w, cpus);
+  }
+  affinity_ = cpus;
+}
+
+void ThreadPool::thread_fn() {
+  current_pool = this;
+  while (true) {
+    std::function<void()> task;
+    {
+      std::unique_lock<std::mutex> lk(mtx_);
+      cond_.wait(lk, [this] { return !q_.empty() || stop_; });
+      if (q_.empty() && stop_) {
+        return;
+      }
+      task = std::move(q_.front());
+      q_.pop();
+    }
+    task();
+  }
+}
+
+void ThreadPool::run(int n_tasks, const std::function<void(int)>& fn) {
+  if (n_tasks <= 0) {
+    return;
+  }
+  if (n_tasks == 1 || n_threads_ == 1 || current_pool == this) {
+    for (int i = 0; i < n_tasks; i++) {
+      fn(i);
+    }
+    return;
+  }
+
+  auto region = std::make_shared<ParallelRegion>(&fn, n_tasks);
+  int n_helpers = std::min<int>(n_tasks, n_threads_) - 1;
+  {
+    std::unique_lock<std::mutex> lk(mtx_);
+    for (int i = 0; i < n_helpers; i++) {
+      q_.emplace([region]() { region->work(); });
+    }
+  }
+  cond_.notify_all();
+
+  region->work();
+  region->wait();
+  if (region->error) {
+    std::rethrow_exception(region->error);
+  }
+}
+
+void ThreadPool::run_graph(
+    const std::vector<std::vector<int>>& outputs,
+    const std::vector<int>& n_inputs,
+    const std::function<void(int)>& wait,
+    const std::function<void(int)>& fn) {
+  int n_nodes = n_inputs.size();
+  if (n_nodes == 1 || n_threads_ == 1 || current_pool == this) {
+    for (int i = 0; i < n_nodes; i++) {
+      wait(i);
+      fn(i);
+    }
+    return;
+  }
+
+  std::vector<int> pending(n_nodes);
+  for (int i = 0; i < n_nodes; i++) {
+    pending[i] = n_inputs[i] + 1;
+  }
+  auto graph =
+      std::make_shared<TaskGraph>(*this, &outputs, &fn, std::move(pending));
+  for (int i = 0; i < n_nodes; i++) {
+    wait(i);
+    std::unique_lock<std::mutex> lk(graph->mtx);
+    auto n_ready = graph->ready.size();
+    graph->release(i);
+    graph->dispatch(graph->ready.size() - n_ready);
+  }
+
+  std::unique_lock<std::mutex> lk(graph->mtx);
+  while (graph->n_done < n_nodes) {
+    if (graph->ready.empty()) {
+      graph->cond.wait(lk);
+    } else {
+      graph->run_one(lk);
+    }
+  }
+  if (graph->error) {
+    std::rethrow_exception(graph->error);
+  }
+}
+
+void ThreadPool::enqueue(std::function<void()> task) {
+  {
+    std::unique_lock<std::mutex> lk(mtx_);
+    q_.emplace(std::move(task));
+  }
+  cond_.notify_one();
+}
+
+void set_affinity(std::thread& thread, const std::vector<int>& cpus) {
+#ifdef __linux__
+  cpu_set_t set;
+  CPU_ZERO(&set);
+  for (auto cpu : cpus) {
+    if (cpu < 0 || cpu >= CPU_SETSIZE) {
+      std::ostringstream msg;
+      msg << "[set_affinity] Invalid core " << cpu << ".";
+      throw std::invalid_argument(msg.str());
+    }
+    CPU_SET(cpu, &set);
+  }
+  if (cpus.empty()) {
+    for (int cpu = 0; cpu < CPU_SETSIZE; cpu++) {
+      CPU_SET(cpu, &set);
+    }
+  }
+  if (pthread_setaffinity_np(thread.native_handle(), sizeof(set), &set) != 0) {
+    throw std::invalid_argument(
+        "[set_affinity] Unable to pin the thread to the cores.");
+  }
+#else
+  throw std::runtime_error(
+      "[set_affinity] Thread affinity is only supported on Linux.");
+#endif
+}
+
+int current_numa_node() {
+  auto& nodes = cpu_nodes();
+  if (nodes.empty()) {
+    return 0;
+  }
+#ifdef __linux__
+  int cpu = sched_getcpu();
+  return (cpu >= 0 && cpu < nodes.size()) ? nodes[cpu] : 0;
+#else
+  return 0;
+#endif
+}
+
+ThreadPool& thread_pool() {
+  static ThreadPool pool_(default_num_threads());
+  return pool_;
+}
+
+ThreadPool& task_pool() {
+  static ThreadPool pool_(default_max_concurrency());
+  return pool_;
+}
+
+} // namespace threading
+
+void set_num_threads(int n_threads) {
+  threading::thread_pool().resize(n_threads);
+}
+
+int get_num_threads() {
+  return threading::thread_pool().size();
+}
+
+void set_max_concurrency(int max_concurrency) {
+  if (max_concurrency < 1) {
+    std::ostringstream msg;
+    msg << "[set_max_concurrency] The maximum concurrency must be positive "
+        << "but got " << max_concurrency << ".";
+    throw std::invalid_argument(msg.str());
+  }
+  threading::task_pool().resize(max_concurrency);
+}
+
+int get_max_concurrency() {
+  return threading::task_pool().size();
+}
+
+void set_stream_affinity(const Stream& s, const std::vector<int>& cpus) {
+  if (s.device != Device::cpu) {
+    throw std::invalid_argument(
+        "[set_stream_affinity] Only CPU streams can be pinned to cores.");
+  }
+  scheduler::scheduler().set_affinity(s, cpus);
+}
+
+void set_thread_pool_affinity(const std::vector<int>& cpus) {
+  threading::thread_pool().set_affinity(cpus);
+  threading::task_pool().set_affinity(cpus);
+}
+
+int get_num_numa_nodes() {
+  static int n_nodes = []() {
+    auto nodes = threading::parse_list(
+        threading::read_sysfs("/sys/devices/system/node/online"));
+    return nodes.empty() ? 1 : nodes.back() + 1;
+  }();
+  return n_nodes;
+}
+
+std::vector<int> get_numa_node_cpus(int node) {
+  if (node < 0 || node >= get_num_numa_nodes()) {
+    std::ostringstream msg;
+    msg << "[get_numa_node_cpus] Invalid node " << node << " for a host with "
+        << get_num_numa_nodes() << " nodes.";
+    throw std::invalid_argument(msg.str());
+  }
+  auto cpus = threading::parse_list(
+      threading::read_sysfs(
+          "/sys/devices/system/node/node" + std::to_string(node) + "/cpulist"));
+  if (cpus.empty()) {
+    // Hosts without the sysfs have a single node with every core
+    cpus.resize(std::max(1u, std::thread::hardware_concurrency()));
+    std::iota(cpus.begin(), cpus.end(), 0);
+  }
+  return cpus;
+}
+
+} // namespace mlx::core
@@ -0,0 +1,179 @@
+// Copyright © 2023 Apple Inc.
+
+#pragma once
+
+#include <algorithm>
+#include <condition_variable>
+#include <functional>
+#include <mutex>
+#include <queue>
+#include <thread>
+#include <vector>
+
+#include "mlx/stream.h"
+
+namespace mlx::core {
+
+/**
+ * Set the number of threads used to parallelize a single CPU primitive.
+ *
+ * The default is read from the ``MLX_NUM_THREADS`` environment variable and
+ * falls back to the number of hardware threads. A value of 1 disables
+ * intra-op parallelism.
+ */
+void set_num_threads(int n_threads);
+
+/** Get the number of threads used to parallelize a single CPU primitive. */
+int get_num_threads();
+
+/**
+ * Set the maximum number of independent CPU primitives of a stream which are
+ * evaluated at the same time.
+ *
+ * The default is read from the ``MLX_MAX_CONCURRENCY`` environment variable
+ * and falls back to 4. A value of 1 evaluates the primitives of a stream one
+ * at a time.
+ */
+void set_max_concurrency(int max_concurrency);
+
+/** Get the maximum number of CPU primitives of a stream run concurrently. */
+int get_max_concurrency();
+
+/**
+ * Pin the thread of a CPU stream to the given cores. An empty list lets the
+ * thread run on any core. Buffers are placed on the memory of the NUMA node
+ * of the thread which first writes them, so the outputs of the stream are
+ * then allocated on the node of its cores. Only supported on Linux.
+ */
+void set_stream_affinity(const Stream& s, const std::vector<int>& cpus);
+
+/**
+ * Pin the workers which parallelize CPU primitives and run them concurrently
+ * to the given cores. The workers are shared by all the CPU streams. An
+ * empty list lets the workers run on any core. Only supported on Linux.
+ */
+void set_thread_pool_affinity(const std::vector<int>& cpus);
+
+/** Get the number of NUMA nodes of the host. */
+int get_num_numa_nodes();
+
+/** Get the cores of a NUMA node. */
+std::vector<int> get_numa_node_cpus(int node);
+
+namespace threading {
+
+// Work smaller than this many elements is run serially on the calling thread
+constexpr size_t min_parallel_size = 1 << 15;
+
+class ThreadPool {
+  /** A pool of workers shared by all CPU streams for intra-op parallelism. */
+ public:
+  explicit ThreadPool(int n_threads);
+  ~ThreadPool();
+
+  // Not copyable or moveable
+  ThreadPool(const ThreadPool&) = delete;
+  ThreadPool(ThreadPool&&) = delete;
+  ThreadPool& operator=(const ThreadPool&) = delete;
+  ThreadPool& operator=(ThreadPool&&) = delete;
+
+  /** The number of threads including the calling thread. */
+  int size() const {
+    return n_threads_;
+  }
+
+  void resize(int n_threads);
+
+  /** Pin the workers to the cores, or let them run anywhere if empty. */
+  void set_affinity(const std::vector<int>& cpus);
+
+  /**
+   * Run fn(i) for i in [0, n_tasks) and return when all calls are done.
+   *
+   * The calling thread participates so the work always makes progress even
+   * if every worker is busy. Calls from inside a worker of the pool run
+   * serially. The first exception thrown by a task is rethrown on the
+   * calling thread.
+   */
+  void run(int n_tasks, const std::function<void(int)>& fn);
+
+  /**
+   * Run fn(i) for every node i of a graph and return when all calls are done.
+   *
+   * The nodes are given in topological order and outputs[i] lists the nodes
+   * which use node i. fn(i) is called once fn was called for all of the
+   * n_inputs[i] inputs of node i and wait(i) returned. The calling thread
+   * calls wait in order of the nodes and then helps running them, so wait
+   * can block on work outside of the graph without stalling the workers.
+   * The first exception thrown by fn is rethrown on the calling thread and
+   * the remaining nodes are skipped.
+   */
+  void run_graph(
+      const std::vector<std::vector<int>>& outputs,
+      const std::vector<int>& n_inputs,
+      const std::function<void(int)>& wait,
+      const std::function<void(int)>& fn);
+
+  /** Run a task on one of the workers. */
+  void enqueue(std::function<void()> task);
+
+ private:
+  void start(int n_threads);
+  void stop();
+  void thread_fn();
+
+  int n_threads_;
+  bool stop_;
+  std::vector<int> affinity_;
+  std::vector<std::thread> workers_;
+  std::queue<std::function<void()>> q_;
+  std::mutex mtx_;
+  std::condition_variable cond_;
+};
+
+// Pin a thread to the cores, or let it run on any core if cpus is empty
+void set_affinity(std::thread& thread, const std::vector<int>& cpus);
+
+// The NUMA node of the core the calling thread runs on
+int current_numa_node();
+
+ThreadPool& thread_pool();
+
+/**
+ * A pool of workers which evaluate independent primitives of a CPU stream
+ * concurrently. Primitives run on it can still use thread_pool().
+ */
+ThreadPool& task_pool();
+
+/**
+ * Split the range [0, size) in contiguous chunks and call fn(start, end) for
+ * each of them on the thread pool. The optional work_per_item is the number
+ * of elements each item of the range corresponds to (e.g. the size of a row)
+ * and is used to decide whether the work is large enough to be split.
+ */
+template <typename F>
+void parallel_for(size_t size, F&& fn, size_t work_per_item = 1) {
+  auto& pool = thread_pool();
+  size_t n_chunks = std::min(
+      {static_cast<size_t>(pool.size()),
+       size,
+       size * work_per_item / min_parallel_size});
+  if (n_chunks <= 1) {
+    if (size > 0) {
+      fn(size_t(0), size);
+    }
+    return;
+  }
+  size_t chunk_size = (size + n_chunks - 1) / n_chunks;
+  pool.run(n_chunks, [&fn, size, chunk_size](int i) {
+    size_t start = i * chunk_size;
+    size_t end = std::min(size, start + chunk_size);
+    if (start < end) {
+      fn(start, end);
+    }
+  });
+}
+
+} // namespace threading
+
+} // namespace mlx::core
@@ -4,6 +4,7 @@
 
 #include "mlx/allocator.h"
 #include "mlx/array.h"
+#include "mlx/backend/common/threading.h"
 #include "mlx/backend/common/utils.h"
 #include "mlx/utils.h"
 
@@ -68,23 +69,32 @@ template <typename T, typename Op>
 void unary_op(const array& a, array& out, Op op) {
   const T* a_ptr = a.data<T>();
   if (a.flags().contiguous) {
-    out.set_data(
-        allocator::malloc_or_wait(a.data_size() * out.itemsize()),
-        a.data_size(),
-        a.strides(),
-        a.flags());
-    T* dst = out.data<T>();
-    for (size_t i = 0; i < a.data_size(); ++i) {
-      dst[i] = op(a_ptr[i]);
+    if (a.is_donatable() && a.itemsize() == out.itemsize()) {
+      // Write the output in place of the input
+      out.move_shared_buffer(a);
+    } else {
+      out.set_data(
+          allocator::malloc_or_wait(a.data_size() * out.itemsize()),
+          a.data_size(),
+          a.strides(),
+          a.flags());
     }
+    T* dst = out.data<T>();
+    threading::parallel_for(a.data_size(), [&](size_t start, size_t end) {
+      for (size_t i = start; i < end; ++i) {
+        dst[i] = op(a_ptr[i]);
+      }
+    });
   } else {
     out.set_data(allocator::malloc_or_wait(out.nbytes()));
     T* dst = out.data<T>();
-    for (size_t i = 0; i < out.size(); ++i) {
-      // TODO this is super inefficient, need to fix.
-      int a_idx = elem_to_loc(i, a.shape(), a.strides());
-      dst[i] = op(a_ptr[a_idx]);
-    }
+    threading::parallel_for(out.size(), [&](size_t start, size_t end) {
+      for (size_t i = start; i < end; ++i) {
+        // TODO this is super inefficient, need to fix.
+        int a_idx = elem_to_loc(i, a.shape(), a.strides());
+        dst[i] = op(a_ptr[a_idx]);
+      }
+    });
   }
 }
 
@@ -2,6 +2,7 @@
 
 #pragma once
 
+#include <tuple>
 #include <vector>
 
 #include "mlx/array.h"
@@ -28,4 +29,43 @@ inline size_t elem_to_loc(int elem, const array& a) {
   return elem_to_loc(elem, a.shape(), a.strides());
 }
 
+// Collapse the dims which are contiguous for all of the strides and drop the
+// dims of size 1, e.g. the shape {2, 1, 3, 4} with the strides {12, 12, 4, 1}
+// and {24, 24, 8, 1} becomes {6, 4} with the strides {4, 1} and {8, 1}. At
+// least one dim is returned.
+inline std::tuple<std::vector<int>, std::vector<std::vector<size_t>>>
+collapse_contiguous_dims(
+    const std::vector<int>& shape,
+    const std::vector<std::vector<size_t>>& strides) {
+  std::vector<int> out_shape;
+  std::vector<std::vector<size_t>> out_strides(strides.size());
+  for (int i = 0; i < shape.size(); i++) {
+    if (shape[i] == 1) {
+      continue;
+    }
+    bool contiguous = !out_shape.empty();
+    for (int j = 0; j < strides.size() && contiguous; j++) {
+      contiguous = out_strides[j].back() == strides[j][i] * shape[i];
+    }
+    if (contiguous) {
+      out_shape.back() *= shape[i];
+      for (int j = 0; j < strides.size(); j++) {
+        out_strides[j].back() = strides[j][i];
+      }
+    } else {
+      out_shape.push_back(shape[i]);
+      for (int j = 0; j < strides.size(); j++) {
+        out_strides[j].push_back(strides[j][i]);
+      }
+    }
+  }
+  if (out_shape.empty()) {
+    out_shape.push_back(1);
+    for (auto& st : out_strides) {
+      st.push_back(0);
+    }
+  }
+  return std::make_tuple(out_shape, out_strides);
+}
+
 } // namespace mlx::core
@@ -110,6 +110,18 @@ size_t BufferCache::release_cached_buffers(size_t min_bytes_to_free) {
   }
 }
 
+void BufferCache::trim(size_t max_size) {
+  std::lock_guard<std::mutex> lk(cache_mutex_);
+  while (tail_ && pool_size_ > max_size) {
+    if (tail_->buf) {
+      pool_size_ -= tail_->buf->length();
+      tail_->buf->release();
+      tail_->buf = nullptr;
+    }
+    remove_from_list(tail_);
+  }
+}
+
 void BufferCache::add_at_head(BufferCache::BufferHolder* to_add) {
   if (!to_add)
     return;
@@ -152,8 +164,10 @@ void BufferCache::remove_from_list(BufferCache::BufferHolder* to_remove) {
 MetalAllocator::MetalAllocator()
     : device_(device(mlx::core::Device::gpu).mtl_device()),
       buffer_cache_(device_),
-      peak_allocated_size_(0),
-      block_limit_(1.5 * device_->recommendedMaxWorkingSetSize()) {}
+      active_memory_(0),
+      peak_memory_(0),
+      block_limit_(1.5 * device_->recommendedMaxWorkingSetSize()),
+      cache_limit_(block_limit_) {}
 
 Buffer MetalAllocator::malloc(size_t size) {
   // Align up memory
@@ -181,15 +195,59 @@ Buffer MetalAllocator::malloc(size_t size) {
     buf = device_->newBuffer(size, res_opt);
   }
 
-  peak_allocated_size_ =
-      std::max(peak_allocated_size_, device_->currentAllocatedSize());
+  if (buf) {
+    std::lock_guard<std::mutex> lk(stats_mutex_);
+    active_memory_ += buf->length();
+    peak_memory_ = std::max(peak_memory_, active_memory_);
+  }
 
   return Buffer{static_cast<void*>(buf)};
 }
 
 void MetalAllocator::free(Buffer buffer) {
   auto buf = static_cast<MTL::Buffer*>(buffer.ptr());
+  if (!buf) {
+    return;
+  }
+  size_t cache_limit;
+  {
+    std::lock_guard<std::mutex> lk(stats_mutex_);
+    active_memory_ -= buf->length();
+    cache_limit = cache_limit_;
+  }
   buffer_cache_.recycle_to_cache(buf);
+  if (buffer_cache_.cache_size() > cache_limit) {
+    buffer_cache_.trim(cache_limit);
+  }
+}
+
+size_t MetalAllocator::get_active_memory() {
+  std::lock_guard<std::mutex> lk(stats_mutex_);
+  return active_memory_;
+}
+
+size_t MetalAllocator::get_peak_memory() {
+  std::lock_guard<std::mutex> lk(stats_mutex_);
+  return peak_memory_;
+}
+
+size_t MetalAllocator::get_cache_memory() {
+  return buffer_cache_.cache_size();
+}
+
+size_t MetalAllocator::set_cache_limit(size_t limit) {
+  size_t old_limit;
+  {
+    std::lock_guard<std::mutex> lk(stats_mutex_);
+    old_limit = cache_limit_;
+    cache_limit_ = limit;
+  }
+  buffer_cache_.trim(limit);
+  return old_limit;
+}
+
+void MetalAllocator::clear_cache() {
+  buffer_cache_.clear();
 }
 
 MetalAllocator& allocator() {
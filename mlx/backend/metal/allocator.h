@@ -25,6 +25,14 @@ class BufferCache {
   void recycle_to_cache(MTL::Buffer* buf);
   size_t release_cached_buffers(size_t min_bytes_to_free);
 
+  // Release the least recently used buffers until the cache holds at most
+  // max_size bytes
+  void trim(size_t max_size);
+
+  size_t cache_size() {
+    return pool_size_;
+  }
+
   bool can_garbage_collect() {
     return pool_size_ > 0 && device_->currentAllocatedSize() > gc_limit_;
   }
@@ -60,6 +68,12 @@ class MetalAllocator : public allocator::Allocator {
   virtual Buffer malloc(size_t size) override;
   virtual void free(Buffer buffer) override;
 
+  virtual size_t get_active_memory() override;
+  virtual size_t get_peak_memory() override;
+  virtual size_t get_cache_memory() override;
+  virtual size_t set_cache_limit(size_t limit) override;
+  virtual void clear_cache() override;
+
  private:
   MTL::Device* device_;
   MetalAllocator();
@@ -69,8 +83,11 @@ class MetalAllocator : public allocator::Allocator {
   BufferCache buffer_cache_;
 
   // Allocation stats
-  size_t peak_allocated_size_;
+  std::mutex stats_mutex_;
+  size_t active_memory_;
+  size_t peak_memory_;
   size_t block_limit_;
+  size_t cache_limit_;
 };
 
 MetalAllocator& allocator();
@@ -7,6 +7,7 @@
 #include "mlx/array.h"
 #include "mlx/backend/metal/device.h"
 #include "mlx/primitives.h"
+#include "mlx/profiler.h"
 #include "mlx/scheduler.h"
 
 namespace mlx::core::metal {
@@ -48,37 +49,49 @@ std::function<void()> make_task(
     std::vector<std::shared_future<void>> deps,
     std::shared_ptr<std::promise<void>> p,
     bool retain_graph) {
-  auto task =
-      [retain_graph, arr, deps = std::move(deps), p = std::move(p)]() mutable {
-        auto pool = new_scoped_memory_pool();
-        for (auto& d : deps) {
-          d.wait();
-        }
-        auto s = arr.primitive().stream();
-        auto command_buffer = increment_command_buffer(s);
-        arr.primitive().eval_gpu(arr.inputs(), arr);
-        if (p) {
-          metal::device(s.device).end_encoding(s.index);
-          scheduler::notify_new_task(s);
-          command_buffer->addCompletedHandler(
-              [retain_graph, s, arr, p = std::move(p)](
-                  MTL::CommandBuffer*) mutable {
-                if (!retain_graph) {
-                  arr.detach();
-                }
-                p->set_value();
-                scheduler::notify_task_completion(s);
-              });
-          metal::device(s.device).commit_command_buffer(s.index);
-        } else {
-          command_buffer->addCompletedHandler(
-              [retain_graph, s, arr](MTL::CommandBuffer*) mutable {
-                if (!retain_graph) {
-                  arr.detach();
-                }
-              });
-        }
-      };
+  auto task = [retain_graph,
+               arr,
+               deps = std::move(deps),
+               p = std::move(p),
+               enqueue_time = profiler::now()]() mutable {
+    auto pool = new_scoped_memory_pool();
+    for (auto& d : deps) {
+      d.wait();
+    }
+    auto s = arr.primitive().stream();
+    auto command_buffer = increment_command_buffer(s);
+    // Holding extra references to the inputs keeps their buffers from
+    // being donated to the output when the graph is retained
+    auto retained_inputs = retain_graph ? arr.inputs() : std::vector<array>{};
+    if (profiler::is_enabled()) {
+      auto start_time = profiler::now();
+      arr.primitive().eval_gpu(arr.inputs(), arr);
+      profiler::record(arr, enqueue_time, start_time, profiler::now());
+    } else {
+      arr.primitive().eval_gpu(arr.inputs(), arr);
+    }
+    if (p) {
+      metal::device(s.device).end_encoding(s.index);
+      scheduler::notify_new_task(s);
+      command_buffer->addCompletedHandler(
+          [retain_graph, s, arr, p = std::move(p)](
+              MTL::CommandBuffer*) mutable {
+            if (!retain_graph) {
+              arr.detach();
+            }
+            p->set_value();
+            scheduler::notify_task_completion(s);
+          });
+      metal::device(s.device).commit_command_buffer(s.index);
+    } else {
+      command_buffer->addCompletedHandler(
+          [retain_graph, s, arr](MTL::CommandBuffer*) mutable {
+            if (!retain_graph) {
+              arr.detach();
+            }
+          });
+    }
+  };
   return task;
 }
 
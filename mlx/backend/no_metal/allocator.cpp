@@ -5,8 +5,10 @@
 namespace mlx::core::allocator {
 
 Allocator& allocator() {
-  static CommonAllocator allocator_;
-  return allocator_;
+  // Never destroyed so that arrays released by the stream threads during
+  // exit can still be freed
+  static CommonAllocator* allocator_ = new CommonAllocator;
+  return *allocator_;
 }
 
 void* Buffer::raw_ptr() {
@@ -0,0 +1,285 @@
+// Copyright © 2023 Apple Inc.
+
+#include <algorithm>
+#include <functional>
+#include <memory>
+#include <queue>
+#include <typeindex>
+#include <unordered_map>
+#include <unordered_set>
+
+#include "mlx/primitives.h"
+#include "mlx/transforms.h"
+#include "mlx/transforms_impl.h"
+
+namespace mlx::core {
+
+namespace {
+
+bool is_elementwise(const Primitive& p) {
+  static const std::unordered_set<std::type_index> elementwise = {
+      typeid(Abs),        typeid(Add),          typeid(ArcCos),
+      typeid(ArcCosh),    typeid(ArcSin),       typeid(ArcSinh),
+      typeid(ArcTan),     typeid(ArcTanh),      typeid(AsType),
+      typeid(Ceil),       typeid(Cos),          typeid(Cosh),
+      typeid(Divide),     typeid(Equal),        typeid(Erf),
+      typeid(ErfInv),     typeid(Exp),          typeid(Floor),
+      typeid(Greater),    typeid(GreaterEqual), typeid(Less),
+      typeid(LessEqual),  typeid(Log),          typeid(Log1p),
+      typeid(LogAddExp),  typeid(LogicalNot),   typeid(Maximum),
+      typeid(Minimum),    typeid(Multiply),     typeid(Negative),
+      typeid(NotEqual),   typeid(Power),        typeid(Remainder),
+      typeid(Round),      typeid(Sigmoid),      typeid(Sign),
+      typeid(Sin),        typeid(Sinh),         typeid(Sqrt),
+      typeid(Square),     typeid(Subtract),     typeid(Tan),
+      typeid(Tanh)};
+  return elementwise.find(typeid(p)) != elementwise.end();
+}
+
+bool is_fusable(const array& a) {
+  return a.has_primitive() && a.primitive().device() == Device::cpu &&
+      is_elementwise(a.primitive());
+}
+
+// A function traced for one set of input shapes and dtypes
+struct CacheEntry {
+  std::vector<array> inputs;
+  std::vector<array> outputs;
+
+  // The arrays of the graph that depend on the inputs in topological order
+  std::vector<array> tape;
+};
+
+// Topologically sort the arrays between the inputs and the outputs. Arrays
+// that do not depend on the inputs are constants and are left out.
+std::vector<array> compile_dfs(
+    const std::vector<array>& inputs,
+    const std::vector<array>& outputs) {
+  std::unordered_set<std::uintptr_t> depends;
+  std::unordered_set<std::uintptr_t> cache;
+  for (auto& in : inputs) {
+    depends.insert(in.id());
+    cache.insert(in.id());
+  }
+
+  std::vector<array> tape;
+  detail::depth_first(
+      outputs,
+      [&](const array& a) { return cache.insert(a.id()).second; },
+      [&](const array& a) {
+        for (auto& in : a.inputs()) {
+          if (depends.find(in.id()) != depends.end()) {
+            depends.insert(a.id());
+            tape.push_back(a);
+            break;
+          }
+        }
+      });
+  return tape;
+}
+
+// Replace the chains of elementwise arrays of the tape with arrays that
+// evaluate the whole chain with a Compiled primitive. The arrays of a chain
+// other than its output must have the same shape as the output and must not
+// be used outside of the chain.
+void compile_fuse(std::vector<array>& tape, std::vector<array>& outputs) {
+  std::unordered_map<std::uintptr_t, int> positions;
+  std::unordered_map<std::uintptr_t, std::vector<std::pair<array, int>>>
+      parents_map;
+  for (int i = 0; i < tape.size(); i++) {
+    positions.insert({tape[i].id(), i});
+    for (int j = 0; j < tape[i].inputs().size(); j++) {
+      parents_map[tape[i].inputs()[j].id()].push_back({tape[i], j});
+    }
+  }
+  std::unordered_set<std::uintptr_t> output_ids;
+  for (auto& out : outputs) {
+    output_ids.insert(out.id());
+  }
+
+  std::vector<bool> fused(tape.size(), false);
+  for (int i = tape.size() - 1; i >= 0; i--) {
+    auto& arr = tape[i];
+    if (fused[i] || !is_fusable(arr)) {
+      continue;
+    }
+
+    // Grow the chain from its output. Candidates are visited in reverse
+    // topological order so all the parents of an array that can be in the
+    // chain are in it by the time the array is visited.
+    std::unordered_set<std::uintptr_t> chain = {arr.id()};
+    std::vector<int> chain_positions = {i};
+    std::priority_queue<int> candidates;
+    auto add_candidates = [&](const array& a) {
+      for (auto& in : a.inputs()) {
+        if (auto it = positions.find(in.id()); it != positions.end()) {
+          candidates.push(it->second);
+        }
+      }
+    };
+    add_candidates(arr);
+    int last = -1;
+    while (!candidates.empty()) {
+      int j = candidates.top();
+      candidates.pop();
+      if (j == last) {
+        continue;
+      }
+      last = j;
+      auto& a = tape[j];
+      if (fused[j] || !is_fusable(a) || a.shape() != arr.shape() ||
+          output_ids.find(a.id()) != output_ids.end()) {
+        continue;
+      }
+      bool internal = true;
+      for (auto& [parent, _] : parents_map[a.id()]) {
+        internal &= chain.find(parent.id()) != chain.end();
+      }
+      if (!internal) {
+        continue;
+      }
+      chain.insert(a.id());
+      chain_positions.push_back(j);
+      add_candidates(a);
+    }
+    if (chain_positions.size() < 2) {
+      continue;
+    }
+
+    std::sort(chain_positions.begin(), chain_positions.end());
+    std::vector<array> chain_tape;
+    std::vector<array> chain_inputs;
+    std::unordered_set<std::uintptr_t> chain_input_ids;
+    for (int j : chain_positions) {
+      fused[j] = j != i;
+      chain_tape.push_back(tape[j]);
+      for (auto& in : tape[j].inputs()) {
+        if (chain.find(in.id()) == chain.end() &&
+            chain_input_ids.insert(in.id()).second) {
+          chain_inputs.push_back(in);
+        }
+      }
+    }
+
+    array compiled(
+        arr.shape(),
+        arr.dtype(),
+        std::make_shared<Compiled>(
+            arr.primitive().stream(), chain_inputs, std::move(chain_tape)),
+        chain_inputs);
+
+    // Point the users of the chain's output to the fused array
+    for (auto& [parent, idx] : parents_map[arr.id()]) {
+      parent.editable_inputs()[idx] = compiled;
+    }
+    for (auto& out : outputs) {
+      if (out.id() == arr.id()) {
+        out = compiled;
+      }
+    }
+    parents_map[compiled.id()] = std::move(parents_map[arr.id()]);
+    for (int k = 0; k < chain_inputs.size(); k++) {
+      auto& parents = parents_map[chain_inputs[k].id()];
+      parents.erase(
+          std::remove_if(
+              parents.begin(),
+              parents.end(),
+              [&chain](const std::pair<array, int>& p) {
+                return chain.find(p.first.id()) != chain.end();
+              }),
+          parents.end());
+      parents.push_back({compiled, k});
+    }
+    tape[i] = compiled;
+  }
+
+  // Drop the arrays that were fused in a chain
+  std::vector<array> new_tape;
+  for (int i = 0; i < tape.size(); i++) {
+    if (!fused[i]) {
+      new_tape.push_back(tape[i]);
+    }
+  }
+  tape = std::move(new_tape);
+}
+
+// Build the graph of the traced function for the given inputs
+std::vector<array> compile_replace(
+    const CacheEntry& entry,
+    const std::vector<array>& inputs) {
+  std::unordered_map<std::uintptr_t, array> trace_to_real;
+  for (int i = 0; i < inputs.size(); i++) {
+    trace_to_real.insert({entry.inputs[i].id(), inputs[i]});
+  }
+  auto real = [&trace_to_real](const array& a) {
+    if (auto it = trace_to_real.find(a.id()); it != trace_to_real.end()) {
+      return it->second;
+    }
+    return a;
+  };
+
+  for (auto& a : entry.tape) {
+    std::vector<array> real_inputs;
+    for (auto& in : a.inputs()) {
+      real_inputs.push_back(real(in));
+    }
+    trace_to_real.insert(
+        {a.id(),
+         array(
+             a.shape(), a.dtype(), a.primitive_ptr(), std::move(real_inputs))});
+  }
+
+  std::vector<array> outputs;
+  for (auto& out : entry.outputs) {
+    outputs.push_back(real(out));
+  }
+  return outputs;
+}
+
+} // namespace
+
+std::function<std::vector<array>(const std::vector<array>&)> compile(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun) {
+  // Each compiled function owns the graphs it traced
+  auto cache = std::make_shared<std::vector<CacheEntry>>();
+
+  return [fun, cache](const std::vector<array>& inputs) {
+    for (auto& in : inputs) {
+      if (in.is_tracer()) {
+        return fun(inputs);
+      }
+    }
+
+    auto matches = [&inputs](const CacheEntry& entry) {
+      if (entry.inputs.size() != inputs.size()) {
+        return false;
+      }
+      for (int i = 0; i < inputs.size(); i++) {
+        if (entry.inputs[i].shape() != inputs[i].shape() ||
+            entry.inputs[i].dtype() != inputs[i].dtype()) {
+          return false;
+        }
+      }
+      return true;
+    };
+    auto entry = std::find_if(cache->begin(), cache->end(), matches);
+
+    if (entry == cache->end()) {
+      // Trace the function on placeholder inputs
+      CacheEntry new_entry;
+      for (auto& in : inputs) {
+        new_entry.inputs.push_back(array(in.shape(), in.dtype(), nullptr, {}));
+      }
+      new_entry.outputs = fun(new_entry.inputs);
+      simplify(new_entry.outputs);
+      new_entry.tape = compile_dfs(new_entry.inputs, new_entry.outputs);
+      compile_fuse(new_entry.tape, new_entry.outputs);
+      cache->push_back(std::move(new_entry));
+      entry = std::prev(cache->end());
+    }
+
+    return compile_replace(*entry, inputs);
+  };
+}
+
+} // namespace mlx::core
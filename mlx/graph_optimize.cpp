@@ -0,0 +1,382 @@
+// Copyright © 2023 Apple Inc.
+
+#include <algorithm>
+#include <atomic>
+#include <mutex>
+#include <numeric>
+#include <unordered_map>
+#include <unordered_set>
+
+#include "mlx/ops.h"
+#include "mlx/primitives.h"
+#include "mlx/transforms.h"
+#include "mlx/transforms_impl.h"
+
+namespace mlx::core {
+
+namespace {
+
+// Arrays with at most this many elements are folded
+constexpr size_t max_folded_size = 64;
+
+std::atomic<int> optimization_level{0};
+
+// Set while the passes run so that the evals they call do not optimize again
+thread_local bool optimizing = false;
+
+struct NamedPass {
+  std::string name;
+  int level;
+  OptimizationPass pass;
+};
+
+// The arrays of the graph of the outputs in topological order. The graphs of
+// arrays computed by a previous asynchronous eval are owned by the stream
+// threads and are left out.
+std::vector<array> graph_tape(const std::vector<array>& outputs) {
+  std::vector<array> tape;
+  std::unordered_set<std::uintptr_t> cache;
+  detail::depth_first(
+      outputs,
+      [&](const array& a) {
+        return !a.is_pending() && cache.insert(a.id()).second;
+      },
+      [&](const array& a) { tape.push_back(a); });
+  return tape;
+}
+
+// Whether the value of an array can be read while optimizing. The values of
+// tracers change from one call of a transformed function to the next.
+bool is_known(const array& a) {
+  return a.is_evaled() && !a.is_tracer() && a.flags().contiguous;
+}
+
+template <typename T>
+bool all_equal(const array& a, T v) {
+  auto data = a.data<T>();
+  return std::all_of(
+      data, data + a.data_size(), [v](const T& x) { return x == v; });
+}
+
+// Whether every element of an array is known to equal v
+bool is_constant(const array& a, int v) {
+  // Scalars are broadcasted by the binary ops
+  if (!a.is_evaled() && a.has_primitive() && !a.is_pending() &&
+      typeid(a.primitive()) == typeid(Broadcast)) {
+    return is_constant(a.inputs()[0], v);
+  }
+  if (!is_known(a)) {
+    return false;
+  }
+  switch (a.dtype()) {
+    case bool_:
+      return all_equal<bool>(a, v);
+    case uint8:
+      return all_equal<uint8_t>(a, v);
+    case uint16:
+      return all_equal<uint16_t>(a, v);
+    case uint32:
+      return all_equal<uint32_t>(a, v);
+    case uint64:
+      return all_equal<uint64_t>(a, v);
+    case int8:
+      return all_equal<int8_t>(a, v);
+    case int16:
+      return all_equal<int16_t>(a, v);
+    case int32:
+      return all_equal<int32_t>(a, v);
+    case int64:
+      return all_equal<int64_t>(a, v);
+    case float16:
+      return all_equal<float16_t>(a, static_cast<float16_t>(v));
+    case float32:
+      return all_equal<float>(a, v);
+    case bfloat16:
+      return all_equal<bfloat16_t>(a, static_cast<bfloat16_t>(v));
+    case complex64:
+      return false;
+  }
+  return false;
+}
+
+// Whether every value of type from is exactly representable in type to
+bool is_lossless_cast(Dtype from, Dtype to) {
+  auto kind_from = kindof(from);
+  auto kind_to = kindof(to);
+  if (from == to || kind_from == Dtype::Kind::b) {
+    return true;
+  }
+  if (size_of(to) <= size_of(from)) {
+    return false;
+  }
+  switch (kind_to) {
+    case Dtype::Kind::u:
+      return kind_from == Dtype::Kind::u;
+    case Dtype::Kind::i:
+      return kind_from == Dtype::Kind::u || kind_from == Dtype::Kind::i;
+    case Dtype::Kind::f:
+    case Dtype::Kind::c:
+      return kind_from == Dtype::Kind::f || kind_from == Dtype::Kind::V;
+    default:
+      return false;
+  }
+}
+
+// Evaluate the small arrays whose inputs are all known so that the passes
+// after this one can use their values
+void fold_constants(const std::vector<array>& outputs) {
+  std::unordered_set<std::uintptr_t> constants;
+  std::vector<array> folded;
+  for (auto& a : graph_tape(outputs)) {
+    if (a.is_evaled()) {
+      if (!a.is_tracer()) {
+        constants.insert(a.id());
+      }
+      continue;
+    }
+    if (!a.has_primitive() || a.is_tracer() || a.size() > max_folded_size) {
+      continue;
+    }
+    bool constant = std::all_of(
+        a.inputs().begin(), a.inputs().end(), [&constants](const array& in) {
+          return constants.find(in.id()) != constants.end();
+        });
+    if (constant) {
+      constants.insert(a.id());
+      folded.push_back(a);
+    }
+  }
+  if (!folded.empty()) {
+    eval(folded, true);
+  }
+}
+
+// An array equal to a which skips some of the arrays of its graph or a itself
+// if no rewrite applies
+array peephole_rewrite(const array& a) {
+  auto& p = a.primitive();
+  auto s = p.stream();
+  auto& inputs = a.inputs();
+  auto same_type = [&a](const array& x) {
+    return x.shape() == a.shape() && x.dtype() == a.dtype();
+  };
+  // Whether the input comes from a primitive of type T
+  auto computed_by = [](const array& x, const auto& type) {
+    return x.has_primitive() && !x.is_pending() &&
+        typeid(x.primitive()) == type;
+  };
+
+  // x * 1, x + 0, x - 0 and x / 1
+  if (typeid(p) == typeid(Multiply) || typeid(p) == typeid(Add)) {
+    int identity = typeid(p) == typeid(Multiply) ? 1 : 0;
+    for (int i = 0; i < 2; i++) {
+      if (is_constant(inputs[1 - i], identity) && same_type(inputs[i])) {
+        return inputs[i];
+      }
+    }
+  }
+  if (typeid(p) == typeid(Subtract) || typeid(p) == typeid(Divide)) {
+    int identity = typeid(p) == typeid(Divide) ? 1 : 0;
+    if (is_constant(inputs[1], identity) && same_type(inputs[0])) {
+      return inputs[0];
+    }
+  }
+
+  // Views which do not change the input and chains of views
+  if (typeid(p) == typeid(Reshape) || typeid(p) == typeid(Broadcast)) {
+    auto& x = inputs[0];
+    if (same_type(x)) {
+      return x;
+    }
+    if (typeid(p) == typeid(Reshape) && computed_by(x, typeid(Reshape))) {
+      return reshape(x.inputs()[0], a.shape(), s);
+    }
+  }
+  if (typeid(p) == typeid(Transpose)) {
+    auto axes = static_cast<Transpose&>(p).axes();
+    auto x = inputs[0];
+    if (computed_by(x, typeid(Transpose))) {
+      auto& inner_axes = static_cast<Transpose&>(x.primitive()).axes();
+      for (auto& ax : axes) {
+        ax = inner_axes[ax];
+      }
+      x = x.inputs()[0];
+    }
+    std::vector<int> identity(axes.size());
+    std::iota(identity.begin(), identity.end(), 0);
+    if (axes == identity) {
+      return x;
+    }
+    if (x.id() != inputs[0].id()) {
+      return transpose(x, axes, s);
+    }
+  }
+
+  // Casts through a type which represents the input exactly
+  if (typeid(p) == typeid(AsType)) {
+    auto& x = inputs[0];
+    if (x.dtype() == a.dtype()) {
+      return x;
+    }
+    if (computed_by(x, typeid(AsType)) &&
+        is_lossless_cast(x.inputs()[0].dtype(), x.dtype())) {
+      return astype(x.inputs()[0], a.dtype(), s);
+    }
+  }
+
+  // Reductions over the broadcasted axes of a broadcast
+  if (typeid(p) == typeid(Reduce) &&
+      computed_by(inputs[0], typeid(Broadcast))) {
+    auto& reduce = static_cast<Reduce&>(p);
+    auto& x = inputs[0].inputs()[0];
+    auto& shape = inputs[0].shape();
+    auto type = reduce.reduce_type();
+    if (x.dtype() != a.dtype() || type == Reduce::Prod) {
+      return a;
+    }
+    // The input aligned with the broadcasted shape
+    std::vector<int> x_shape(shape.size() - x.ndim(), 1);
+    x_shape.insert(x_shape.end(), x.shape().begin(), x.shape().end());
+    auto reduced_shape = shape;
+    size_t n = 1;
+    for (auto ax : reduce.axes()) {
+      if (x_shape[ax] != 1) {
+        return a;
+      }
+      n *= shape[ax];
+      reduced_shape[ax] = 1;
+    }
+    auto out = broadcast_to(reshape(x, x_shape, s), reduced_shape, s);
+    if (type == Reduce::Sum && n != 1) {
+      out = multiply(out, array(static_cast<float>(n), a.dtype()), s);
+    }
+    return reshape(out, a.shape(), s);
+  }
+
+  return a;
+}
+
+// Rewrite the arrays of the graph to skip arrays which do not change their
+// input, chains of reshapes, transposes and casts and broadcasts which are
+// reduced right away. The outputs are not rewritten as they would be computed
+// anyway.
+void peephole(const std::vector<array>& outputs) {
+  auto tape = graph_tape(outputs);
+  std::unordered_set<std::uintptr_t> output_ids;
+  for (auto& out : outputs) {
+    output_ids.insert(out.id());
+  }
+  std::unordered_map<std::uintptr_t, std::vector<std::pair<array, int>>>
+      parents_map;
+  for (auto& a : tape) {
+    for (int i = 0; i < a.inputs().size(); i++) {
+      parents_map[a.inputs()[i].id()].push_back({a, i});
+    }
+  }
+
+  // The tape is in topological order so the inputs of an array are
+  // rewritten before it and chains collapse into a single array
+  for (auto& a : tape) {
+    if (!a.has_primitive() || a.is_evaled() ||
+        output_ids.find(a.id()) != output_ids.end()) {
+      continue;
+    }
+    auto parents = parents_map.find(a.id());
+    if (parents == parents_map.end()) {
+      continue;
+    }
+    auto rewritten = peephole_rewrite(a);
+    if (rewritten.id() == a.id()) {
+      continue;
+    }
+    for (auto& [parent, i] : parents->second) {
+      parent.editable_inputs()[i] = rewritten;
+    }
+  }
+}
+
+// Detach the graphs of the evaluated arrays so that the arrays they used are
+// released before the graph is evaluated
+void eliminate_dead_nodes(const std::vector<array>& outputs) {
+  for (auto& a : graph_tape(outputs)) {
+    if (a.is_evaled() && a.has_primitive() && !a.is_tracer()) {
+      a.detach();
+    }
+  }
+}
+
+std::mutex passes_mtx;
+
+std::vector<NamedPass>& passes() {
+  static std::vector<NamedPass> passes_ = {
+      {"constant_folding", 1, fold_constants},
+      {"peephole", 1, peephole},
+      {"simplify",
+       2,
+       [](const std::vector<array>& outputs) { simplify(outputs); }},
+      {"dead_node_elimination", 1, eliminate_dead_nodes}};
+  return passes_;
+}
+
+} // namespace
+
+void register_optimization_pass(
+    const std::string& name,
+    int level,
+    OptimizationPass pass) {
+  if (level < 1) {
+    throw std::invalid_argument(
+        "[register_optimization_pass] The level must be at least 1.");
+  }
+  std::lock_guard<std::mutex> lk(passes_mtx);
+  auto& ps = passes();
+  // Keep dead node elimination last so it sees the rewrites of every pass
+  ps.insert(std::prev(ps.end()), {name, level, std::move(pass)});
+}
+
+std::vector<std::pair<std::string, int>> optimize(
+    const std::vector<array>& outputs,
+    int level /* = 1 */) {
+  std::vector<std::pair<std::string, int>> removed;
+  if (optimizing || level < 1) {
+    return removed;
+  }
+  std::vector<NamedPass> ps;
+  {
+    std::lock_guard<std::mutex> lk(passes_mtx);
+    ps = passes();
+  }
+
+  optimizing = true;
+  try {
+    int size = graph_tape(outputs).size();
+    for (auto& [name, pass_level, pass] : ps) {
+      if (pass_level > level) {
+        continue;
+      }
+      pass(outputs);
+      int new_size = graph_tape(outputs).size();
+      removed.push_back({name, size - new_size});
+      size = new_size;
+    }
+  } catch (...) {
+    optimizing = false;
+    throw;
+  }
+  optimizing = false;
+  return removed;
+}
+
+void set_optimization_level(int level) {
+  if (level < 0) {
+    throw std::invalid_argument(
+        "[set_optimization_level] The level must be non-negative.");
+  }
+  optimization_level = level;
+}
+
+int get_optimization_level() {
+  return optimization_level;
+}
+
+} // namespace mlx::core
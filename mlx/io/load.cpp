@@ -6,6 +6,11 @@
 #include <limits>
 #include <sstream>
 
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
 #include "mlx/io/load.h"
 #include "mlx/ops.h"
 #include "mlx/primitives.h"
@@ -39,6 +44,74 @@ inline bool is_big_endian_() {
 
 } // namespace
 
+namespace io {
+
+MappedFile::MappedFile(const std::string& file_path)
+    : is_open_(false), data_(nullptr), size_(0) {
+  int fd = ::open(file_path.c_str(), O_RDONLY);
+  if (fd < 0) {
+    return;
+  }
+  struct stat st;
+  if (::fstat(fd, &st) == 0) {
+    size_ = st.st_size;
+    if (size_ == 0) {
+      is_open_ = true;
+    } else {
+      void* ptr =
+          ::mmap(nullptr, size_, PROT_READ | PROT_WRITE, MAP_PRIVATE, fd, 0);
+      if (ptr != MAP_FAILED) {
+        data_ = static_cast<char*>(ptr);
+        is_open_ = true;
+      }
+    }
+  }
+  // The mapping stays valid after the file is closed
+  ::close(fd);
+}
+
+MappedFile::~MappedFile() {
+  if (data_ != nullptr) {
+    ::munmap(data_, size_);
+  }
+}
+
+void MappedFileReader::seek(int64_t off, std::ios_base::seekdir way) {
+  int64_t base = 0;
+  if (way == std::ios_base::cur) {
+    base = pos_;
+  } else if (way == std::ios_base::end) {
+    base = file_->size();
+  }
+  if (base + off < 0 || base + off > file_->size()) {
+    good_ = false;
+    return;
+  }
+  pos_ = base + off;
+}
+
+void MappedFileReader::read(char* data, size_t n) {
+  if (!good_ || pos_ + n > file_->size()) {
+    good_ = false;
+    return;
+  }
+  std::memcpy(data, file_->data() + pos_, n);
+  pos_ += n;
+}
+
+void MappedFileReader::read(char* data, size_t n, size_t offset) {
+  if (offset + n > file_->size()) {
+    std::ostringstream msg;
+    msg << "[load] Reading " << n << " bytes at offset " << offset
+        << " is out of bounds for " << label() << " of size " << file_->size()
+        << ".";
+    throw std::runtime_error(msg.str());
+  }
+  std::memcpy(data, file_->data() + offset, n);
+}
+
+} // namespace io
+
 /** Save array to out stream in .npy format */
 void save(std::shared_ptr<io::Writer> out_stream, array a, bool retain_graph) {
   ////////////////////////////////////////////////////////
@@ -236,7 +309,7 @@ array load(std::shared_ptr<io::Reader> in_stream, StreamOrDevice s) {
 
 /** Load array from file in .npy format */
 array load(const std::string& file, StreamOrDevice s) {
-  return load(std::make_shared<io::FileReader>(file), s);
+  return load(std::make_shared<io::MappedFileReader>(file), s);
 }
 
 } // namespace mlx::core
@@ -5,6 +5,7 @@
 #include <fstream>
 #include <istream>
 #include <memory>
+#include <mutex>
 
 namespace mlx::core {
 
@@ -19,6 +20,12 @@ class Reader {
       int64_t off,
       std::ios_base::seekdir way = std::ios_base::beg) = 0;
   virtual void read(char* data, size_t n) = 0;
+
+  /**
+   * Read n bytes starting at offset without using or moving the current
+   * position. It is safe to call concurrently from multiple threads.
+   */
+  virtual void read(char* data, size_t n, size_t offset) = 0;
   virtual std::string label() const = 0;
 };
 
@@ -63,6 +70,15 @@ class FileReader : public Reader {
     is_->read(data, n);
   }
 
+  void read(char* data, size_t n, size_t offset) override {
+    // The stream has a single position so positional reads are serialized
+    std::lock_guard<std::mutex> lk(mtx_);
+    auto pos = is_->tellg();
+    is_->seekg(offset, std::ios_base::beg);
+    is_->read(data, n);
+    is_->seekg(pos, std::ios_base::beg);
+  }
+
   std::string label() const override {
     return "file " + label_;
   }
@@ -70,6 +86,88 @@ class FileReader : public Reader {
  private:
   std::shared_ptr<std::ifstream> is_;
   std::string label_;
+  std::mutex mtx_;
+};
+
+/** A read only memory mapping of a whole file. */
+class MappedFile {
+ public:
+  explicit MappedFile(const std::string& file_path);
+  ~MappedFile();
+
+  // Not copyable or moveable
+  MappedFile(const MappedFile&) = delete;
+  MappedFile(MappedFile&&) = delete;
+  MappedFile& operator=(const MappedFile&) = delete;
+  MappedFile& operator=(MappedFile&&) = delete;
+
+  bool is_open() const {
+    return is_open_;
+  }
+
+  /**
+   * The mapped pages are private to the process so writing to them copies
+   * the written page and never modifies the file.
+   */
+  char* data() const {
+    return data_;
+  }
+
+  size_t size() const {
+    return size_;
+  }
+
+ private:
+  bool is_open_;
+  char* data_;
+  size_t size_;
+};
+
+/**
+ * Read from a memory mapped file. Loading an array from it can wrap the
+ * mapped pages directly instead of copying them, see ``mapped_file``.
+ */
+class MappedFileReader : public Reader {
+ public:
+  explicit MappedFileReader(const std::string& file_path)
+      : file_(std::make_shared<MappedFile>(file_path)),
+        label_(file_path),
+        pos_(0),
+        good_(file_->is_open()) {}
+
+  bool is_open() const override {
+    return file_->is_open();
+  }
+
+  bool good() const override {
+    return good_;
+  }
+
+  size_t tell() const override {
+    return pos_;
+  }
+
+  void seek(int64_t off, std::ios_base::seekdir way = std::ios_base::beg)
+      override;
+
+  void read(char* data, size_t n) override;
+
+  void read(char* data, size_t n, size_t offset) override;
+
+  std::string label() const override {
+    return "file " + label_;
+  }
+
+  /** The mapping which must outlive any array wrapping its pages. */
+  const std::shared_ptr<MappedFile>& mapped_file() const {
+    return file_;
+  }
+
+ private:
+  std::shared_ptr<MappedFile> file_;
+  std::string label_;
+  size_t pos_;
+  bool good_;
 };
 
 class FileWriter : public Writer {
@@ -119,7 +119,7 @@ std::unordered_map<std::string, array> load_safetensors(
 std::unordered_map<std::string, array> load_safetensors(
     const std::string& file,
     StreamOrDevice s) {
-  return load_safetensors(std::make_shared<io::FileReader>(file), s);
+  return load_safetensors(std::make_shared<io::MappedFileReader>(file), s);
 }
 
 /** Save array to out stream in .npy format */
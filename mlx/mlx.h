@@ -2,12 +2,15 @@
 
 #pragma once
 
+#include "mlx/allocator.h"
 #include "mlx/array.h"
+#include "mlx/backend/common/threading.h"
 #include "mlx/backend/metal/metal.h"
 #include "mlx/device.h"
 #include "mlx/fft.h"
 #include "mlx/linalg.h"
 #include "mlx/ops.h"
+#include "mlx/profiler.h"
 #include "mlx/random.h"
 #include "mlx/stream.h"
 #include "mlx/transforms.h"
@@ -10,6 +10,7 @@
 #include "mlx/fft.h"
 #include "mlx/ops.h"
 #include "mlx/primitives.h"
+#include "mlx/transforms.h"
 #include "mlx/utils.h"
 
 namespace mlx::core {
@@ -33,7 +34,23 @@ std::tuple<array, array, int> vmap_binary_op(
     return reshape(in, shape, stream);
   };
 
+  // An input which is not vectorized gets a singleton dimension at the
+  // vectorized axis of the other input which is a view and not a copy
+  auto insert_axis = [stream, ndim](auto in, int ax) {
+    auto shape = in.shape();
+    shape.insert(shape.begin(), ndim - 1 - shape.size(), 1);
+    shape.insert(shape.begin() + ax, 1);
+    return reshape(in, shape, stream);
+  };
+  if (axes[0] == -1) {
+    int to_ax = (ndim - b.ndim()) + axes[1];
+    return {insert_axis(a, to_ax), expand_dims(b), to_ax};
+  }
   int to_ax = (ndim - a.ndim()) + axes[0];
+  if (axes[1] == -1) {
+    return {expand_dims(a), insert_axis(b, to_ax), to_ax};
+  }
+
   int from_ax = (ndim - b.ndim()) + axes[1];
   a = expand_dims(a);
   b = expand_dims(b);
@@ -48,6 +65,40 @@ std::tuple<array, array, int> vmap_binary_op(
   return {a, b, to_ax};
 }
 
+// The input with its vectorized axis moved to the front or with a new front
+// axis of size n if it is not vectorized
+array vmap_to_front(
+    const array& in,
+    int ax,
+    int n,
+    bool broadcast,
+    const Stream& stream) {
+  if (ax > 0) {
+    return moveaxis(in, ax, 0, stream);
+  }
+  if (ax == 0) {
+    return in;
+  }
+  auto shape = in.shape();
+  shape.insert(shape.begin(), 1);
+  auto out = reshape(in, shape, stream);
+  if (broadcast) {
+    shape[0] = n;
+    out = broadcast_to(out, shape, stream);
+  }
+  return out;
+}
+
+// The size of the vectorized axis
+int vmap_size(const std::vector<array>& inputs, const std::vector<int>& axes) {
+  for (int i = 0; i < axes.size(); ++i) {
+    if (axes[i] >= 0) {
+      return inputs[i].shape(axes[i]);
+    }
+  }
+  throw std::invalid_argument("[vmap] No vectorized input.");
+}
+
 } // namespace
 
 array Primitive::jvp(
@@ -291,7 +342,8 @@ std::pair<array, int> ArgPartition::vmap(
   assert(axes.size() == 1);
 
   return {
-      argpartition(inputs[0], axis_ + (axes[0] <= axis_), stream()), axes[0]};
+      argpartition(inputs[0], kth_, axis_ + (axes[0] <= axis_), stream()),
+      axes[0]};
 }
 
 bool ArgPartition::is_equivalent(const Primitive& other) const {
@@ -299,6 +351,19 @@ bool ArgPartition::is_equivalent(const Primitive& other) const {
   return axis_ == r_other.axis_ && kth_ == r_other.kth_;
 }
 
+std::pair<array, int> ArgReduce::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  assert(inputs.size() == 1);
+  assert(axes.size() == 1);
+
+  int reduce_ax = axis_ + (axes[0] <= axis_);
+  auto out = reduce_type_ == ArgReduce::ArgMin
+      ? argmin(inputs[0], reduce_ax, true, stream())
+      : argmax(inputs[0], reduce_ax, true, stream());
+  return {out, axes[0]};
+}
+
 bool ArgReduce::is_equivalent(const Primitive& other) const {
   const ArgReduce& r_other = static_cast<const ArgReduce&>(other);
   return reduce_type_ == r_other.reduce_type_ && axis_ == r_other.axis_;
@@ -385,6 +450,23 @@ array AsStrided::jvp(
   return as_strided(tangents[0], shape_, strides_, offset_, stream());
 }
 
+std::pair<array, int> AsStrided::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  assert(inputs.size() == 1);
+  assert(axes.size() == 1);
+
+  // The flat inputs of the batch are laid out one after the other
+  auto& in = inputs[0];
+  int n = in.shape(axes[0]);
+  auto shape = shape_;
+  shape.insert(shape.begin(), n);
+  auto strides = strides_;
+  strides.insert(strides.begin(), in.size() / n);
+  auto x = axes[0] > 0 ? moveaxis(in, axes[0], 0, stream()) : in;
+  return {as_strided(x, shape, strides, offset_, stream()), 0};
+}
+
 bool AsStrided::is_equivalent(const Primitive& other) const {
   const AsStrided& a_other = static_cast<const AsStrided&>(other);
   return shape_ == a_other.shape_ && strides_ == a_other.strides_ &&
@@ -430,9 +512,10 @@ std::pair<array, int> Broadcast::vmap(
   assert(diff >= 0);
   in_shape.insert(in_shape.begin(), diff, 1);
   ax += diff;
-  shape_.insert(shape_.begin() + ax, in_shape[ax]);
+  auto shape = shape_;
+  shape.insert(shape.begin() + ax, in_shape[ax]);
   auto in = reshape(inputs[0], in_shape, stream());
-  return {broadcast_to(in, shape_, stream()), ax};
+  return {broadcast_to(in, shape, stream()), ax};
 }
 
 bool Broadcast::is_equivalent(const Primitive& other) const {
@@ -464,6 +547,103 @@ std::pair<array, int> Ceil::vmap(
   return {ceil(inputs[0], stream()), axes[0]};
 }
 
+std::function<std::vector<array>(const std::vector<array>&)>
+Checkpoint::output_fun() {
+  return [fun = fun_, output = output_](const std::vector<array>& inputs) {
+    return std::vector<array>{fun(inputs)[output]};
+  };
+}
+
+std::vector<array> Checkpoint::vjp(
+    const std::vector<array>& primals,
+    const array& cotan,
+    const std::vector<int>& argnums) {
+  // Recompute the function once the cotangent is computed so that its
+  // intermediate arrays are only alive during the backward pass
+  std::vector<array> inputs;
+  for (int i = 0; i < primals.size() - 1; ++i) {
+    inputs.push_back(array(
+        primals[i].shape(),
+        primals[i].dtype(),
+        std::make_unique<Depends>(stream()),
+        {primals[i], cotan}));
+  }
+  auto vjps = mlx::core::vjp(output_fun(), inputs, {cotan}).second;
+
+  // The last input is the output of the function which has no gradient
+  std::vector<array> out;
+  for (auto arg : argnums) {
+    out.push_back(
+        arg < inputs.size() ? vjps[arg] : zeros_like(primals[arg], stream()));
+  }
+  return out;
+}
+
+array Checkpoint::jvp(
+    const std::vector<array>& primals,
+    const std::vector<array>& tangents,
+    const std::vector<int>& argnums) {
+  std::vector<array> inputs(primals.begin(), primals.end() - 1);
+  std::vector<array> all_tangents;
+  for (auto& in : inputs) {
+    all_tangents.push_back(zeros_like(in, stream()));
+  }
+  for (int i = 0; i < argnums.size(); ++i) {
+    if (argnums[i] < inputs.size()) {
+      all_tangents[argnums[i]] = tangents[i];
+    }
+  }
+  return mlx::core::jvp(output_fun(), inputs, all_tangents).second[0];
+}
+
+std::pair<array, int> Checkpoint::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  // Checkpoint the vectorized function so that its intermediate arrays are
+  // still recomputed
+  std::vector<array> v_inputs(inputs.begin(), inputs.end() - 1);
+  std::vector<int> v_axes(axes.begin(), axes.end() - 1);
+  auto vfun = mlx::core::vmap(output_fun(), v_axes, {0});
+  return {checkpoint(vfun)(v_inputs)[0], 0};
+}
+
+std::pair<array, int> Compiled::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  // Vectorize the primitives of the chain one after the other
+  std::unordered_map<std::uintptr_t, std::pair<array, int>> vmapped;
+  for (int i = 0; i < inputs_.size(); ++i) {
+    vmapped.insert({inputs_[i].id(), {inputs[i], axes[i]}});
+  }
+  for (auto& a : tape_) {
+    std::vector<array> v_inputs;
+    std::vector<int> v_axes;
+    for (auto& in : a.inputs()) {
+      auto it = vmapped.find(in.id());
+      v_inputs.push_back(it != vmapped.end() ? it->second.first : in);
+      v_axes.push_back(it != vmapped.end() ? it->second.second : -1);
+    }
+    if (std::all_of(
+            v_axes.begin(), v_axes.end(), [](int ax) { return ax == -1; })) {
+      vmapped.insert({a.id(), {a, -1}});
+    } else {
+      vmapped.insert({a.id(), a.primitive().vmap(v_inputs, v_axes)});
+    }
+  }
+  return vmapped.at(tape_.back().id());
+}
+
+void Compiled::print(std::ostream& os) {
+  os << "Compiled(";
+  for (int i = 0; i < tape_.size(); i++) {
+    if (i > 0) {
+      os << ", ";
+    }
+    tape_[i].primitive().print(os);
+  }
+  os << ")";
+}
+
 std::vector<array> Concatenate::vjp(
     const std::vector<array>& primals,
     const array& cotan,
@@ -538,6 +718,72 @@ bool Concatenate::is_equivalent(const Primitive& other) const {
   return axis_ == c_other.axis_;
 }
 
+std::pair<array, int> Convolution::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  auto conv = [this](const array& in, const array& wt) {
+    auto out_shape = in.shape();
+    for (int i = 1; i < in.ndim() - 1; ++i) {
+      int in_size = (in.shape(i) - 1) * input_dilation_[i - 1] + 1;
+      int wt_size = (wt.shape(i) - 1) * kernel_dilation_[i - 1] + 1;
+      out_shape[i] =
+          (in_size + 2 * padding_[i - 1] - wt_size) / kernel_strides_[i - 1] +
+          1;
+    }
+    out_shape.back() = wt.shape(0);
+    return array(
+        out_shape,
+        in.dtype(),
+        std::make_unique<Convolution>(
+            stream(),
+            padding_,
+            kernel_strides_,
+            kernel_dilation_,
+            input_dilation_),
+        {in, wt});
+  };
+  int n = vmap_size(inputs, axes);
+  auto in = axes[0] > 0 ? moveaxis(inputs[0], axes[0], 0, stream()) : inputs[0];
+  auto wt = axes[1] > 0 ? moveaxis(inputs[1], axes[1], 0, stream()) : inputs[1];
+
+  // A batch of inputs is one convolution of a larger batch
+  if (axes[1] == -1) {
+    std::vector<int> shape(in.shape().begin() + 1, in.shape().end());
+    shape[0] *= n;
+    auto out = conv(reshape(in, shape, stream()), wt);
+    shape = out.shape();
+    shape[0] /= n;
+    shape.insert(shape.begin(), n);
+    return {reshape(out, shape, stream()), 0};
+  }
+
+  // A batch of weights is one convolution with more output channels
+  if (axes[0] == -1) {
+    std::vector<int> shape(wt.shape().begin() + 1, wt.shape().end());
+    shape[0] *= n;
+    auto out = conv(in, reshape(wt, shape, stream()));
+    shape = out.shape();
+    shape.back() /= n;
+    shape.insert(shape.end() - 1, n);
+    return {reshape(out, shape, stream()), out.ndim() - 1};
+  }
+
+  // Without grouped convolutions both are convolved one pair at a time
+  std::vector<array> outputs;
+  for (int i = 0; i < n; ++i) {
+    auto take_one = [this, i](const array& x) {
+      std::vector<int> start(x.ndim(), 0);
+      start[0] = i;
+      auto stop = x.shape();
+      stop[0] = i + 1;
+      std::vector<int> shape(x.shape().begin() + 1, x.shape().end());
+      return reshape(slice(x, start, stop, stream()), shape, stream());
+    };
+    outputs.push_back(conv(take_one(in), take_one(wt)));
+  }
+  return {stack(outputs, 0, stream()), 0};
+}
+
 std::vector<array> Convolution::vjp(
     const std::vector<array>& primals,
     const array& cotan,
@@ -729,6 +975,129 @@ std::pair<array, int> Cosh::vmap(
   return {cosh(inputs[0], stream()), axes[0]};
 }
 
+std::vector<array> CustomTransforms::vjp(
+    const std::vector<array>& primals,
+    const array& cotan,
+    const std::vector<int>& argnums) {
+  int num_inputs = primals.size() - num_outputs_;
+  std::vector<array> inputs(primals.begin(), primals.begin() + num_inputs);
+  std::vector<array> outputs(primals.begin() + num_inputs, primals.end());
+
+  std::vector<array> vjps;
+  if (fun_vjp_) {
+    std::vector<array> cotans;
+    for (int i = 0; i < num_outputs_; ++i) {
+      cotans.push_back(i == output_ ? cotan : zeros_like(outputs[i], stream()));
+    }
+    vjps = fun_vjp_(inputs, cotans, outputs);
+  } else {
+    std::function<std::vector<array>(const std::vector<array>&)> output_fun =
+        [fun = fun_, output = output_](const std::vector<array>& inputs) {
+          return std::vector<array>{fun(inputs)[output]};
+        };
+    vjps = mlx::core::vjp(output_fun, inputs, {cotan}).second;
+  }
+  if (vjps.size() != num_inputs) {
+    std::ostringstream msg;
+    msg << "[custom_function] The vjp function returned " << vjps.size()
+        << " arrays but the function has " << num_inputs << " inputs.";
+    throw std::invalid_argument(msg.str());
+  }
+
+  // The outputs of the function have no gradient
+  std::vector<array> out;
+  for (auto arg : argnums) {
+    if (arg >= num_inputs) {
+      out.push_back(zeros_like(primals[arg], stream()));
+    } else if (vjps[arg].shape() != primals[arg].shape()) {
+      throw std::invalid_argument(
+          "[custom_function] The shape of a vjp does not match the shape of "
+          "its input.");
+    } else {
+      out.push_back(astype(vjps[arg], primals[arg].dtype(), stream()));
+    }
+  }
+  return out;
+}
+
+array CustomTransforms::jvp(
+    const std::vector<array>& primals,
+    const std::vector<array>& tangents,
+    const std::vector<int>& argnums) {
+  int num_inputs = primals.size() - num_outputs_;
+  std::vector<array> inputs(primals.begin(), primals.begin() + num_inputs);
+  std::vector<array> all_tangents;
+  for (auto& in : inputs) {
+    all_tangents.push_back(zeros_like(in, stream()));
+  }
+  for (int i = 0; i < argnums.size(); ++i) {
+    if (argnums[i] < num_inputs) {
+      all_tangents[argnums[i]] = tangents[i];
+    }
+  }
+
+  if (!fun_jvp_) {
+    return mlx::core::jvp(fun_, inputs, all_tangents).second[output_];
+  }
+  auto jvps = fun_jvp_(inputs, all_tangents);
+  if (jvps.size() != num_outputs_) {
+    std::ostringstream msg;
+    msg << "[custom_function] The jvp function returned " << jvps.size()
+        << " arrays but the function has " << num_outputs_ << " outputs.";
+    throw std::invalid_argument(msg.str());
+  }
+  if (jvps[output_].shape() != primals[num_inputs + output_].shape()) {
+    throw std::invalid_argument(
+        "[custom_function] The shape of a jvp does not match the shape of "
+        "its output.");
+  }
+  return jvps[output_];
+}
+
+std::pair<array, int> CustomTransforms::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  int num_inputs = inputs.size() - num_outputs_;
+  std::vector<array> v_inputs(inputs.begin(), inputs.begin() + num_inputs);
+  std::vector<int> v_axes(axes.begin(), axes.begin() + num_inputs);
+  auto vfun = mlx::core::vmap(fun_, v_axes, std::vector<int>(num_outputs_, 0));
+  return {vfun(v_inputs)[output_], 0};
+}
+
+std::pair<array, int> Depends::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  auto v_inputs = inputs;
+  v_inputs[0] = vmap_to_front(
+      inputs[0], axes[0], vmap_size(inputs, axes), true, stream());
+  auto& out = v_inputs[0];
+  return {
+      array(
+          out.shape(),
+          out.dtype(),
+          std::make_unique<Depends>(stream()),
+          v_inputs),
+      axes[0] == -1 ? 0 : axes[0]};
+}
+
+std::vector<array> Depends::vjp(
+    const std::vector<array>& primals,
+    const array& cotan,
+    const std::vector<int>& argnums) {
+  std::vector<array> vjps;
+  for (auto arg : argnums) {
+    vjps.push_back(arg == 0 ? cotan : zeros_like(primals[arg], stream()));
+  }
+  return vjps;
+}
+
+array Depends::jvp(
+    const std::vector<array>& primals,
+    const std::vector<array>& tangents,
+    const std::vector<int>& argnums) {
+  return argnums[0] == 0 ? tangents[0] : zeros_like(primals[0], stream());
+}
+
 std::vector<array> Divide::vjp(
     const std::vector<array>& primals,
     const array& cotan,
@@ -1079,46 +1448,45 @@ std::pair<array, int> Gather::vmap(
   auto src_vmapped = axes[0] >= 0;
   auto indices_vmapped =
       std::any_of(axes.begin() + 1, axes.end(), [](int a) { return a >= 0; });
-  auto out_ax =
-      *std::find_if(axes.begin(), axes.end(), [](int a) { return a >= 0; });
+  int n = vmap_size(inputs, axes);
 
-  // Reorder all the index arrays so the vmap axis is in the same spot.
-  for (int i = 1; i < axes.size(); ++i) {
-    if (out_ax != axes[i] && axes[i] >= 0) {
-      indices[i - 1] = moveaxis(indices[i - 1], axes[i], out_ax, stream());
+  // The index arrays are broadcasted so the vectorized ones are moved to the
+  // front and the others get a singleton front axis
+  if (indices_vmapped) {
+    for (int i = 0; i < indices.size(); ++i) {
+      indices[i] = vmap_to_front(indices[i], axes[i + 1], n, false, stream());
     }
   }
+  int idx_ndim = indices.empty() ? 0 : indices[0].ndim();
 
-  if (src_vmapped) {
-    int max_dims = 0;
-    for (auto& idx : indices) {
-      max_dims = std::max(static_cast<int>(idx.ndim()), max_dims);
-    }
-    auto new_ax_loc =
-        std::find_if(gather_axes.begin(), gather_axes.end(), [&out_ax](int a) {
-          return a >= out_ax;
-        });
-    for (; new_ax_loc < gather_axes.end(); new_ax_loc++) {
-      (*new_ax_loc)++;
-    }
-    if (indices_vmapped) {
-      // Make a new index array for the vmapped dimension
-      // Reshape it so it broadcasts with other index arrays
-      // Update gather axes and slice sizes accordingly
-      auto shape = std::vector<int>(max_dims - out_ax, 1);
-      auto vmap_inds = arange(0, src.shape(out_ax), stream());
-      shape[0] = vmap_inds.shape(0);
-      vmap_inds = reshape(vmap_inds, shape, stream());
-      slice_sizes.insert(slice_sizes.begin() + out_ax, 1);
-      auto new_ax_idx = new_ax_loc - gather_axes.begin();
-      gather_axes.insert(new_ax_loc, out_ax);
-      indices.insert(indices.begin() + new_ax_idx, vmap_inds);
-    } else {
-      slice_sizes.insert(slice_sizes.begin() + axes[0], src.shape(axes[0]));
-      out_ax = max_dims + axes[0];
-    }
+  if (!src_vmapped) {
+    // The gather of the whole batch of indices at once
+    return {gather(src, indices, gather_axes, slice_sizes, stream()), 0};
+  }
+
+  for (auto& ax : gather_axes) {
+    ax += (ax >= axes[0]);
   }
-  return {gather(src, indices, gather_axes, slice_sizes, stream()), out_ax};
+  if (!indices_vmapped) {
+    // Take the whole vectorized axis of the source in each slice
+    slice_sizes.insert(slice_sizes.begin() + axes[0], n);
+    return {
+        gather(src, indices, gather_axes, slice_sizes, stream()),
+        idx_ndim + axes[0]};
+  }
+
+  // Index the vectorized axis of the source with the position in the batch
+  std::vector<int> shape(idx_ndim, 1);
+  shape[0] = n;
+  indices.push_back(reshape(arange(n, stream()), shape, stream()));
+  gather_axes.push_back(axes[0]);
+  slice_sizes.insert(slice_sizes.begin() + axes[0], 1);
+  auto out = gather(src, indices, gather_axes, slice_sizes, stream());
+
+  // Remove the singleton slice of the vectorized axis
+  auto out_shape = out.shape();
+  out_shape.erase(out_shape.begin() + idx_ndim + axes[0]);
+  return {reshape(out, out_shape, stream()), 0};
 }
 
 std::vector<array> Gather::vjp(
@@ -1408,7 +1776,30 @@ std::vector<array> Matmul::vjp(
 std::pair<array, int> Matmul::vmap(
     const std::vector<array>& inputs,
     const std::vector<int>& axes) {
-  return {array(1.0), 0};
+  auto a = inputs[0];
+  auto b = inputs[1];
+  int n = vmap_size(inputs, axes);
+
+  // A single matrix times a batch of matrices is one larger product with the
+  // columns of the batch side by side
+  if (axes[0] == -1 && a.ndim() == 2 && b.ndim() == 3) {
+    int k = a.shape(1);
+    int cols = b.shape(2 - (axes[1] == 2));
+    b = reshape(moveaxis(b, axes[1], 1, stream()), {k, -1}, stream());
+    auto out = reshape(matmul(a, b, stream()), {a.shape(0), n, cols}, stream());
+    return {out, 1};
+  }
+
+  // Otherwise the vectorized axis is a batch dimension of the product which
+  // matmul broadcasts the other input along. A batch of matrices times a
+  // single matrix is one larger product with the rows of the batch stacked.
+  if (axes[0] > 0) {
+    a = moveaxis(a, axes[0], 0, stream());
+  }
+  if (axes[1] > 0) {
+    b = moveaxis(b, axes[1], 0, stream());
+  }
+  return {matmul(a, b, stream()), 0};
 }
 
 std::vector<array> Maximum::vjp(
@@ -1611,7 +2002,35 @@ array Pad::jvp(
 std::pair<array, int> Pad::vmap(
     const std::vector<array>& inputs,
     const std::vector<int>& axes) {
-  throw std::runtime_error("Pad vmap is NYI.");
+  int n = vmap_size(inputs, axes);
+  auto ax = std::max(axes[0], 0);
+  auto in = axes[0] >= 0 ? inputs[0]
+                         : vmap_to_front(inputs[0], -1, n, true, stream());
+  std::vector<int> pad_axes;
+  for (auto pad_ax : axes_) {
+    pad_ax = pad_ax < 0 ? pad_ax + in.ndim() - 1 : pad_ax;
+    pad_axes.push_back(pad_ax + (pad_ax >= ax));
+  }
+  if (axes[1] == -1) {
+    return {
+        pad(in, pad_axes, low_pad_size_, high_pad_size_, inputs[1], stream()),
+        ax};
+  }
+
+  // Select the vectorized pad value outside of the padded input
+  auto out =
+      pad(in, pad_axes, low_pad_size_, high_pad_size_, array(0), stream());
+  auto mask =
+      pad(ones(in.shape(), bool_, stream()),
+          pad_axes,
+          low_pad_size_,
+          high_pad_size_,
+          array(false),
+          stream());
+  std::vector<int> value_shape(out.ndim(), 1);
+  value_shape[ax] = n;
+  auto value = reshape(inputs[1], value_shape, stream());
+  return {where(mask, out, value, stream()), ax};
 }
 
 bool Pad::is_equivalent(const Primitive& other) const {
@@ -1645,7 +2064,9 @@ std::pair<array, int> Partition::vmap(
   assert(inputs.size() == 1);
   assert(axes.size() == 1);
 
-  return {partition(inputs[0], axis_ + (axes[0] <= axis_), stream()), axes[0]};
+  return {
+      partition(inputs[0], kth_, axis_ + (axes[0] <= axis_), stream()),
+      axes[0]};
 }
 
 bool Partition::is_equivalent(const Primitive& other) const {
@@ -1699,7 +2120,18 @@ std::pair<array, int> Power::vmap(
 std::pair<array, int> QuantizedMatmul::vmap(
     const std::vector<array>& inputs,
     const std::vector<int>& axes) {
-  throw std::runtime_error("QuantizedMatmul::vmap NYI");
+  if (std::any_of(
+          axes.begin() + 1, axes.end(), [](int ax) { return ax >= 0; })) {
+    throw std::invalid_argument(
+        "[QuantizedMatmul::vmap] Vectorizing over the quantized matrix is "
+        "not supported.");
+  }
+  // The batch of inputs is one larger product
+  auto x = axes[0] > 0 ? moveaxis(inputs[0], axes[0], 0, stream()) : inputs[0];
+  return {
+      quantized_matmul(
+          x, inputs[1], inputs[2], inputs[3], group_size_, bits_, stream()),
+      0};
 }
 
 std::vector<array> QuantizedMatmul::vjp(
@@ -1768,18 +2200,15 @@ bool RandomBits::is_equivalent(const Primitive& other) const {
 std::pair<array, int> Reshape::vmap(
     const std::vector<array>& inputs,
     const std::vector<int>& axes) {
-  // Transpose the input so that the vmap dim is first.
+  // Move the vmap dim first which is a copy unless it is first already.
   auto& in = inputs[0];
   auto ax = axes[0];
-  std::vector<int> reorder(in.ndim());
-  std::iota(reorder.begin(), reorder.end(), 0);
-  reorder.erase(reorder.begin() + ax);
-  reorder.insert(reorder.begin(), ax);
+  auto out = ax == 0 ? in : moveaxis(in, ax, 0, stream());
   // Insert the vmap dim into the shape at the beginning.
-  auto out = transpose(in, reorder, stream());
-  shape_.insert(shape_.begin(), in.shape()[ax]);
+  auto shape = shape_;
+  shape.insert(shape.begin(), in.shape()[ax]);
   // Reshape the transposed input to the new shape.
-  return {reshape(out, shape_, stream()), 0};
+  return {reshape(out, shape, stream()), 0};
 }
 
 std::vector<array> Reshape::vjp(
@@ -1904,8 +2333,27 @@ std::vector<array> Reduce::vjp(
 std::pair<array, int> Reduce::vmap(
     const std::vector<array>& inputs,
     const std::vector<int>& axes) {
-  // TODO implement
-  return {array(1.0f), axes[0]};
+  auto ax = axes[0];
+  auto reduce_axes = axes_;
+  for (auto& reduce_ax : reduce_axes) {
+    reduce_ax += (reduce_ax >= ax);
+  }
+  auto& in = inputs[0];
+  switch (reduce_type_) {
+    case And:
+      return {all(in, reduce_axes, true, stream()), ax};
+    case Or:
+      return {any(in, reduce_axes, true, stream()), ax};
+    case Sum:
+      return {sum(in, reduce_axes, true, stream()), ax};
+    case Prod:
+      return {prod(in, reduce_axes, true, stream()), ax};
+    case Min:
+      return {min(in, reduce_axes, true, stream()), ax};
+    case Max:
+      return {max(in, reduce_axes, true, stream()), ax};
+  }
+  throw std::invalid_argument("[Reduce::vmap] Unknown reduction.");
 }
 
 bool Reduce::is_equivalent(const Primitive& other) const {
@@ -2003,6 +2451,46 @@ bool Scan::is_equivalent(const Primitive& other) const {
       reverse_ == s_other.reverse_ && inclusive_ == s_other.inclusive_);
 }
 
+std::pair<array, int> Scatter::vmap(
+    const std::vector<array>& inputs,
+    const std::vector<int>& axes) {
+  // Every input gets the vectorized axis in front and the position in the
+  // batch indexes the front axis of the source
+  int n = vmap_size(inputs, axes);
+  int n_indices = inputs.size() - 2;
+  int idx_ndim = n_indices > 0 ? inputs[1].ndim() - (axes[1] >= 0) : 0;
+  std::vector<int> shape(idx_ndim + 1, 1);
+  shape[0] = n;
+  std::vector<array> indices = {reshape(arange(n, stream()), shape, stream())};
+  std::vector<int> scatter_axes = {0};
+  for (int i = 0; i < n_indices; ++i) {
+    indices.push_back(
+        vmap_to_front(inputs[i + 1], axes[i + 1], n, false, stream()));
+    scatter_axes.push_back(axes_[i] + 1);
+  }
+  auto src = vmap_to_front(inputs[0], axes[0], n, true, stream());
+
+  // The update of each position in the batch is a slice of size one of the
+  // front axis of the source
+  auto updates = vmap_to_front(inputs.back(), axes.back(), n, true, stream());
+  shape = updates.shape();
+  shape.insert(shape.begin() + idx_ndim + 1, 1);
+  updates = reshape(updates, shape, stream());
+  switch (reduce_type_) {
+    case Scatter::Max:
+      return {scatter_max(src, indices, updates, scatter_axes, stream()), 0};
+    case Scatter::Min:
+      return {scatter_min(src, indices, updates, scatter_axes, stream()), 0};
+    case Scatter::Sum:
+      return {scatter_add(src, indices, updates, scatter_axes, stream()), 0};
+    case Scatter::Prod:
+      return {scatter_prod(src, indices, updates, scatter_axes, stream()), 0};
+    case Scatter::None:
+      return {scatter(src, indices, updates, scatter_axes, stream()), 0};
+  }
+  throw std::invalid_argument("[Scatter::vmap] Unknown reduction.");
+}
+
 bool Scatter::is_equivalent(const Primitive& other) const {
   const Scatter& s_other = static_cast<const Scatter&>(other);
   return reduce_type_ == s_other.reduce_type_ && axes_ == s_other.axes_;
@@ -2463,13 +2951,14 @@ std::pair<array, int> Transpose::vmap(
   assert(inputs.size() == 1);
   assert(axes.size() == 1);
   auto vdim = axes[0];
-  for (auto& dim : axes_) {
+  auto t_axes = axes_;
+  for (auto& dim : t_axes) {
     if (dim >= vdim) {
       dim++;
     }
   }
-  axes_.insert(axes_.begin() + vdim, vdim);
-  return {transpose(inputs[0], axes_, stream()), vdim};
+  t_axes.insert(t_axes.begin() + vdim, vdim);
+  return {transpose(inputs[0], t_axes, stream()), vdim};
 }
 
 bool Transpose::is_equivalent(const Primitive& other) const {
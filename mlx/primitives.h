@@ -6,6 +6,7 @@
 #include "device.h"
 #include "io/load.h"
 #include "stream.h"
+#include "transforms.h"
 
 #define DEFINE_GRADS()                           \
   array jvp(                                     \
@@ -306,6 +307,10 @@ class ArgReduce : public Primitive {
   void eval_cpu(const std::vector<array>& inputs, array& out) override;
   void eval_gpu(const std::vector<array>& inputs, array& out) override;
 
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
   DEFINE_PRINT(ArgReduce)
   bool is_equivalent(const Primitive& other) const override;
 
@@ -370,6 +375,10 @@ class AsStrided : public Primitive {
   void eval_cpu(const std::vector<array>& inputs, array& out) override;
   void eval_gpu(const std::vector<array>& inputs, array& out) override;
 
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
   DEFINE_GRADS()
   DEFINE_PRINT(AsStrided)
   bool is_equivalent(const Primitive& other) const override;
@@ -423,6 +432,71 @@ class Ceil : public Primitive {
   void eval(const std::vector<array>& inputs, array& out);
 };
 
+class Checkpoint : public Primitive {
+ public:
+  /**
+   * An output of a function whose intermediate arrays are recomputed when
+   * the gradient is needed instead of being kept alive. The inputs are the
+   * inputs of the function followed by the computed output and the output
+   * is a copy of the last input.
+   */
+  explicit Checkpoint(
+      Stream stream,
+      std::function<std::vector<array>(const std::vector<array>&)> fun,
+      int output)
+      : Primitive(stream), fun_(std::move(fun)), output_(output){};
+
+  void eval_cpu(const std::vector<array>& inputs, array& out) override;
+  void eval_gpu(const std::vector<array>& inputs, array& out) override;
+
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
+  DEFINE_GRADS()
+  DEFINE_PRINT(Checkpoint)
+
+ private:
+  std::function<std::vector<array>(const std::vector<array>&)> fun_;
+  int output_;
+
+  // The function restricted to the output of the primitive
+  std::function<std::vector<array>(const std::vector<array>&)> output_fun();
+
+  void eval(const std::vector<array>& inputs, array& out);
+};
+
+class Compiled : public Primitive {
+ public:
+  /**
+   * A chain of elementwise primitives fused by compile. The tape holds the
+   * arrays of the chain in topological order and its last array is the
+   * output. The inputs are the arrays the chain reads from outside of it.
+   */
+  explicit Compiled(
+      Stream stream,
+      std::vector<array> inputs,
+      std::vector<array> tape)
+      : Primitive(stream),
+        inputs_(std::move(inputs)),
+        tape_(std::move(tape)){};
+
+  void eval_cpu(const std::vector<array>& inputs, array& out) override;
+  void eval_gpu(const std::vector<array>& inputs, array& out) override;
+
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
+  void print(std::ostream& os) override;
+
+ private:
+  std::vector<array> inputs_;
+  std::vector<array> tape_;
+
+  void eval(const std::vector<array>& inputs, array& out);
+};
+
 class Concatenate : public Primitive {
  public:
   explicit Concatenate(Stream stream, int axis)
@@ -462,6 +536,10 @@ class Convolution : public Primitive {
   void eval_cpu(const std::vector<array>& inputs, array& out) override;
   void eval_gpu(const std::vector<array>& inputs, array& out) override;
 
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
   std::vector<array> vjp(
       const std::vector<array>& primals,
       const array& cotan,
@@ -536,6 +614,70 @@ class Cosh : public Primitive {
   void eval(const std::vector<array>& inputs, array& out);
 };
 
+class CustomTransforms : public Primitive {
+ public:
+  /**
+   * An output of a function whose gradients are computed by user given
+   * functions. The inputs are the inputs of the function followed by its
+   * computed outputs and the output is a copy of the computed output.
+   */
+  explicit CustomTransforms(
+      Stream stream,
+      std::function<std::vector<array>(const std::vector<array>&)> fun,
+      CustomVJPFunction fun_vjp,
+      CustomJVPFunction fun_jvp,
+      int num_outputs,
+      int output)
+      : Primitive(stream),
+        fun_(std::move(fun)),
+        fun_vjp_(std::move(fun_vjp)),
+        fun_jvp_(std::move(fun_jvp)),
+        num_outputs_(num_outputs),
+        output_(output){};
+
+  void eval_cpu(const std::vector<array>& inputs, array& out) override;
+  void eval_gpu(const std::vector<array>& inputs, array& out) override;
+
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
+  DEFINE_GRADS()
+  DEFINE_PRINT(CustomTransforms)
+
+ private:
+  std::function<std::vector<array>(const std::vector<array>&)> fun_;
+  CustomVJPFunction fun_vjp_;
+  CustomJVPFunction fun_jvp_;
+  int num_outputs_;
+  int output_;
+
+  void eval(const std::vector<array>& inputs, array& out);
+};
+
+class Depends : public Primitive {
+ public:
+  /**
+   * A copy of the first input which is only computed once the rest of the
+   * inputs are computed.
+   */
+  explicit Depends(Stream stream) : Primitive(stream){};
+
+  void eval_cpu(const std::vector<array>& inputs, array& out) override;
+  void eval_gpu(const std::vector<array>& inputs, array& out) override;
+
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
+  DEFINE_GRADS()
+  DEFINE_PRINT(Depends)
+  DEFINE_DEFAULT_IS_EQUIVALENT()
+
+ private:
+  void eval(const std::vector<array>& inputs, array& out);
+};
+
 class Divide : public Primitive {
  public:
   explicit Divide(Stream stream) : Primitive(stream){};
@@ -1222,6 +1364,13 @@ class Reduce : public Primitive {
   }
   bool is_equivalent(const Primitive& other) const override;
 
+  ReduceType reduce_type() const {
+    return reduce_type_;
+  }
+  const std::vector<int>& axes() const {
+    return axes_;
+  }
+
  private:
   ReduceType reduce_type_;
   std::vector<int> axes_;
@@ -1314,6 +1463,10 @@ class Scatter : public Primitive {
   void eval_cpu(const std::vector<array>& inputs, array& out) override;
   void eval_gpu(const std::vector<array>& inputs, array& out) override;
 
+  std::pair<array, int> vmap(
+      const std::vector<array>& inputs,
+      const std::vector<int>& axes) override;
+
   DEFINE_PRINT(Scatter)
   bool is_equivalent(const Primitive& other) const override;
 
@@ -1619,6 +1772,10 @@ class Transpose : public Primitive {
   DEFINE_PRINT(Transpose)
   bool is_equivalent(const Primitive& other) const override;
 
+  const std::vector<int>& axes() const {
+    return axes_;
+  }
+
  private:
   std::vector<int> axes_;
 
@@ -0,0 +1,190 @@
+// Copyright © 2023 Apple Inc.
+
+#include <algorithm>
+#include <iomanip>
+#include <map>
+#include <mutex>
+#include <sstream>
+
+#include "mlx/primitives.h"
+#include "mlx/profiler.h"
+#include "mlx/utils.h"
+
+namespace mlx::core::profiler {
+
+namespace detail {
+
+std::atomic<bool> enabled{false};
+
+} // namespace detail
+
+namespace {
+
+struct Recorder {
+  std::mutex mtx;
+  std::chrono::steady_clock::time_point origin;
+  std::vector<Event> events;
+};
+
+Recorder& recorder() {
+  static Recorder recorder_;
+  return recorder_;
+}
+
+int thread_index() {
+  static std::atomic<int> n_threads{0};
+  thread_local int index = n_threads++;
+  return index;
+}
+
+double microseconds(
+    std::chrono::steady_clock::time_point t,
+    std::chrono::steady_clock::time_point origin) {
+  return std::chrono::duration<double, std::micro>(t - origin).count();
+}
+
+// The shape as a JSON list
+std::string to_json(const std::vector<int>& shape) {
+  std::ostringstream os;
+  os << "[";
+  for (int i = 0; i < shape.size(); i++) {
+    os << (i > 0 ? ", " : "") << shape[i];
+  }
+  os << "]";
+  return os.str();
+}
+
+std::string escape(const std::string& s) {
+  std::string out;
+  for (auto c : s) {
+    if (c == '"' || c == '\\') {
+      out.push_back('\\');
+    }
+    out.push_back(c);
+  }
+  return out;
+}
+
+} // namespace
+
+void start() {
+  auto& r = recorder();
+  {
+    std::lock_guard<std::mutex> lk(r.mtx);
+    r.events.clear();
+    r.origin = now();
+  }
+  detail::enabled = true;
+}
+
+void stop() {
+  detail::enabled = false;
+}
+
+std::vector<Event> events() {
+  auto& r = recorder();
+  std::lock_guard<std::mutex> lk(r.mtx);
+  return r.events;
+}
+
+void record(
+    array& arr,
+    std::chrono::steady_clock::time_point enqueue_time,
+    std::chrono::steady_clock::time_point start_time,
+    std::chrono::steady_clock::time_point end_time) {
+  std::ostringstream name;
+  arr.primitive().print(name);
+
+  std::vector<std::vector<int>> input_shapes;
+  // The output allocated nothing if it is a view of an input or if an input
+  // donated its buffer, which leaves the input without data
+  bool shared = !arr.is_evaled();
+  for (auto& in : arr.inputs()) {
+    input_shapes.push_back(in.shape());
+    shared = shared || !in.is_evaled() ||
+        in.buffer().ptr() == arr.buffer().ptr();
+  }
+  size_t bytes_allocated = shared ? 0 : arr.data_size() * arr.itemsize();
+
+  auto& r = recorder();
+  std::lock_guard<std::mutex> lk(r.mtx);
+  r.events.push_back(
+      {name.str(),
+       arr.primitive().stream(),
+       thread_index(),
+       std::move(input_shapes),
+       arr.shape(),
+       bytes_allocated,
+       microseconds(enqueue_time, r.origin),
+       microseconds(start_time, r.origin),
+       microseconds(end_time, r.origin)});
+}
+
+void export_chrome_trace(std::ostream& os, const std::vector<Event>& events) {
+  os << "{\"traceEvents\": [";
+  for (int i = 0; i < events.size(); i++) {
+    auto& e = events[i];
+    std::ostringstream stream;
+    stream << e.stream;
+    os << (i > 0 ? "," : "") << "\n  {\"name\": \"" << escape(e.name)
+       << "\", \"cat\": \"" << e.stream.device << "\", \"ph\": \"X\""
+       << ", \"pid\": 0, \"tid\": " << e.thread << std::fixed
+       << std::setprecision(3) << ", \"ts\": " << e.start_time
+       << ", \"dur\": " << e.end_time - e.start_time << ", \"args\": {"
+       << "\"stream\": \"" << escape(stream.str()) << "\", \"inputs\": [";
+    for (int j = 0; j < e.input_shapes.size(); j++) {
+      os << (j > 0 ? ", " : "") << to_json(e.input_shapes[j]);
+    }
+    os << "], \"output\": " << to_json(e.output_shape)
+       << ", \"bytes_allocated\": " << e.bytes_allocated
+       << ", \"queue_wait_us\": " << e.start_time - e.enqueue_time << "}}";
+  }
+  os << "\n]}\n";
+  os << std::defaultfloat;
+}
+
+void print_summary(std::ostream& os, const std::vector<Event>& events) {
+  struct Stats {
+    int count{0};
+    double total{0};
+    double max{0};
+    size_t bytes{0};
+  };
+  std::map<std::string, Stats> stats;
+  double total = 0;
+  for (auto& e : events) {
+    auto& s = stats[e.name];
+    auto duration = e.end_time - e.start_time;
+    s.count++;
+    s.total += duration;
+    s.max = std::max(s.max, duration);
+    s.bytes += e.bytes_allocated;
+    total += duration;
+  }
+
+  // Most expensive primitives first
+  std::vector<std::pair<std::string, Stats>> rows(stats.begin(), stats.end());
+  std::stable_sort(rows.begin(), rows.end(), [](auto& a, auto& b) {
+    return a.second.total > b.second.total;
+  });
+
+  int name_width = 9;
+  for (auto& [name, _] : rows) {
+    name_width = std::max<int>(name_width, name.size());
+  }
+  os << std::left << std::setw(name_width) << "Primitive" << std::right
+     << std::setw(8) << "Count" << std::setw(14) << "Total (us)"
+     << std::setw(12) << "Mean (us)" << std::setw(12) << "Max (us)"
+     << std::setw(8) << "%" << std::setw(16) << "Bytes allocated" << "\n";
+  os << std::fixed;
+  for (auto& [name, s] : rows) {
+    os << std::left << std::setw(name_width) << name << std::right
+       << std::setw(8) << s.count << std::setprecision(1) << std::setw(14)
+       << s.total << std::setw(12) << s.total / s.count << std::setw(12)
+       << s.max << std::setw(8) << (total > 0 ? 100 * s.total / total : 0.0)
+       << std::setw(16) << s.bytes << "\n";
+  }
+  os << std::defaultfloat;
+}
+
+} // namespace mlx::core::profiler
@@ -0,0 +1,83 @@
+// Copyright © 2023 Apple Inc.
+
+#pragma once
+
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <ostream>
+#include <string>
+#include <vector>
+
+#include "mlx/array.h"
+#include "mlx/stream.h"
+
+namespace mlx::core::profiler {
+
+/** A primitive evaluated while the profiler was enabled. */
+struct Event {
+  std::string name;
+  Stream stream;
+  // A small integer identifying the thread which evaluated the primitive
+  int thread;
+  std::vector<std::vector<int>> input_shapes;
+  std::vector<int> output_shape;
+  // The bytes of the output buffer if it was newly allocated and 0 if it is
+  // shared with or donated by one of the inputs
+  size_t bytes_allocated;
+  // Times in microseconds since the profiler was started. The primitive is
+  // enqueued at eval and waits for its inputs and its turn on the stream
+  // until start. For GPU primitives end marks the end of the encoding.
+  double enqueue_time;
+  double start_time;
+  double end_time;
+};
+
+namespace detail {
+
+extern std::atomic<bool> enabled;
+
+} // namespace detail
+
+/** Start recording the evaluated primitives and clear the recorded events. */
+void start();
+
+/** Stop recording the evaluated primitives. */
+void stop();
+
+/** Check if the evaluated primitives are being recorded. */
+inline bool is_enabled() {
+  return detail::enabled.load(std::memory_order_relaxed);
+}
+
+/** Get the events recorded since the profiler was last started. */
+std::vector<Event> events();
+
+/**
+ * Write the events in the Chrome trace event format which can be opened in
+ * chrome://tracing or https://ui.perfetto.dev.
+ */
+void export_chrome_trace(std::ostream& os, const std::vector<Event>& events);
+
+/**
+ * Write a table with the count, the total, mean and max times, the share of
+ * the time and the bytes allocated of each primitive type.
+ */
+void print_summary(std::ostream& os, const std::vector<Event>& events);
+
+/** The current time in the clock of the profiler. */
+inline std::chrono::steady_clock::time_point now() {
+  return std::chrono::steady_clock::now();
+}
+
+/**
+ * Record the evaluation of the primitive of arr. Must be called after the
+ * primitive is evaluated and before the array is detached.
+ */
+void record(
+    array& arr,
+    std::chrono::steady_clock::time_point enqueue_time,
+    std::chrono::steady_clock::time_point start_time,
+    std::chrono::steady_clock::time_point end_time);
+
+} // namespace mlx::core::profiler
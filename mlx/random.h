@@ -16,6 +16,14 @@ class KeySequence {
   void seed(uint64_t seed);
   array next();
 
+  // The key the next keys are split from
+  const array& state() const {
+    return key_;
+  }
+  void set_state(array state) {
+    key_ = std::move(state);
+  }
+
   // static defualt
   static KeySequence& default_() {
     static KeySequence ks(0);
@@ -8,6 +8,7 @@
 #include <thread>
 #include <unordered_map>
 
+#include "mlx/backend/common/threading.h"
 #include "mlx/backend/metal/metal.h"
 #include "mlx/device.h"
 #include "mlx/stream.h"
@@ -38,17 +39,20 @@ struct StreamThread {
     auto thread_pool = metal::new_scoped_memory_pool();
     metal::new_stream(stream);
     while (true) {
-      std::function<void()> task;
+      // Take every queued task at once to lock once per batch
+      std::queue<std::function<void()>> tasks;
       {
         std::unique_lock<std::mutex> lk(mtx);
         cond.wait(lk, [this] { return !this->q.empty() || this->stop; });
         if (q.empty() && stop) {
           return;
         }
-        task = std::move(q.front());
-        q.pop();
+        std::swap(tasks, q);
+      }
+      while (!tasks.empty()) {
+        tasks.front()();
+        tasks.pop();
       }
-      task();
     }
   }
 
@@ -64,6 +68,23 @@ struct StreamThread {
     }
     cond.notify_one();
   }
+
+  void enqueue_batch(std::vector<std::function<void()>> tasks) {
+    if (tasks.empty()) {
+      return;
+    }
+    {
+      std::unique_lock<std::mutex> lk(mtx);
+      if (stop) {
+        throw std::runtime_error(
+            "Cannot enqueue work after stream is stopped.");
+      }
+      for (auto& task : tasks) {
+        q.push(std::move(task));
+      }
+    }
+    cond.notify_one();
+  }
 };
 
 class Scheduler {
@@ -90,6 +111,12 @@ class Scheduler {
   template <typename F>
   void enqueue(const Stream& stream, F&& f);
 
+  void enqueue_batch(
+      const Stream& stream,
+      std::vector<std::function<void()>> tasks) {
+    streams_[stream.index]->enqueue_batch(std::move(tasks));
+  }
+
   Stream get_default_stream(const Device& d) {
     return default_streams_.at(d.type);
   }
@@ -98,20 +125,24 @@ class Scheduler {
     default_streams_.at(s.device.type) = s;
   }
 
+  void set_affinity(const Stream& s, const std::vector<int>& cpus) {
+    threading::set_affinity(streams_[s.index]->thread, cpus);
+  }
+
+  // The number of active tasks is updated without locking. Only the threads
+  // waiting for a task to complete take the lock.
   void notify_new_task(const Stream& stream) {
-    {
-      std::unique_lock<std::mutex> lk(mtx);
-      n_active_tasks_++;
-    }
-    completion_cv.notify_all();
+    n_active_tasks_++;
   }
 
   void notify_task_completion(const Stream& stream) {
-    {
+    n_active_tasks_--;
+    if (n_waiters_ > 0) {
+      // Locking makes sure a waiter which saw the old count is waiting
       std::unique_lock<std::mutex> lk(mtx);
-      n_active_tasks_--;
+      lk.unlock();
+      completion_cv.notify_all();
     }
-    completion_cv.notify_all();
   }
 
   int n_active_tasks() const {
@@ -122,9 +153,11 @@ class Scheduler {
     std::unique_lock<std::mutex> lk(mtx);
     int n_tasks_old = n_active_tasks();
     if (n_tasks_old > 1) {
+      n_waiters_++;
       completion_cv.wait(lk, [this, n_tasks_old] {
         return this->n_active_tasks() != n_tasks_old;
       });
+      n_waiters_--;
     }
   }
 
@@ -135,7 +168,8 @@ class Scheduler {
   }
 
  private:
-  int n_active_tasks_;
+  std::atomic<int> n_active_tasks_;
+  std::atomic<int> n_waiters_{0};
   std::vector<StreamThread*> streams_;
   std::unordered_map<Device::DeviceType, Stream> default_streams_;
   std::condition_variable completion_cv;
@@ -154,6 +188,13 @@ void enqueue(const Stream& stream, F&& f) {
   scheduler().enqueue(stream, std::forward<F>(f));
 }
 
+// Enqueue the tasks in order with a single submission to the stream
+inline void enqueue_batch(
+    const Stream& stream,
+    std::vector<std::function<void()>> tasks) {
+  scheduler().enqueue_batch(stream, std::move(tasks));
+}
+
 inline int n_active_tasks() {
   return scheduler().n_active_tasks();
 }
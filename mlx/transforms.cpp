@@ -1,17 +1,23 @@
 // Copyright © 2023 Apple Inc.
 
 #include <algorithm>
+#include <atomic>
 #include <future>
 #include <map>
 #include <numeric>
+#include <queue>
 #include <set>
 #include <sstream>
+#include <typeindex>
 #include <unordered_map>
 #include <unordered_set>
 
+#include "mlx/backend/common/threading.h"
 #include "mlx/backend/metal/metal.h"
 #include "mlx/ops.h"
 #include "mlx/primitives.h"
+#include "mlx/profiler.h"
+#include "mlx/random.h"
 #include "mlx/scheduler.h"
 #include "mlx/transforms.h"
 #include "mlx/transforms_impl.h"
@@ -19,25 +25,42 @@
 
 namespace mlx::core {
 
+namespace {
+
+size_t hash_combine(size_t seed, size_t value) {
+  return seed ^ (value + 0x9e3779b9 + (seed << 6) + (seed >> 2));
+}
+
+// The value and type of a scalar
+using ScalarKey = std::pair<uint64_t, Dtype::Val>;
+
+struct ScalarKeyHash {
+  size_t operator()(const ScalarKey& key) const {
+    return hash_combine(
+        std::hash<uint64_t>{}(key.first), static_cast<size_t>(key.second));
+  }
+};
+
+} // namespace
+
 void simplify(const std::vector<array>& outputs) {
-  std::function<void(const array&)> recurse;
-  std::queue<array> tape;
+  std::vector<array> tape;
   std::unordered_set<std::uintptr_t> cache;
-  std::unordered_map<std::uintptr_t, std::vector<std::pair<array, int>>>
-      parents_map;
 
   // Helpers to identify identical scalars
-  std::map<std::pair<uint64_t, Dtype::Val>, array> scalars;
+  std::unordered_map<ScalarKey, array, ScalarKeyHash> scalars;
   auto is_scalar = [](const array& a) {
     return a.is_evaled() && a.ndim() == 0;
   };
   auto get_scalar_rep = [](const array& a) {
     uint64_t v = 0;
-    int dtype;
     switch (a.dtype().size) {
       case 1:
         v = *a.data<uint8_t>();
         break;
+      case 2:
+        v = *a.data<uint16_t>();
+        break;
       case 4:
         v = *a.data<uint32_t>();
         break;
@@ -48,50 +71,26 @@ void simplify(const std::vector<array>& outputs) {
     return std::make_pair(v, a.dtype().val);
   };
 
-  // DFS the graph to log the parents
-  recurse = [&](const array& a) {
-    auto id = a.id();
-    if (cache.find(id) != cache.end()) {
-      return;
-    }
-    for (int i = 0; i < a.inputs().size(); i++) {
-      auto& in = a.inputs()[i];
-      parents_map[in.id()].push_back({a, i});
-      recurse(in);
-    }
-    cache.insert(id);
-    tape.push(a);
-    if (is_scalar(a)) {
-      scalars.insert({get_scalar_rep(a), a});
-    }
-  };
-  for (auto& a : outputs) {
-    recurse(a);
-  }
-
-  // Helper that fuses two arrays in the graph by setting the parents of the
-  // source to point to the destination
-  auto fuse = [&](array& dst, array& src) {
-    auto src_parents = parents_map.find(src.id());
-    if (src_parents == parents_map.end()) {
-      return;
-    }
+  // DFS the graph to sort it topologically
+  detail::depth_first(
+      outputs,
+      [&](const array& a) {
+        // The graph of a pending array is owned by the stream threads
+        return !a.is_pending() && cache.insert(a.id()).second;
+      },
+      [&](const array& a) { tape.push_back(a); });
 
-    auto& pairs = parents_map[dst.id()];
-    for (auto& parent : src_parents->second) {
-      parent.first.editable_inputs()[parent.second] = dst;
-      pairs.push_back(parent);
+  // Arrays are equivalent if they have the same primitive and the same
+  // inputs. The hash covers the type of the primitive and the inputs while
+  // the parameters of the primitives are compared with is_equivalent.
+  auto array_hash = [](const array& a) {
+    size_t h = std::hash<std::type_index>{}(typeid(a.primitive()));
+    for (auto& in : a.inputs()) {
+      h = hash_combine(h, std::hash<std::uintptr_t>{}(in.id()));
     }
+    return h;
   };
-
-  // Walk the graph
-  cache.clear();
-
-  // Depth-1 array equivalence check.
   auto array_equivalent = [](const array& a, const array& b) {
-    if (!a.has_primitive() || !b.has_primitive()) {
-      return false;
-    }
     const auto& pa = a.primitive();
     const auto& pb = b.primitive();
     if (typeid(pa) != typeid(pb)) {
@@ -111,50 +110,229 @@ void simplify(const std::vector<array>& outputs) {
     return pa.is_equivalent(pb);
   };
 
-  while (!tape.empty()) {
-    auto arr = std::move(tape.front());
-    tape.pop();
-
-    if (cache.find(arr.id()) != cache.end()) {
-      continue;
+  // Walk the graph in topological order. The inputs of an array are replaced
+  // by their representatives before the array is looked up so equivalence
+  // extends to arrays whose inputs were fused.
+  std::unordered_map<std::uintptr_t, std::vector<array>> buckets;
+  std::unordered_map<std::uintptr_t, array> representatives;
+  for (auto& arr : tape) {
+    auto& inputs = arr.editable_inputs();
+    for (auto& in : inputs) {
+      if (auto it = representatives.find(in.id());
+          it != representatives.end()) {
+        in = it->second;
+      }
     }
 
     // Check if we can fuse scalars
     if (is_scalar(arr)) {
-      auto scalar = scalars.find(get_scalar_rep(arr));
-      if (scalar->second.id() != arr.id()) {
-        fuse(scalar->second, arr);
-        arr = scalar->second;
+      auto [scalar, inserted] = scalars.insert({get_scalar_rep(arr), arr});
+      if (!inserted) {
+        representatives.insert({arr.id(), scalar->second});
       }
+      continue;
+    }
+    if (!arr.has_primitive()) {
+      continue;
     }
 
-    // Check if we can fuse the parents of this array
-    auto parents = parents_map.find(arr.id());
-    if (parents != parents_map.end()) {
-      std::vector<bool> mask(parents->second.size(), false);
-      auto N = parents->second.size();
-      for (int i = 0; i < N; i++) {
-        if (mask[i]) {
+    auto& bucket = buckets[array_hash(arr)];
+    auto equivalent = std::find_if(
+        bucket.begin(), bucket.end(), [&](const array& other) {
+          return array_equivalent(other, arr);
+        });
+    if (equivalent != bucket.end()) {
+      representatives.insert({arr.id(), *equivalent});
+    } else {
+      bucket.push_back(arr);
+    }
+  }
+}
+
+namespace {
+
+std::atomic<bool> memory_efficient_eval{false};
+
+// The bytes eval allocates for the output of an array in the tape
+size_t allocated_nbytes(const array& a) {
+  return a.is_evaled() ? 0 : a.nbytes();
+}
+
+// The arrays of a tape with the positions of their inputs and consumers in
+// the tape
+struct TapeGraph {
+  std::vector<std::vector<int>> inputs;
+  std::vector<std::vector<int>> consumers;
+  // Whether an array can be freed after its last use in the tape
+  std::vector<bool> is_intermediate;
+
+  TapeGraph(const std::vector<array>& tape, const std::vector<array>& outputs)
+      : inputs(tape.size()),
+        consumers(tape.size()),
+        is_intermediate(tape.size(), true) {
+    std::unordered_map<std::uintptr_t, int> positions;
+    for (int i = 0; i < tape.size(); i++) {
+      positions.insert({tape[i].id(), i});
+    }
+    for (auto& out : outputs) {
+      if (auto it = positions.find(out.id()); it != positions.end()) {
+        is_intermediate[it->second] = false;
+      }
+    }
+    for (int i = 0; i < tape.size(); i++) {
+      for (auto& in : tape[i].inputs()) {
+        auto it = positions.find(in.id());
+        if (it == positions.end()) {
           continue;
         }
-        for (int j = i + 1; j < N; j++) {
-          if (mask[j]) {
-            continue;
-          }
-          auto& src = parents->second[j].first;
-          auto& dst = parents->second[i].first;
-          if (src.id() != dst.id() && array_equivalent(src, dst)) {
-            cache.insert(src.id());
-            fuse(dst, src);
-            mask[j] = true;
+        int j = it->second;
+        if (std::find(inputs[i].begin(), inputs[i].end(), j) ==
+            inputs[i].end()) {
+          inputs[i].push_back(j);
+          consumers[j].push_back(i);
+        }
+      }
+    }
+  }
+};
+
+// Reorder a topologically sorted tape to reduce the bytes of the arrays
+// alive at once. Of the arrays whose inputs are computed, the one which
+// frees the most bytes net of the bytes of its output runs first and ties
+// keep the original order.
+std::vector<array> memory_efficient_order(
+    std::vector<array> tape,
+    const std::vector<array>& outputs) {
+  int n = tape.size();
+  TapeGraph graph(tape, outputs);
+  std::vector<int> remaining_uses(n);
+  std::vector<int> remaining_inputs(n);
+  for (int i = 0; i < n; i++) {
+    remaining_uses[i] = graph.consumers[i].size();
+    remaining_inputs[i] = graph.inputs[i].size();
+  }
+
+  std::vector<int64_t> scores(n);
+  std::vector<bool> scheduled(n, false);
+  // Entries are (score, -position) so that ties go to the earliest array
+  std::priority_queue<std::pair<int64_t, int>> ready;
+  auto push_ready = [&](int i) {
+    int64_t score = -static_cast<int64_t>(allocated_nbytes(tape[i]));
+    for (auto j : graph.inputs[i]) {
+      if (remaining_uses[j] == 1 && graph.is_intermediate[j]) {
+        score += allocated_nbytes(tape[j]);
+      }
+    }
+    scores[i] = score;
+    ready.push({score, -i});
+  };
+  for (int i = 0; i < n; i++) {
+    if (remaining_inputs[i] == 0) {
+      push_ready(i);
+    }
+  }
+
+  std::vector<array> ordered;
+  ordered.reserve(n);
+  while (!ready.empty()) {
+    auto [score, neg_i] = ready.top();
+    ready.pop();
+    int i = -neg_i;
+    // Skip the entries whose score was updated
+    if (scheduled[i] || score != scores[i]) {
+      continue;
+    }
+    scheduled[i] = true;
+    ordered.push_back(std::move(tape[i]));
+    for (auto j : graph.inputs[i]) {
+      // The last user of an input now frees it
+      if (--remaining_uses[j] == 1) {
+        for (auto k : graph.consumers[j]) {
+          if (!scheduled[k] && remaining_inputs[k] == 0) {
+            push_ready(k);
           }
         }
       }
     }
+    for (auto k : graph.consumers[i]) {
+      if (--remaining_inputs[k] == 0) {
+        push_ready(k);
+      }
+    }
   }
+  return ordered;
 }
 
-void eval(const std::vector<array>& outputs, bool retain_graph /* = false */) {
+// A primitive evaluated on the CPU
+struct CpuTask {
+  array arr;
+  // The events of the inputs which are not computed by the same CPU graph
+  std::vector<std::shared_future<void>> deps;
+  std::shared_ptr<std::promise<void>> p;
+  // The tasks of the same stream which use the output of this task
+  std::vector<int> outputs;
+  int n_inputs{0};
+};
+
+// Evaluate the tasks of one eval on a CPU stream. Independent tasks run
+// concurrently on the task pool while work on the stream after the graph
+// still waits for all of it.
+void eval_cpu_graph(
+    const Stream& stream,
+    std::vector<CpuTask> tasks,
+    bool retain_graph) {
+  scheduler::enqueue(
+      stream,
+      [stream,
+       tasks = std::move(tasks),
+       retain_graph,
+       enqueue_time = profiler::now()]() mutable {
+        std::vector<std::vector<int>> outputs;
+        std::vector<int> n_inputs;
+        for (auto& t : tasks) {
+          outputs.push_back(std::move(t.outputs));
+          n_inputs.push_back(t.n_inputs);
+        }
+        auto wait = [&tasks](int i) {
+          for (auto& d : tasks[i].deps) {
+            d.wait();
+          }
+        };
+        auto run = [&tasks, &stream, retain_graph, enqueue_time](int i) {
+          // Release the task's reference to the array once it is computed so
+          // its buffer can be donated to the arrays using it
+          auto arr = std::move(tasks[i].arr);
+          auto p = std::move(tasks[i].p);
+          scheduler::notify_new_task(stream);
+          // Holding extra references to the inputs keeps their buffers from
+          // being donated to the output when the graph is retained
+          auto retained_inputs =
+              retain_graph ? arr.inputs() : std::vector<array>{};
+          if (profiler::is_enabled()) {
+            auto start_time = profiler::now();
+            arr.primitive().eval_cpu(arr.inputs(), arr);
+            profiler::record(arr, enqueue_time, start_time, profiler::now());
+          } else {
+            arr.primitive().eval_cpu(arr.inputs(), arr);
+          }
+          if (!retain_graph) {
+            arr.detach();
+          }
+          if (p) {
+            p->set_value();
+          }
+          scheduler::notify_task_completion(stream);
+        };
+        threading::task_pool().run_graph(outputs, n_inputs, wait, run);
+      });
+}
+
+// Enqueue the graph of the outputs on the streams. Returns the events of the
+// outputs which are not evaluated yet.
+std::vector<std::shared_future<void>> eval_impl(
+    const std::vector<array>& outputs,
+    bool retain_graph,
+    bool async) {
   if (!retain_graph) {
     for (auto& out : outputs) {
       if (out.has_primitive() && out.is_tracer()) {
@@ -164,50 +342,75 @@ void eval(const std::vector<array>& outputs, bool retain_graph /* = false */) {
       }
     }
   }
-  std::function<void(const array&)> recurse;
-  std::queue<array> tape;
+  if (int level = get_optimization_level(); level > 0) {
+    optimize(outputs, level);
+  }
+  std::vector<array> tape;
   std::unordered_set<std::uintptr_t> cache;
   std::unordered_map<std::uintptr_t, std::shared_future<void>> deps;
 
-  recurse = [&](const array& a) {
+  auto enter = [&](const array& a) {
     auto id = a.id();
-    if (cache.find(id) != cache.end()) {
-      return;
+    if (!cache.insert(id).second) {
+      return false;
     }
-    for (auto in : a.inputs()) {
-      recurse(in);
+    // The graph of an array computed by a previous asynchronous eval is
+    // owned by the stream threads, so only wait on its event
+    if (a.is_pending()) {
+      deps.insert({id, a.event()});
+      return false;
+    }
+    return true;
+  };
+  auto leave = [&](const array& a) {
+    for (auto& in : a.inputs()) {
       // If one of the inputs is being computed on a different
       // stream, we need to manage the dependency.
-      if (!in.is_evaled()) {
+      if (deps.find(in.id()) == deps.end() && !in.is_evaled()) {
         if (a.primitive().stream() != in.primitive().stream()) {
           deps.insert({in.id(), std::shared_future<void>{}});
         }
       }
     }
-    cache.insert(id);
     if (!a.is_evaled() || (!retain_graph && a.has_primitive())) {
       if (!a.has_primitive()) {
         throw std::invalid_argument(
             "[eval] Attempting to eval an array without a primitive.");
       }
-      tape.push(a);
+      tape.push_back(a);
     }
   };
 
+  std::vector<array> to_traverse;
   for (auto& arr : outputs) {
-    if (!arr.is_evaled() || (!retain_graph && arr.has_primitive())) {
-      recurse(arr);
-      // Insert a dependency for every output to synchronize
-      // with at the end.
-      if (!arr.is_evaled()) {
-        deps.insert({arr.id(), std::shared_future<void>{}});
-      }
+    // Pending outputs are synchronized with through their event
+    if (arr.is_pending() || !arr.is_evaled() ||
+        (!retain_graph && arr.has_primitive())) {
+      to_traverse.push_back(arr);
+    }
+  }
+  detail::depth_first(to_traverse, enter, leave);
+  if (memory_efficient_eval) {
+    tape = memory_efficient_order(std::move(tape), to_traverse);
+  }
+  // Insert a dependency for every output to synchronize
+  // with at the end.
+  for (auto& arr : to_traverse) {
+    if (!arr.is_pending() && !arr.is_evaled()) {
+      deps.insert({arr.id(), std::shared_future<void>{}});
     }
   }
 
-  while (!tape.empty()) {
-    auto arr = std::move(tape.front());
-    tape.pop();
+  // The CPU tasks of every stream and the stream and index of each of them
+  std::unordered_map<int, std::pair<Stream, std::vector<CpuTask>>> cpu_tasks;
+  std::unordered_map<std::uintptr_t, std::pair<int, int>> cpu_task_ids;
+  // The GPU tasks of every stream which are submitted together
+  using GpuTask = std::function<void()>;
+  std::unordered_map<int, std::pair<Stream, std::vector<GpuTask>>> gpu_tasks;
+
+  for (auto& a : tape) {
+    // Move out of the tape so that the tasks hold the only references
+    auto arr = std::move(a);
     if (arr.is_evaled()) {
       if (!retain_graph && arr.has_primitive()) {
         arr.detach();
@@ -216,9 +419,16 @@ void eval(const std::vector<array>& outputs, bool retain_graph /* = false */) {
     }
 
     auto stream = arr.primitive().stream();
+    bool on_cpu = arr.primitive().device() == Device::cpu;
     std::vector<std::shared_future<void>> arr_deps;
+    std::vector<int> cpu_inputs;
     for (auto& in : arr.inputs()) {
-      if (auto it = deps.find(in.id()); it != deps.end()) {
+      // Inputs computed by the same CPU graph are tracked by the graph
+      if (auto it = cpu_task_ids.find(in.id());
+          on_cpu && it != cpu_task_ids.end() &&
+          it->second.first == stream.index) {
+        cpu_inputs.push_back(it->second.second);
+      } else if (auto it = deps.find(in.id()); it != deps.end()) {
         arr_deps.push_back(it->second);
       }
     }
@@ -227,42 +437,110 @@ void eval(const std::vector<array>& outputs, bool retain_graph /* = false */) {
       p = std::make_unique<std::promise<void>>();
       it->second = p->get_future().share();
     }
+    // Every array of an asynchronous eval gets an event so that it can be
+    // waited on without walking its graph
+    if (async) {
+      if (!p) {
+        p = std::make_unique<std::promise<void>>();
+      }
+      arr.set_event(p->get_future().share());
+    }
 
     if (arr.primitive().device() == Device::gpu) {
       if (!metal::is_available()) {
         throw std::runtime_error("Metal GPU is not available.");
       }
-      scheduler::enqueue(
-          stream,
-          metal::make_task(
+      gpu_tasks.try_emplace(stream.index, stream, std::vector<GpuTask>{})
+          .first->second.second.push_back(metal::make_task(
               arr, std::move(arr_deps), std::move(p), retain_graph));
     } else {
-      auto task = [retain_graph,
-                   arr,
-                   stream,
-                   arr_deps = std::move(arr_deps),
-                   p = std::move(p)]() mutable {
-        for (auto& d : arr_deps) {
-          d.wait();
-        }
-        scheduler::notify_new_task(stream);
-        arr.primitive().eval_cpu(arr.inputs(), arr);
-        if (!retain_graph) {
-          arr.detach();
-        }
-        if (p) {
-          p->set_value();
-        }
-        scheduler::notify_task_completion(stream);
-      };
-      scheduler::enqueue(stream, std::move(task));
+      auto& tasks =
+          cpu_tasks.try_emplace(stream.index, stream, std::vector<CpuTask>{})
+              .first->second.second;
+      int index = tasks.size();
+      // An input can be used more than once by the same array
+      std::sort(cpu_inputs.begin(), cpu_inputs.end());
+      cpu_inputs.erase(
+          std::unique(cpu_inputs.begin(), cpu_inputs.end()), cpu_inputs.end());
+      for (auto i : cpu_inputs) {
+        tasks[i].outputs.push_back(index);
+      }
+      cpu_task_ids.insert({arr.id(), {stream.index, index}});
+      tasks.push_back(
+          {arr,
+           std::move(arr_deps),
+           std::move(p),
+           {},
+           static_cast<int>(cpu_inputs.size())});
     }
   }
+  for (auto& [_, stream_tasks] : gpu_tasks) {
+    scheduler::enqueue_batch(
+        stream_tasks.first, std::move(stream_tasks.second));
+  }
+  for (auto& [_, stream_tasks] : cpu_tasks) {
+    eval_cpu_graph(
+        stream_tasks.first, std::move(stream_tasks.second), retain_graph);
+  }
+  std::vector<std::shared_future<void>> events;
   for (auto& arr : outputs) {
     if (auto it = deps.find(arr.id()); it != deps.end()) {
-      it->second.wait();
+      events.push_back(it->second);
     }
   }
+  return events;
+}
+
+} // namespace
+
+void eval(const std::vector<array>& outputs, bool retain_graph /* = false */) {
+  for (auto& event : eval_impl(outputs, retain_graph, false)) {
+    event.wait();
+  }
+}
+
+void async_eval(const std::vector<array>& outputs) {
+  eval_impl(outputs, false, true);
+}
+
+void set_memory_efficient_eval(bool enabled) {
+  memory_efficient_eval = enabled;
+}
+
+bool get_memory_efficient_eval() {
+  return memory_efficient_eval;
+}
+
+size_t estimate_peak_memory(const std::vector<array>& outputs) {
+  std::vector<array> tape;
+  std::unordered_set<std::uintptr_t> cache;
+  detail::depth_first(
+      outputs,
+      [&](const array& a) {
+        return !a.is_evaled() && !a.is_pending() && cache.insert(a.id()).second;
+      },
+      [&](const array& a) { tape.push_back(a); });
+  if (memory_efficient_eval) {
+    tape = memory_efficient_order(std::move(tape), outputs);
+  }
+
+  TapeGraph graph(tape, outputs);
+  std::vector<int> remaining_uses(tape.size());
+  for (int i = 0; i < tape.size(); i++) {
+    remaining_uses[i] = graph.consumers[i].size();
+  }
+  size_t live = 0;
+  size_t peak = 0;
+  for (int i = 0; i < tape.size(); i++) {
+    live += allocated_nbytes(tape[i]);
+    peak = std::max(peak, live);
+    for (auto j : graph.inputs[i]) {
+      if (--remaining_uses[j] == 0 && graph.is_intermediate[j]) {
+        live -= allocated_nbytes(tape[j]);
+      }
+    }
+  }
+  return peak;
 }
 
 std::pair<std::vector<array>, std::vector<array>> vjp(
@@ -316,38 +594,30 @@ std::pair<std::vector<array>, std::vector<array>> vjp(
 
   std::vector<array> tape;
 
-  std::function<void(array&)> recurse;
-  recurse = [&](auto& a) {
-    auto id = a.id();
-    a.set_tracer(false);
-
-    // Check if visited and add to cache if not
-    if (auto inserted = cache.insert(id); !inserted.second) {
-      return;
-    }
-
-    for (auto& input : a.editable_inputs()) {
-      recurse(input);
-    }
-
-    // Stop grad
-    if (a.has_primitive() && typeid(a.primitive()) == typeid(StopGradient)) {
-      return;
-    }
+  detail::depth_first(
+      outputs,
+      [&](const array& a) {
+        array(a).set_tracer(false);
 
-    // Calculate gradient if any inputs require gradient
-    for (auto& input : a.inputs()) {
-      if (calc_grad.find(input.id()) != calc_grad.end()) {
-        tape.push_back(a);
-        calc_grad.insert(id);
-        break;
-      }
-    }
-  };
+        // Check if visited and add to cache if not
+        return cache.insert(a.id()).second;
+      },
+      [&](const array& a) {
+        // Stop grad
+        if (a.has_primitive() &&
+            typeid(a.primitive()) == typeid(StopGradient)) {
+          return;
+        }
 
-  for (auto& out : outputs) {
-    recurse(out);
-  }
+        // Calculate gradient if any inputs require gradient
+        for (auto& input : a.inputs()) {
+          if (calc_grad.find(input.id()) != calc_grad.end()) {
+            tape.push_back(a);
+            calc_grad.insert(a.id());
+            break;
+          }
+        }
+      });
 
   // Run the tape backwards, computing vector-jacobian
   // products for each primitive
@@ -446,38 +716,30 @@ std::pair<std::vector<array>, std::vector<array>> jvp(
 
   std::vector<array> tape;
 
-  std::function<void(array&)> recurse;
-  recurse = [&](auto& a) {
-    auto id = a.id();
-    a.set_tracer(false);
-
-    // Check if visited and add to cache if not
-    if (auto inserted = cache.insert(id); !inserted.second) {
-      return;
-    }
-
-    for (auto& input : a.editable_inputs()) {
-      recurse(input);
-    }
-
-    // Stop grad
-    if (a.has_primitive() && typeid(a.primitive()) == typeid(StopGradient)) {
-      return;
-    }
+  detail::depth_first(
+      outputs,
+      [&](const array& a) {
+        array(a).set_tracer(false);
 
-    // Calculate gradient if any inputs require gradient
-    for (auto& input : a.inputs()) {
-      if (calc_grad.find(input.id()) != calc_grad.end()) {
-        tape.push_back(a);
-        calc_grad.insert(id);
-        break;
-      }
-    }
-  };
+        // Check if visited and add to cache if not
+        return cache.insert(a.id()).second;
+      },
+      [&](const array& a) {
+        // Stop grad
+        if (a.has_primitive() &&
+            typeid(a.primitive()) == typeid(StopGradient)) {
+          return;
+        }
 
-  for (auto& out : outputs) {
-    recurse(out);
-  }
+        // Calculate gradient if any inputs require gradient
+        for (auto& input : a.inputs()) {
+          if (calc_grad.find(input.id()) != calc_grad.end()) {
+            tape.push_back(a);
+            calc_grad.insert(a.id());
+            break;
+          }
+        }
+      });
   std::unordered_map<std::uintptr_t, array> tan_map;
   for (int i = 0; i < primals_.size(); ++i) {
     tan_map.insert({primals_[i].id(), tangents[i]});
@@ -572,6 +834,258 @@ ValueAndGradFn value_and_grad(
   };
 }
 
+namespace {
+
+// The argument numbers with the negative ones counted from the end
+std::vector<int> normalize_argnums(
+    const std::string& name,
+    const std::vector<int>& argnums,
+    int num_inputs) {
+  if (argnums.empty()) {
+    throw std::invalid_argument(
+        "[" + name + "] Must specify at least one argument.");
+  }
+  std::vector<int> args;
+  for (auto arg : argnums) {
+    arg = arg < 0 ? arg + num_inputs : arg;
+    if (arg < 0 || arg >= num_inputs) {
+      std::ostringstream msg;
+      msg << "[" << name << "] Invalid argument number for function with "
+          << num_inputs << " inputs.";
+      throw std::invalid_argument(msg.str());
+    }
+    if (std::find(args.begin(), args.end(), arg) != args.end()) {
+      throw std::invalid_argument(
+          "[" + name + "] Repeat argument number not allowed.");
+    }
+    args.push_back(arg);
+  }
+  return args;
+}
+
+// Rows of the identity matrix of size n starting at the given offset with
+// the rest of each row of the given shape
+array basis(int n, int offset, const array& like) {
+  auto shape = like.shape();
+  shape.insert(shape.begin(), n);
+  return reshape(eye(n, like.size(), -offset, like.dtype()), shape);
+}
+
+// Broadcast a vectorized result which does not depend on the vectorized
+// inputs to the size n of the vectorized axis
+array batched(const array& x, int n, const array& like) {
+  if (x.ndim() > like.ndim()) {
+    return x;
+  }
+  auto shape = like.shape();
+  shape.insert(shape.begin(), n);
+  return broadcast_to(x, shape);
+}
+
+bool is_stop_gradient(const array& a) {
+  return a.has_primitive() && typeid(a.primitive()) == typeid(StopGradient);
+}
+
+} // namespace
+
+std::function<std::vector<array>(const std::vector<array>&)> jacrev(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun,
+    const std::vector<int>& argnums /* = {0} */) {
+  return [fun, argnums](const std::vector<array>& inputs) {
+    auto args = normalize_argnums("jacrev", argnums, inputs.size());
+    auto outputs = fun(inputs);
+
+    // The rows of the Jacobians are the vector-Jacobian products of the
+    // basis vectors of the outputs which are computed at once by vectorizing
+    // the vector-Jacobian product over them
+    int m = 0;
+    for (auto& out : outputs) {
+      m += is_stop_gradient(out) ? 0 : out.size();
+    }
+    std::vector<array> cotans;
+    int offset = 0;
+    for (auto& out : outputs) {
+      if (!is_stop_gradient(out)) {
+        cotans.push_back(basis(m, offset, out));
+        offset += out.size();
+      }
+    }
+    std::vector<array> rows;
+    if (m > 0) {
+      auto vjp_fun = [&fun, &inputs, &args](const std::vector<array>& cotans) {
+        auto vjps = vjp(fun, inputs, cotans).second;
+        std::vector<array> out;
+        for (auto arg : args) {
+          out.push_back(vjps[arg]);
+        }
+        return out;
+      };
+      rows = vmap(vjp_fun)(cotans);
+    }
+
+    std::vector<array> jacobians;
+    offset = 0;
+    for (auto& out : outputs) {
+      for (int j = 0; j < args.size(); ++j) {
+        auto& in = inputs[args[j]];
+        auto shape = out.shape();
+        shape.insert(shape.end(), in.shape().begin(), in.shape().end());
+        if (is_stop_gradient(out)) {
+          jacobians.push_back(zeros(shape, in.dtype()));
+          continue;
+        }
+        std::vector<int> start(in.ndim() + 1, 0);
+        start[0] = offset;
+        auto stop = in.shape();
+        stop.insert(stop.begin(), offset + out.size());
+        jacobians.push_back(
+            reshape(slice(batched(rows[j], m, in), start, stop), shape));
+      }
+      offset += is_stop_gradient(out) ? 0 : out.size();
+    }
+    return jacobians;
+  };
+}
+
+std::function<std::vector<array>(const std::vector<array>&)> jacfwd(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun,
+    const std::vector<int>& argnums /* = {0} */) {
+  return [fun, argnums](const std::vector<array>& inputs) {
+    auto args = normalize_argnums("jacfwd", argnums, inputs.size());
+    auto outputs = fun(inputs);
+
+    // The columns of the Jacobians are the Jacobian-vector products of the
+    // basis vectors of the inputs which are computed at once by vectorizing
+    // the Jacobian-vector product over them
+    int n = 0;
+    for (auto arg : args) {
+      n += inputs[arg].size();
+    }
+    std::vector<array> tangents;
+    int offset = 0;
+    for (auto arg : args) {
+      tangents.push_back(basis(n, offset, inputs[arg]));
+      offset += inputs[arg].size();
+    }
+    auto jvp_fun = [&fun, &inputs, &args](const std::vector<array>& t) {
+      std::vector<array> all_tangents;
+      for (auto& in : inputs) {
+        all_tangents.push_back(zeros_like(in));
+      }
+      for (int j = 0; j < args.size(); ++j) {
+        all_tangents[args[j]] = t[j];
+      }
+      return jvp(fun, inputs, all_tangents).second;
+    };
+    auto columns = vmap(jvp_fun)(tangents);
+
+    std::vector<array> jacobians;
+    for (int i = 0; i < outputs.size(); ++i) {
+      auto& out = outputs[i];
+      auto column = batched(columns[i], n, out);
+      offset = 0;
+      for (auto arg : args) {
+        auto& in = inputs[arg];
+        auto shape = out.shape();
+        shape.insert(shape.end(), in.shape().begin(), in.shape().end());
+        auto jac = slice(
+            reshape(column, {n, static_cast<int>(out.size())}),
+            {offset, 0},
+            {offset + static_cast<int>(in.size()),
+             static_cast<int>(out.size())});
+        jacobians.push_back(reshape(transpose(jac), shape));
+        offset += in.size();
+      }
+    }
+    return jacobians;
+  };
+}
+
+std::function<std::vector<array>(const std::vector<array>&)> hessian(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun,
+    const std::vector<int>& argnums /* = {0} */) {
+  return jacfwd(jacrev(fun, argnums), argnums);
+}
+
+std::function<std::vector<array>(const std::vector<array>&)> checkpoint(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun) {
+  return [fun](const std::vector<array>& inputs) {
+    // Recompute with the same random key so that random numbers drawn by
+    // the function match the ones of the first call
+    auto key = random::KeySequence::default_().state();
+    auto recompute = [fun, key](const std::vector<array>& inputs) {
+      auto& keys = random::KeySequence::default_();
+      auto current_key = keys.state();
+      keys.set_state(key);
+      try {
+        auto outputs = fun(inputs);
+        keys.set_state(current_key);
+        return outputs;
+      } catch (...) {
+        keys.set_state(current_key);
+        throw;
+      }
+    };
+
+    auto outputs = fun(inputs);
+    for (int i = 0; i < outputs.size(); ++i) {
+      auto& out = outputs[i];
+      if (out.has_primitive() &&
+          typeid(out.primitive()) == typeid(StopGradient)) {
+        continue;
+      }
+      auto s = out.has_primitive() ? out.primitive().stream()
+                                   : default_stream(default_device());
+      // The gradient does not see the graph of the output so it is released
+      // once the output is computed
+      std::vector<array> checkpoint_inputs(inputs);
+      checkpoint_inputs.push_back(stop_gradient(out, s));
+      out = array(
+          out.shape(),
+          out.dtype(),
+          std::make_unique<Checkpoint>(s, recompute, i),
+          std::move(checkpoint_inputs));
+    }
+    return outputs;
+  };
+}
+
+std::function<std::vector<array>(const std::vector<array>&)> custom_function(
+    std::function<std::vector<array>(const std::vector<array>&)> fun,
+    CustomVJPFunction fun_vjp,
+    CustomJVPFunction fun_jvp /* = nullptr */) {
+  return [fun = std::move(fun),
+          fun_vjp = std::move(fun_vjp),
+          fun_jvp = std::move(fun_jvp)](const std::vector<array>& inputs) {
+    auto outputs = fun(inputs);
+
+    // The gradient does not see the graphs of the outputs so they are
+    // released once the outputs are computed
+    std::vector<array> custom_inputs(inputs);
+    for (auto& out : outputs) {
+      auto s = out.has_primitive() ? out.primitive().stream()
+                                   : default_stream(default_device());
+      custom_inputs.push_back(stop_gradient(out, s));
+    }
+    for (int i = 0; i < outputs.size(); ++i) {
+      auto& out = outputs[i];
+      if (out.has_primitive() &&
+          typeid(out.primitive()) == typeid(StopGradient)) {
+        continue;
+      }
+      auto s = out.has_primitive() ? out.primitive().stream()
+                                   : default_stream(default_device());
+      out = array(
+          out.shape(),
+          out.dtype(),
+          std::make_unique<CustomTransforms>(
+              s, fun, fun_vjp, fun_jvp, outputs.size(), i),
+          custom_inputs);
+    }
+    return outputs;
+  };
+}
+
 namespace detail {
 
 std::pair<std::vector<array>, std::vector<array>> vmap_trace(
@@ -642,31 +1156,20 @@ std::vector<array> vmap_replace(
   }
   std::vector<array> tape;
 
-  std::function<void(const array&)> recurse;
-
-  recurse = [&](const array& a) {
-    // Stop at inputs to the vmap function
-    auto id = a.id();
-    if (cache.find(id) != cache.end()) {
-      return;
-    }
-    for (auto& input : a.inputs()) {
-      recurse(input);
-    }
-    cache.insert(id);
-    for (auto& input : a.inputs()) {
-      if (needs_vmap.find(input.id()) != needs_vmap.end()) {
-        needs_vmap.insert(id);
-        tape.push_back(a);
-        tape.back().set_tracer(false);
-        break;
-      }
-    }
-  };
-
-  for (auto& out : s_outputs) {
-    recurse(out);
-  }
+  detail::depth_first(
+      s_outputs,
+      // Stop at inputs to the vmap function
+      [&](const array& a) { return cache.insert(a.id()).second; },
+      [&](const array& a) {
+        for (auto& input : a.inputs()) {
+          if (needs_vmap.find(input.id()) != needs_vmap.end()) {
+            needs_vmap.insert(a.id());
+            tape.push_back(a);
+            tape.back().set_tracer(false);
+            break;
+          }
+        }
+      });
 
   // Transform each primitive in the graph with
   // its vmap implementation
@@ -6,7 +6,11 @@
 
 namespace mlx::core {
 
-/** Fuse equivalent arrays to avoid duplicate execution. */
+/**
+ *  Fuse equivalent arrays to avoid duplicate execution. Arrays are
+ *  equivalent if their primitives are equivalent and their inputs are the
+ *  same or equivalent arrays.
+ **/
 void simplify(const std::vector<array>& outputs);
 
 template <typename... Arrays>
@@ -14,6 +18,43 @@ void simplify(Arrays... outputs) {
   simplify(std::vector<array>{std::forward<Arrays>(outputs)...});
 }
 
+/**
+ *  A graph optimization pass. It rewrites the graph of the outputs in place
+ *  but does not replace the outputs themselves.
+ **/
+using OptimizationPass = std::function<void(const std::vector<array>&)>;
+
+/**
+ *  Register a pass run by optimize at the given and higher levels. Passes
+ *  run in the order they are registered, before dead node elimination.
+ **/
+void register_optimization_pass(
+    const std::string& name,
+    int level,
+    OptimizationPass pass);
+
+/**
+ *  Run the optimization passes of the level on the graph of the outputs.
+ *
+ *  The passes of level 1 fold the small arrays whose inputs are evaluated,
+ *  rewrite chains of views and casts and arithmetic with identity elements
+ *  and detach the graphs of evaluated arrays. Level 2 also runs simplify.
+ *  Returns the name of every pass run with the number of arrays it removed
+ *  from the graph.
+ **/
+std::vector<std::pair<std::string, int>> optimize(
+    const std::vector<array>& outputs,
+    int level = 1);
+
+/**
+ *  Set the level of the optimization passes eval runs before computing a
+ *  graph. The default level 0 runs none of them.
+ **/
+void set_optimization_level(int level);
+
+/** Get the level of the optimization passes eval runs. */
+int get_optimization_level();
+
 void eval(const std::vector<array>& outputs, bool retain_graph = false);
 
 template <typename... Arrays>
@@ -21,6 +62,49 @@ void eval(Arrays... outputs) {
   eval(std::vector<array>{std::forward<Arrays>(outputs)...}, false);
 }
 
+/**
+ *  Schedules the computation of the outputs and returns without waiting for
+ *  it to finish. A later eval of the outputs, or of arrays which depend on
+ *  them, waits for the computation.
+ **/
+void async_eval(const std::vector<array>& outputs);
+
+template <typename... Arrays>
+void async_eval(Arrays... outputs) {
+  async_eval(std::vector<array>{std::forward<Arrays>(outputs)...});
+}
+
+/**
+ *  Order the primitives run by eval to reduce the number of intermediate
+ *  arrays alive at once instead of running them in depth-first order.
+ **/
+void set_memory_efficient_eval(bool enabled);
+
+/** Check if eval orders the primitives to reduce the peak memory. */
+bool get_memory_efficient_eval();
+
+/**
+ *  Evaluate the inputs of new arrays once the part of their graph which is
+ *  not evaluated is deeper than the given depth. This bounds the graphs of
+ *  loops which do not call eval. The default depth 0 disables it.
+ **/
+void set_max_pending_depth(int depth);
+
+/** Get the depth at which the inputs of new arrays are evaluated. */
+int get_max_pending_depth();
+
+/** Get the number of times the inputs of a new array were evaluated. */
+size_t get_auto_eval_count();
+
+/**
+ *  Estimate the peak memory in bytes allocated while evaluating the outputs.
+ *
+ *  The estimate follows the order eval would run the primitives in and
+ *  assumes every primitive allocates its output and that intermediate arrays
+ *  are freed after their last use.
+ **/
+size_t estimate_peak_memory(const std::vector<array>& outputs);
+
 /**
  *  Computes the output and vector-Jacobian product (VJP) of a function.
  *
@@ -184,4 +268,148 @@ std::function<std::vector<array>(const std::vector<array>&)> vmap(
     const std::vector<int>& in_axes = {},
     const std::vector<int>& out_axes = {});
 
+/**
+ * Returns a function which computes the Jacobians of the outputs of the input
+ * function with respect to the inputs in `argnums` with reverse mode
+ * differentiation.
+ *
+ * The Jacobian of output `i` with respect to input `argnums[j]` is at index
+ * `i * argnums.size() + j` and its shape is the shape of the output followed
+ * by the shape of the input. The vector-Jacobian products of all the rows are
+ * computed in a single vectorized graph. Prefer it to `jacfwd` when the
+ * function has fewer outputs than inputs.
+ */
+std::function<std::vector<array>(const std::vector<array>&)> jacrev(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun,
+    const std::vector<int>& argnums = {0});
+
+/**
+ * Returns a function which computes the Jacobians of the outputs of the input
+ * function with respect to the inputs in `argnums` with forward mode
+ * differentiation.
+ *
+ * The Jacobians are laid out as for `jacrev`. The Jacobian-vector products of
+ * all the columns are computed in a single vectorized graph. Prefer it to
+ * `jacrev` when the function has more outputs than inputs.
+ */
+std::function<std::vector<array>(const std::vector<array>&)> jacfwd(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun,
+    const std::vector<int>& argnums = {0});
+
+/**
+ * Returns a function which computes the Hessians of the outputs of the input
+ * function with respect to the inputs in `argnums`.
+ *
+ * The Hessian is the forward mode Jacobian of the reverse mode Jacobian. For
+ * a function with a single output, the second derivatives with respect to
+ * inputs `argnums[j]` and `argnums[k]` are at index
+ * `j * argnums.size() + k` and their shape is the shape of the output
+ * followed by the shapes of the two inputs.
+ */
+std::function<std::vector<array>(const std::vector<array>&)> hessian(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun,
+    const std::vector<int>& argnums = {0});
+
+/**
+ * Returns a function which computes the Jacobian of the unary input function
+ * with reverse mode differentiation.
+ */
+std::function<array(const array&)> inline jacrev(
+    const std::function<array(const array&)>& fun) {
+  auto fn = jacrev([fun](const std::vector<array>& inputs) {
+    return std::vector<array>{fun(inputs[0])};
+  });
+  return [fn](const array& input) { return fn({input})[0]; };
+}
+
+/**
+ * Returns a function which computes the Jacobian of the unary input function
+ * with forward mode differentiation.
+ */
+std::function<array(const array&)> inline jacfwd(
+    const std::function<array(const array&)>& fun) {
+  auto fn = jacfwd([fun](const std::vector<array>& inputs) {
+    return std::vector<array>{fun(inputs[0])};
+  });
+  return [fn](const array& input) { return fn({input})[0]; };
+}
+
+/**
+ * Returns a function which computes the Hessian of the unary input function.
+ */
+std::function<array(const array&)> inline hessian(
+    const std::function<array(const array&)>& fun) {
+  auto fn = hessian([fun](const std::vector<array>& inputs) {
+    return std::vector<array>{fun(inputs[0])};
+  });
+  return [fn](const array& input) { return fn({input})[0]; };
+}
+
+/**
+ * Checkpoint a function.
+ *
+ * The returned function computes the same outputs but the intermediate
+ * arrays of the function are not kept for the gradient. They are recomputed
+ * by calling the function again during the backward pass which trades
+ * computation for memory. Random numbers drawn from the default key
+ * sequence are the same when the function is recomputed.
+ *
+ * Gradients only flow to the inputs of the function and not to arrays it
+ * captures from its enclosing scope. A function with several outputs is
+ * recomputed for each output which has a gradient.
+ */
+std::function<std::vector<array>(const std::vector<array>&)> checkpoint(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun);
+
+/**
+ * Computes the vector-Jacobian products of the inputs of a function given
+ * its inputs, the cotangents of its outputs and its outputs.
+ */
+using CustomVJPFunction = std::function<std::vector<array>(
+    const std::vector<array>&,
+    const std::vector<array>&,
+    const std::vector<array>&)>;
+
+/**
+ * Computes the Jacobian-vector products of the outputs of a function given
+ * its inputs and the tangents of its inputs.
+ */
+using CustomJVPFunction = std::function<
+    std::vector<array>(const std::vector<array>&, const std::vector<array>&)>;
+
+/**
+ * Give a function custom gradients.
+ *
+ * The returned function computes the same outputs but the vector-Jacobian
+ * products of its inputs are computed by `fun_vjp` instead of
+ * differentiating through the arrays computed by `fun`. Only the inputs and
+ * the outputs of `fun` and the arrays `fun_vjp` computes from them are kept
+ * for the gradient. The Jacobian-vector products of the outputs are computed
+ * by `fun_jvp`. Either can be empty in which case `fun` is differentiated.
+ *
+ * A function with several outputs calls `fun_vjp` for each output which has
+ * a gradient with zero cotangents for the other outputs. Vectorizing the
+ * returned function with vmap vectorizes `fun` and drops the custom
+ * gradients.
+ */
+std::function<std::vector<array>(const std::vector<array>&)> custom_function(
+    std::function<std::vector<array>(const std::vector<array>&)> fun,
+    CustomVJPFunction fun_vjp,
+    CustomJVPFunction fun_jvp = nullptr);
+
+/**
+ * Compile a function.
+ *
+ * The function is traced once for each distinct set of input shapes and
+ * dtypes and later calls replay the cached graph without calling the
+ * function again. Chains of elementwise primitives on the CPU are fused so
+ * they run in a single pass over memory. Arrays captured by the function
+ * from its enclosing scope are treated as constants.
+ *
+ * Calls with inputs that are traced by another transform (e.g. vjp or
+ * vmap) run the function directly.
+ */
+std::function<std::vector<array>(const std::vector<array>&)> compile(
+    const std::function<std::vector<array>(const std::vector<array>&)>& fun);
+
 } // namespace mlx::core
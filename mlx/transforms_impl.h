@@ -1,5 +1,13 @@
 // Copyright © 2023 Apple Inc.
 
+#pragma once
+
+#include <functional>
+#include <utility>
+#include <vector>
+
+#include "mlx/array.h"
+
 namespace mlx::core::detail {
 
 std::pair<std::vector<array>, std::vector<array>> vmap_trace(
@@ -14,4 +22,36 @@ std::vector<array> vmap_replace(
     const std::vector<int>& in_axes,
     const std::vector<int>& out_axes);
 
+// Traverse the graph of the outputs depth first using an explicit stack so
+// that deep graphs do not overflow the native stack. enter(a) is called every
+// time an array is reached and returns whether to traverse its inputs, in
+// which case leave(a) is called once all of them have been traversed. The
+// arrays are thus left in topological order. The graph must not be modified
+// during the traversal.
+template <typename Enter, typename Leave>
+void depth_first(
+    const std::vector<array>& outputs,
+    Enter&& enter,
+    Leave&& leave) {
+  std::vector<std::pair<const array*, int>> stack;
+  for (auto& out : outputs) {
+    if (!enter(out)) {
+      continue;
+    }
+    stack.emplace_back(&out, 0);
+    while (!stack.empty()) {
+      auto& [a, i] = stack.back();
+      if (i < a->inputs().size()) {
+        auto& in = a->inputs()[i++];
+        if (enter(in)) {
+          stack.emplace_back(&in, 0);
+        }
+      } else {
+        leave(*a);
+        stack.pop_back();
+      }
+    }
+  }
+}
+
 } // namespace mlx::core::detail
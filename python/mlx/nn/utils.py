@@ -1,11 +1,12 @@
 # Copyright © 2023 Apple Inc.
 
-from typing import Callable
+from functools import wraps
+from typing import Callable, Optional
 
 import mlx.core as mx
 
 
-def value_and_grad(model: "mlx.nn.Module", fn: Callable):
+def value_and_grad(model: "mlx.nn.Module", fn: Callable, cache: bool = False):
     """Transform the passed function ``fn`` to a function that computes the
     gradients of ``fn`` wrt the model's trainable parameters and also its
     value.
@@ -14,6 +15,9 @@ def value_and_grad(model: "mlx.nn.Module", fn: Callable):
         model (mlx.nn.Module): The model whose trainable parameters to compute
                                gradients for
         fn (Callable): The scalar function to compute gradients for
+        cache (bool): Record the graph for each signature of the arguments and
+                      replay it in later calls. See
+                      :func:`mlx.core.value_and_grad`. Default: ``False``
 
     Returns:
         A callable that returns the value of ``fn`` and the gradients wrt the
@@ -24,10 +28,59 @@ def value_and_grad(model: "mlx.nn.Module", fn: Callable):
         model.update(params)
         return fn(*args, **kwargs)
 
-    value_grad_fn = mx.value_and_grad(inner_fn)
+    value_grad_fn = mx.value_and_grad(inner_fn, cache=cache)
 
     def wrapped_value_grad_fn(*args, **kwargs):
-        value, grad = value_grad_fn(model.trainable_parameters(), *args, **kwargs)
+        params = model.trainable_parameters()
+        value, grad = value_grad_fn(params, *args, **kwargs)
+        if cache:
+            # Tracing leaves the placeholder parameters in the model
+            model.update(params)
         return value, grad
 
+    if cache:
+        wrapped_value_grad_fn.cache_info = value_grad_fn.cache_info
+
     return wrapped_value_grad_fn
+
+
+def checkpoint(module: "mlx.nn.Module", fn: Optional[Callable] = None):
+    """Transform the passed callable to one that recomputes the intermediate
+    arrays of ``fn`` during the backward pass instead of keeping them alive.
+
+    The gradients flow to the trainable parameters of ``module`` and to the
+    array arguments of the returned callable. See :func:`mlx.core.checkpoint`.
+
+    .. code-block:: python
+
+        layer = nn.TransformerEncoderLayer(512, 8)
+        y = nn.checkpoint(layer)(x, mask)
+
+    Args:
+        module (mlx.nn.Module): The module whose trainable parameters are used
+                                by ``fn``
+        fn (Callable, optional): The function to checkpoint. Default:
+                                 ``module``
+
+    Returns:
+        A callable that computes the same outputs as ``fn``
+    """
+    if fn is None:
+        fn = module
+
+    def inner_fn(params, *args):
+        # Recomputing passes new parameters which should not stay in the model
+        old_params = module.trainable_parameters()
+        module.update(params)
+        try:
+            return fn(*args)
+        finally:
+            module.update(old_params)
+
+    checkpointed_fn = mx.checkpoint(inner_fn)
+
+    @wraps(fn)
+    def wrapped_checkpointed_fn(*args):
+        return checkpointed_fn(module.trainable_parameters(), *args)
+
+    return wrapped_checkpointed_fn
@@ -3,7 +3,9 @@
 #include <sstream>
 
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
 
+#include "mlx/backend/common/threading.h"
 #include "mlx/device.h"
 #include "mlx/utils.h"
 
@@ -41,4 +43,106 @@ void init_device(py::module_& m) {
 
   m.def("default_device", &default_device);
   m.def("set_default_device", &set_default_device, "device"_a);
+  m.def(
+      "set_num_threads",
+      &set_num_threads,
+      "num_threads"_a,
+      R"pbdoc(
+        Set the number of threads used to run a single operation on the CPU.
+
+        Large elementwise operations are split in chunks and run in parallel
+        on a pool of threads shared by all CPU streams. The default is read
+        from the ``MLX_NUM_THREADS`` environment variable and falls back to
+        the number of hardware threads.
+
+        Args:
+            num_threads (int): The number of threads. Use ``1`` to run every
+              operation on the thread of its stream.
+      )pbdoc");
+  m.def(
+      "get_num_threads",
+      &get_num_threads,
+      R"pbdoc(
+        Get the number of threads used to run a single operation on the CPU.
+      )pbdoc");
+  m.def(
+      "set_max_concurrency",
+      &set_max_concurrency,
+      "max_concurrency"_a,
+      R"pbdoc(
+        Set the maximum number of operations of a CPU stream run at once.
+
+        Operations of a graph which do not depend on each other, for instance
+        the query, key and value projections of an attention layer, are run
+        concurrently. The default is read from the ``MLX_MAX_CONCURRENCY``
+        environment variable and falls back to ``4``.
+
+        Args:
+            max_concurrency (int): The maximum number of concurrent
+              operations. Use ``1`` to run the operations of a stream one at
+              a time.
+      )pbdoc");
+  m.def(
+      "get_max_concurrency",
+      &get_max_concurrency,
+      R"pbdoc(
+        Get the maximum number of operations of a CPU stream run at once.
+      )pbdoc");
+  m.def(
+      "set_stream_affinity",
+      &set_stream_affinity,
+      "stream"_a,
+      "cpus"_a,
+      R"pbdoc(
+        Pin the thread of a CPU stream to the given cores.
+
+        The memory of a buffer is placed on the NUMA node of the thread which
+        first writes it, so the outputs computed by a pinned stream are
+        allocated on the node of its cores. Only supported on Linux.
+
+        .. code-block:: python
+
+          s = mx.new_stream(mx.cpu)
+          mx.set_stream_affinity(s, mx.get_numa_node_cpus(1))
+
+        Args:
+            stream (Stream): The CPU stream to pin.
+            cpus (list(int)): The cores the stream runs on. An empty list
+              lets the stream run on any core.
+      )pbdoc");
+  m.def(
+      "set_thread_pool_affinity",
+      &set_thread_pool_affinity,
+      "cpus"_a,
+      R"pbdoc(
+        Pin the threads which run CPU operations in parallel to the given
+        cores.
+
+        These threads are shared by all the CPU streams, see
+        :func:`set_num_threads` and :func:`set_max_concurrency`. Only
+        supported on Linux.
+
+        Args:
+            cpus (list(int)): The cores the threads run on. An empty list
+              lets the threads run on any core.
+      )pbdoc");
+  m.def(
+      "get_num_numa_nodes",
+      &get_num_numa_nodes,
+      R"pbdoc(
+        Get the number of NUMA nodes of the host.
+      )pbdoc");
+  m.def(
+      "get_numa_node_cpus",
+      &get_numa_node_cpus,
+      "node"_a,
+      R"pbdoc(
+        Get the cores of a NUMA node.
+
+        Args:
+            node (int): The NUMA node.
+
+        Returns:
+            list(int): The cores of the node.
+      )pbdoc");
 }
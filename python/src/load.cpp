@@ -149,11 +149,24 @@ class PyFileReader : public io::Reader {
     }
   }
 
+  void read(char* data, size_t n, size_t offset) override {
+    // The python file has a single position so positional reads are
+    // serialized. The lock is taken before the GIL since reading may release
+    // the GIL.
+    std::lock_guard<std::mutex> lk(mtx_);
+    py::gil_scoped_acquire gil;
+    auto pos = tell_func_();
+    seek_func_(offset, (int)std::ios_base::beg);
+    read(data, n);
+    seek_func_(pos, (int)std::ios_base::beg);
+  }
+
   std::string label() const override {
     return "python file object";
   }
 
  private:
+  std::mutex mtx_;
   py::object pyistream_;
   py::object readinto_func_;
   py::object seek_func_;
@@ -0,0 +1,69 @@
+// Copyright © 2023 Apple Inc.
+
+#include <pybind11/pybind11.h>
+
+#include "mlx/allocator.h"
+
+namespace py = pybind11;
+using namespace py::literals;
+
+using namespace mlx::core;
+
+void init_memory(py::module_& m) {
+  m.def(
+      "get_active_memory",
+      &get_active_memory,
+      R"pbdoc(
+      Get the memory in bytes held by the buffers of live arrays.
+
+      Buffers kept in the cache for reuse are not included, see
+      :func:`get_cache_memory`.
+
+      Returns:
+          int: The active memory in bytes.
+      )pbdoc");
+  m.def(
+      "get_peak_memory",
+      &get_peak_memory,
+      R"pbdoc(
+      Get the largest active memory in bytes since the program started.
+
+      Returns:
+          int: The peak memory in bytes.
+      )pbdoc");
+  m.def(
+      "get_cache_memory",
+      &get_cache_memory,
+      R"pbdoc(
+      Get the memory in bytes held by the cache of freed buffers.
+
+      Freed buffers are kept in a cache and reused by later allocations of
+      a similar size instead of being returned to the system.
+
+      Returns:
+          int: The cache memory in bytes.
+      )pbdoc");
+  m.def(
+      "set_cache_limit",
+      &set_cache_limit,
+      "limit"_a,
+      R"pbdoc(
+      Set the maximum memory in bytes that the cache of freed buffers may
+      hold.
+
+      The least recently freed buffers are released when the limit is
+      exceeded. A limit of ``0`` disables the cache.
+
+      Args:
+          limit (int): The cache limit in bytes.
+
+      Returns:
+          int: The previous cache limit in bytes.
+      )pbdoc");
+  m.def(
+      "clear_cache",
+      &clear_cache,
+      R"pbdoc(
+      Release all the buffers held by the cache of freed buffers.
+      )pbdoc");
+}
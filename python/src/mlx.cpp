@@ -11,6 +11,8 @@ void init_array(py::module_&);
 void init_device(py::module_&);
 void init_stream(py::module_&);
 void init_metal(py::module_&);
+void init_memory(py::module_&);
+void init_profiler(py::module_&);
 void init_ops(py::module_&);
 void init_transforms(py::module_&);
 void init_random(py::module_&);
@@ -26,6 +28,8 @@ PYBIND11_MODULE(core, m) {
   init_stream(m);
   init_array(m);
   init_metal(m);
+  init_memory(m);
+  init_profiler(m);
   init_ops(m);
   init_transforms(m);
   init_random(m);
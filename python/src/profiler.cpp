@@ -0,0 +1,119 @@
+// Copyright © 2023 Apple Inc.
+
+#include <fstream>
+#include <sstream>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include "mlx/profiler.h"
+
+namespace py = pybind11;
+using namespace py::literals;
+
+using namespace mlx::core;
+
+class PyProfiler {
+ public:
+  PyProfiler& enter() {
+    profiler::start();
+    return *this;
+  }
+
+  void exit(const py::args&) {
+    profiler::stop();
+    events_ = profiler::events();
+  }
+
+  py::list events() const {
+    py::list events;
+    for (auto& e : events_) {
+      py::dict event;
+      event["name"] = e.name;
+      event["stream"] = e.stream;
+      event["thread"] = e.thread;
+      event["input_shapes"] = e.input_shapes;
+      event["output_shape"] = e.output_shape;
+      event["bytes_allocated"] = e.bytes_allocated;
+      event["enqueue_time"] = e.enqueue_time;
+      event["start_time"] = e.start_time;
+      event["end_time"] = e.end_time;
+      events.append(event);
+    }
+    return events;
+  }
+
+  void save_trace(const std::string& file) const {
+    std::ofstream os(file);
+    if (!os.is_open()) {
+      throw std::invalid_argument(
+          "[profiler.save_trace] Failed to open " + file);
+    }
+    profiler::export_chrome_trace(os, events_);
+  }
+
+  std::string summary() const {
+    std::ostringstream os;
+    profiler::print_summary(os, events_);
+    return os.str();
+  }
+
+ private:
+  std::vector<profiler::Event> events_;
+};
+
+void init_profiler(py::module_& m) {
+  py::class_<PyProfiler>(
+      m,
+      "profiler",
+      R"pbdoc(
+        A context manager which records the primitives evaluated inside of it.
+
+        For every primitive the profiler records its name, stream, thread,
+        input and output shapes, the bytes allocated for its output, the
+        time it waited to run after being enqueued by :func:`eval` and the
+        time it took to run. For GPU primitives the run time is the time to
+        encode the primitive. Outside of the context manager the profiler
+        costs a single check per primitive.
+
+        .. code-block:: python
+
+            with mx.profiler() as prof:
+                mx.eval(model(x))
+            print(prof.summary())
+            prof.save_trace("trace.json")
+      )pbdoc")
+      .def(py::init<>())
+      .def("__enter__", &PyProfiler::enter, py::return_value_policy::reference)
+      .def("__exit__", &PyProfiler::exit)
+      .def_property_readonly(
+          "events",
+          &PyProfiler::events,
+          R"pbdoc(
+            The recorded primitives as a list of :class:`dict`. The times are
+            in microseconds since the profiler was entered.
+          )pbdoc")
+      .def(
+          "save_trace",
+          &PyProfiler::save_trace,
+          "file"_a,
+          R"pbdoc(
+            Save the recorded primitives in the Chrome trace event format.
+
+            The trace can be opened in ``chrome://tracing`` or
+            `Perfetto <https://ui.perfetto.dev>`_.
+
+            Args:
+                file (str): The file to save the trace to.
+          )pbdoc")
+      .def(
+          "summary",
+          &PyProfiler::summary,
+          R"pbdoc(
+            A table of the count, the total, mean and max run times, the share
+            of the run time and the bytes allocated of every primitive type.
+
+            Returns:
+                str: The table.
+          )pbdoc");
+}
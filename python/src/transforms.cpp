@@ -5,13 +5,16 @@
 #include <pybind11/stl.h>
 #include <algorithm>
 #include <fstream>
+#include <mutex>
 #include <numeric>
 #include <sstream>
+#include <unordered_map>
 
 #include "mlx/array.h"
 #include "mlx/graph_utils.h"
 #include "mlx/transforms.h"
 #include "mlx/transforms_impl.h"
+#include "mlx/utils.h"
 
 namespace py = pybind11;
 using namespace py::literals;
@@ -437,7 +440,436 @@ auto py_vmap(
   };
 }
 
+// Computes the Jacobians of the outputs of a function with respect to the
+// arguments in argnums with the given transform. The derivatives are
+// returned in the structure of the outputs with each array replaced by its
+// derivatives, nested in order tuples if argnums is a sequence.
+template <typename Transform>
+auto py_jacobian(
+    const std::string& name,
+    const py::function& fun,
+    const IntOrVec& argnums,
+    int order,
+    Transform transform) {
+  return [name, fun, argnums, order, transform](const py::args& args) {
+    // The index of the array of each argument in argnums in the flattened
+    // arguments
+    std::vector<int> flat_argnums;
+    for (auto arg : to_vector(argnums)) {
+      int k = arg < 0 ? arg + args.size() : arg;
+      if (k < 0 || k >= args.size()) {
+        std::ostringstream msg;
+        msg << "[" << name << "] Invalid argument number for function with "
+            << args.size() << " arguments.";
+        throw std::invalid_argument(msg.str());
+      }
+      if (!py::isinstance<array>(args[k])) {
+        throw std::invalid_argument(
+            "[" + name + "] The arguments in argnums must be arrays.");
+      }
+      int index = 0;
+      for (int i = 0; i < k; i++) {
+        index += tree_flatten(args[i], false).size();
+      }
+      flat_argnums.push_back(index);
+    }
+
+    py::object py_outputs;
+    std::function<std::vector<array>(const std::vector<array>&)> flat_fun =
+        [&fun, &args, &py_outputs](const std::vector<array>& a) {
+          py_outputs = fun(*tree_unflatten(args, a));
+          return tree_flatten(py_outputs, true);
+        };
+    auto jacobians =
+        transform(flat_fun, flat_argnums)(tree_flatten(args, false));
+
+    int n = flat_argnums.size();
+    bool single = std::holds_alternative<int>(argnums);
+    int index = 0;
+    std::function<py::object(int)> nest = [&](int depth) -> py::object {
+      if (single || depth == order) {
+        return py::cast(jacobians[index++]);
+      }
+      py::tuple derivatives(n);
+      for (int j = 0; j < n; j++) {
+        derivatives[j] = nest(depth + 1);
+      }
+      return derivatives;
+    };
+    return tree_map(py_outputs, [&](py::handle obj) {
+      if (py::isinstance<array>(obj)) {
+        return nest(0);
+      } else {
+        return py::reinterpret_borrow<py::object>(obj);
+      }
+    });
+  };
+}
+
+auto py_compile(const py::function& fun) {
+  // The arguments of the current call and the outputs of the last trace are
+  // needed to go from the trees of arrays to the flat vectors and back
+  auto py_args = std::make_shared<py::object>();
+  auto py_outputs = std::make_shared<py::object>();
+
+  auto compiled_fun = compile(
+      [fun, py_args, py_outputs](const std::vector<array>& a) {
+        *py_outputs = fun(*tree_unflatten(*py_args, a));
+        return tree_flatten(*py_outputs, true);
+      });
+
+  return [compiled_fun, py_args, py_outputs](const py::args& args) {
+    *py_args = args;
+    auto outputs = compiled_fun(tree_flatten(args, true));
+    *py_args = py::none();
+    return tree_unflatten(*py_outputs, outputs);
+  };
+}
+
+// Python objects captured by the primitives of a graph are released when the
+// graph is released which can happen in the threads evaluating the graph
+// while the caller of eval holds the GIL. Those objects are kept until the
+// next time the GIL is held instead.
+std::vector<py::object>& released_objects() {
+  // Never destroyed as the interpreter may be finalized by then
+  static auto released_objects_ = new std::vector<py::object>();
+  return *released_objects_;
+}
+
+std::mutex released_objects_mtx;
+
+std::shared_ptr<py::object> graph_object(py::object obj) {
+  return std::shared_ptr<py::object>(
+      new py::object(std::move(obj)), [](py::object* obj) {
+        if (!PyGILState_Check()) {
+          std::lock_guard<std::mutex> lk(released_objects_mtx);
+          released_objects().push_back(std::move(*obj));
+        }
+        delete obj;
+      });
+}
+
+void collect_released_objects() {
+  std::vector<py::object> objects;
+  {
+    std::lock_guard<std::mutex> lk(released_objects_mtx);
+    objects.swap(released_objects());
+  }
+}
+
+// A copy of the tree with small placeholders in place of the arrays to keep
+// its structure without keeping the arrays alive
+py::object tree_placeholders(py::object tree) {
+  return tree_map(tree, [](py::handle obj) {
+    if (py::isinstance<array>(obj)) {
+      return py::cast(array(0));
+    } else {
+      return py::reinterpret_borrow<py::object>(obj);
+    }
+  });
+}
+
+auto py_checkpoint(const py::function& fun) {
+  auto py_fun = graph_object(fun);
+  return [py_fun](const py::args& args) {
+    collect_released_objects();
+
+    // The arguments which are not arrays are passed again when the function
+    // is recomputed
+    auto py_args = graph_object(tree_placeholders(args));
+    auto py_outputs = graph_object(py::none());
+    auto checkpointed_fun = checkpoint(
+        [py_fun, py_args, py_outputs](const std::vector<array>& a) {
+          auto outputs = (*py_fun)(*tree_unflatten(*py_args, a));
+          *py_outputs = tree_placeholders(outputs);
+          return tree_flatten(outputs, true);
+        });
+    auto outputs = checkpointed_fun(tree_flatten(args, false));
+    return tree_unflatten(*py_outputs, outputs);
+  };
+}
+
+// A function whose gradients are computed by the Python functions set with
+// its vjp and jvp methods
+class PyCustomFunction {
+ public:
+  explicit PyCustomFunction(py::function fun)
+      : fun_(graph_object(std::move(fun))) {}
+
+  py::object call(const py::args& args) {
+    collect_released_objects();
+
+    // The arguments which are not arrays are passed again to the vjp and jvp
+    // functions
+    auto py_args = graph_object(tree_placeholders(args));
+    auto py_outputs = graph_object(py::none());
+    auto fun = [py_fun = fun_, py_args, py_outputs](
+                   const std::vector<array>& a) {
+      auto outputs = (*py_fun)(*tree_unflatten(*py_args, a));
+      *py_outputs = tree_placeholders(outputs);
+      return tree_flatten(outputs, true);
+    };
+
+    CustomVJPFunction fun_vjp;
+    if (vjp_) {
+      fun_vjp = [py_vjp = vjp_, py_args, py_outputs](
+                    const std::vector<array>& primals,
+                    const std::vector<array>& cotans,
+                    const std::vector<array>& outputs) {
+        py::object vjps = (*py_vjp)(
+            tree_unflatten(*py_args, primals),
+            tree_unflatten(*py_outputs, cotans),
+            tree_unflatten(*py_outputs, outputs));
+        // The vjp of a function of a single argument can be returned as is
+        if (py::len(*py_args) == 1) {
+          vjps = py::make_tuple(vjps);
+        }
+        return tree_flatten(vjps, false);
+      };
+    }
+    CustomJVPFunction fun_jvp;
+    if (jvp_) {
+      fun_jvp = [py_jvp = jvp_, py_args](
+                    const std::vector<array>& primals,
+                    const std::vector<array>& tangents) {
+        return tree_flatten(
+            (*py_jvp)(
+                tree_unflatten(*py_args, primals),
+                tree_unflatten(*py_args, tangents)),
+            true);
+      };
+    }
+
+    auto outputs =
+        custom_function(fun, fun_vjp, fun_jvp)(tree_flatten(args, false));
+    return tree_unflatten(*py_outputs, outputs);
+  }
+
+  py::function set_vjp(const py::function& fun) {
+    vjp_ = graph_object(fun);
+    return fun;
+  }
+
+  py::function set_jvp(const py::function& fun) {
+    jvp_ = graph_object(fun);
+    return fun;
+  }
+
+ private:
+  std::shared_ptr<py::object> fun_;
+  std::shared_ptr<py::object> vjp_;
+  std::shared_ptr<py::object> jvp_;
+};
+
+// Caches the graph computed by a function for each signature of its
+// arguments, namely the tree structure, the non array leaves and the shapes
+// and dtypes of the arrays. Calls with a seen signature replay the graph
+// without calling the function.
+class PyCachedFunction {
+ public:
+  using Function =
+      std::function<py::object(const py::args&, const py::kwargs&)>;
+
+  explicit PyCachedFunction(Function fun)
+      : fun_(std::move(fun)),
+        py_args_(std::make_shared<py::object>()),
+        py_kwargs_(std::make_shared<py::object>()) {}
+
+  py::object call(const py::args& args, const py::kwargs& kwargs) {
+    auto key = signature(args) + signature(kwargs);
+    auto it = entries_.find(key);
+    if (it == entries_.end()) {
+      misses_++;
+      it = entries_.emplace(key, trace()).first;
+    } else {
+      hits_++;
+    }
+    auto& [compiled_fun, py_outputs] = it->second;
+
+    auto inputs = tree_flatten(args, false);
+    auto kwarg_inputs = tree_flatten(kwargs, false);
+    inputs.insert(inputs.end(), kwarg_inputs.begin(), kwarg_inputs.end());
+
+    *py_args_ = args;
+    *py_kwargs_ = kwargs;
+    auto outputs = compiled_fun(inputs);
+    *py_args_ = py::none();
+    *py_kwargs_ = py::none();
+    return tree_unflatten(*py_outputs, outputs);
+  }
+
+  py::dict cache_info() const {
+    return py::dict(
+        "hits"_a = hits_, "misses"_a = misses_, "size"_a = entries_.size());
+  }
+
+ private:
+  using Entry = std::pair<
+      std::function<std::vector<array>(const std::vector<array>&)>,
+      std::shared_ptr<py::object>>;
+
+  Entry trace() {
+    auto py_outputs = std::make_shared<py::object>();
+    auto compiled_fun = compile(
+        [fun = fun_, py_args = py_args_, py_kwargs = py_kwargs_, py_outputs](
+            const std::vector<array>& a) {
+          int n_args = tree_flatten(*py_args, false).size();
+          py::args args_cpy = tree_unflatten(*py_args, a);
+          py::kwargs kwargs_cpy = tree_unflatten(*py_kwargs, a, n_args);
+          *py_outputs = fun(args_cpy, kwargs_cpy);
+          return tree_flatten(*py_outputs, false);
+        });
+    return {compiled_fun, py_outputs};
+  }
+
+  static std::string signature(py::handle tree) {
+    std::ostringstream key;
+    std::function<void(py::handle)> recurse;
+    recurse = [&](py::handle subtree) {
+      if (py::isinstance<py::list>(subtree) ||
+          py::isinstance<py::tuple>(subtree)) {
+        key << (py::isinstance<py::list>(subtree) ? "[" : "(");
+        for (auto item : subtree) {
+          recurse(item);
+          key << ",";
+        }
+        key << (py::isinstance<py::list>(subtree) ? "]" : ")");
+      } else if (py::isinstance<py::dict>(subtree)) {
+        key << "{";
+        for (auto item : py::cast<py::dict>(subtree)) {
+          key << py::repr(item.first).cast<std::string>() << ":";
+          recurse(item.second);
+          key << ",";
+        }
+        key << "}";
+      } else if (py::isinstance<array>(subtree)) {
+        auto a = py::cast<array>(subtree);
+        key << "array<" << a.dtype() << ">(";
+        for (auto s : a.shape()) {
+          key << s << ",";
+        }
+        key << ")";
+      } else {
+        key << py::str(subtree.get_type()).cast<std::string>()
+            << py::repr(subtree).cast<std::string>();
+      }
+    };
+    recurse(tree);
+    return key.str();
+  }
+
+  Function fun_;
+  std::shared_ptr<py::object> py_args_;
+  std::shared_ptr<py::object> py_kwargs_;
+  std::unordered_map<std::string, Entry> entries_;
+  int hits_{0};
+  int misses_{0};
+};
+
 void init_transforms(py::module_& m) {
+  py::class_<PyCachedFunction>(
+      m,
+      "CachedFunction",
+      R"pbdoc(
+        A function which records its graph for each signature of its arguments.
+
+        Returned by :func:`grad` and :func:`value_and_grad` with ``cache=True``.
+      )pbdoc")
+      .def("__call__", &PyCachedFunction::call)
+      .def(
+          "cache_info",
+          &PyCachedFunction::cache_info,
+          R"pbdoc(
+            The number of calls which replayed a recorded graph (``hits``),
+            the number of calls which traced the function (``misses``) and
+            the number of recorded graphs (``size``).
+          )pbdoc");
+  py::class_<PyCustomFunction>(
+      m,
+      "custom_function",
+      R"pbdoc(
+        Set the functions which compute the gradients of a function.
+
+        Decorate a function with :class:`custom_function` and its
+        vector-Jacobian products are computed by the function given to
+        :meth:`custom_function.vjp` instead of differentiating through the
+        operations of the function. Only the inputs and the outputs of the
+        function and what the vjp function computes from them are kept for
+        the backward pass.
+
+        .. code-block:: python
+
+          import mlx.core as mx
+
+          @mx.custom_function
+          def softplus(x):
+              return mx.logaddexp(x, 0)
+
+          @softplus.vjp
+          def softplus_vjp(primals, cotangent, output):
+              # The derivative sigmoid(x) is 1 - exp(-softplus(x))
+              return cotangent * (1 - mx.exp(-output))
+
+          dx = mx.grad(lambda x: softplus(x).sum())(mx.array([0.0, 1.0]))
+
+        The gradients which are not set are computed by differentiating
+        through the function.
+
+        .. note::
+
+          Gradients only flow to the :class:`array` arguments of the function
+          and not to arrays it uses from its enclosing scope. A function with
+          several outputs calls the vjp function once for each output which
+          has a gradient, with zero cotangents for the other outputs.
+          :func:`vmap` vectorizes the function and not its gradients.
+
+        Args:
+            f (function): A function which takes a variable number of
+              :class:`array` or trees of :class:`array` and returns
+              a variable number of :class:`array` or trees of :class:`array`.
+      )pbdoc")
+      .def(py::init<py::function>(), "f"_a)
+      .def("__call__", &PyCustomFunction::call)
+      .def(
+          "vjp",
+          &PyCustomFunction::set_vjp,
+          "f"_a,
+          R"pbdoc(
+            Set the function which computes the vector-Jacobian products.
+
+            ``f(primals, cotangents, outputs)`` is called with the arguments
+            of the function as a tuple and the cotangents and the outputs
+            with the structure of the outputs of the function. It returns a
+            tuple with the vector-Jacobian product of each argument, ``None``
+            for the arguments which are not arrays. A function of a single
+            argument can return its vector-Jacobian product directly.
+
+            Args:
+                f (function): The function which computes the
+                  vector-Jacobian products.
+
+            Returns:
+                function: ``f`` so that :meth:`vjp` can be used as a decorator.
+          )pbdoc")
+      .def(
+          "jvp",
+          &PyCustomFunction::set_jvp,
+          "f"_a,
+          R"pbdoc(
+            Set the function which computes the Jacobian-vector products.
+
+            ``f(primals, tangents)`` is called with the arguments of the
+            function and their tangents as tuples. It returns the
+            Jacobian-vector products with the structure of the outputs of the
+            function.
+
+            Args:
+                f (function): The function which computes the
+                  Jacobian-vector products.
+
+            Returns:
+                function: ``f`` so that :meth:`jvp` can be used as a decorator.
+          )pbdoc");
   m.def(
       "eval",
       [](const py::args& args, bool retain_graph) {
@@ -457,6 +889,117 @@ void init_transforms(py::module_& m) {
               preserved. This option is intended to enable function transforms
               which contain control flow based on the value of an array.
       )pbdoc");
+  m.def(
+      "async_eval",
+      [](const py::args& args) {
+        std::vector<array> arrays = tree_flatten(args);
+        async_eval(arrays);
+      },
+      R"pbdoc(
+        Asynchronously evaluate an :class:`array` or tree of :class:`array`.
+
+        The computation is scheduled and :func:`async_eval` returns without
+        waiting for it. Accessing the arrays, for instance with :func:`eval`,
+        :meth:`array.item` or by converting them to NumPy, waits for the
+        computation to finish. This allows building the next graph while the
+        previous one is computed.
+
+        .. code-block:: python
+
+            y = step(x)
+            mx.async_eval(y)
+            for _ in range(n):
+                # Build the graph of the next step while y is computed
+                z = step(y)
+                mx.async_eval(z)
+                print(y.item())
+                y = z
+
+        Args:
+            *args (arrays or trees of arrays): Each argument can be a single array
+              or a tree of arrays. If a tree is given the nodes can be a Python
+              :class:`list`, :class:`tuple` or :class:`dict` but the leafs must all be
+              an :class:`array`.
+      )pbdoc");
+  m.def(
+      "set_memory_efficient_eval",
+      &set_memory_efficient_eval,
+      "enabled"_a,
+      R"pbdoc(
+        Order the operations run by :func:`eval` to reduce the peak memory.
+
+        By default the operations of a graph run in depth-first order. When
+        enabled, of the operations whose inputs are computed, the one which
+        frees the most memory net of the memory of its output runs first.
+        This keeps fewer intermediate arrays alive at once in wide graphs
+        such as backward passes.
+
+        Args:
+            enabled (bool): Whether to order the operations to reduce the
+              peak memory.
+      )pbdoc");
+  m.def(
+      "get_memory_efficient_eval",
+      &get_memory_efficient_eval,
+      R"pbdoc(
+        Check if :func:`eval` orders the operations to reduce the peak memory.
+      )pbdoc");
+  m.def(
+      "set_max_pending_depth",
+      &set_max_pending_depth,
+      "depth"_a,
+      R"pbdoc(
+        Bound the depth of the graphs which are not evaluated.
+
+        When the part of the graph of a new array which is not evaluated is
+        deeper than ``depth``, the inputs of the array are evaluated right
+        away. This keeps the graphs of loops which do not call :func:`eval`
+        from growing without bound. Arrays used by function transforms such
+        as :func:`grad` are not evaluated. The default depth ``0`` disables
+        it.
+
+        .. code-block:: python
+
+          mx.set_max_pending_depth(1000)
+          for _ in range(100000):
+              x = x + 1
+
+        Args:
+            depth (int): The maximum depth of the graphs which are not
+              evaluated.
+      )pbdoc");
+  m.def(
+      "get_max_pending_depth",
+      &get_max_pending_depth,
+      R"pbdoc(
+        Get the maximum depth of the graphs which are not evaluated.
+      )pbdoc");
+  m.def(
+      "get_auto_eval_count",
+      &get_auto_eval_count,
+      R"pbdoc(
+        Get the number of times the inputs of an array were evaluated because
+        its graph was deeper than :func:`set_max_pending_depth` allows.
+      )pbdoc");
+  m.def(
+      "estimate_peak_memory",
+      [](const py::args& args) {
+        return estimate_peak_memory(tree_flatten(args));
+      },
+      R"pbdoc(
+        Estimate the peak memory in bytes allocated to evaluate the arrays.
+
+        The estimate follows the order :func:`eval` would run the operations
+        in, assuming that every operation allocates its output and that the
+        intermediate arrays are freed after their last use. Nothing is
+        evaluated.
+
+        Args:
+            *args (arrays or trees of arrays): The arrays to evaluate.
+
+        Returns:
+            int: The estimated peak memory in bytes.
+      )pbdoc");
   m.def(
       "jvp",
       [](const py::function& fun,
@@ -543,15 +1086,24 @@ void init_transforms(py::module_& m) {
       "value_and_grad",
       [](const py::function& fun,
          const std::optional<IntOrVec>& argnums,
-         const StrOrVec& argnames) {
+         const StrOrVec& argnames,
+         bool cache) {
         auto [argnums_vec, argnames_vec] =
             validate_argnums_argnames(argnums, argnames);
-        return py::cpp_function(py_value_and_grad(
-            fun, argnums_vec, argnames_vec, "[value_and_grad]", false));
+        auto fn = py_value_and_grad(
+            fun, argnums_vec, argnames_vec, "[value_and_grad]", false);
+        if (cache) {
+          return py::cast(PyCachedFunction(
+              [fn](const py::args& args, const py::kwargs& kwargs) {
+                return py::cast(fn(args, kwargs));
+              }));
+        }
+        return py::cast<py::object>(py::cpp_function(fn));
       },
       "fun"_a,
       "argnums"_a = std::nullopt,
       "argnames"_a = std::vector<std::string>{},
+      "cache"_a = false,
       R"pbdoc(
         Returns a function which computes the value and gradient of ``fun``.
 
@@ -595,6 +1147,12 @@ void init_transforms(py::module_& m) {
             argnames (str or list(str), optional): Specify keyword arguments of
               ``fun`` to compute gradients with respect to. It defaults to [] so
               no gradients for keyword arguments by default.
+            cache (bool, optional): Record the graph of the value and the
+              gradients for each signature of the arguments (tree structure,
+              non array leaves, shapes and dtypes) and replay it in later
+              calls with the same signature instead of calling ``fun``.
+              Random numbers and other side effects of ``fun`` are frozen
+              when it is traced. Default: ``False``.
 
         Returns:
             function: A function which returns a tuple where the first element
@@ -605,19 +1163,24 @@ void init_transforms(py::module_& m) {
       "grad",
       [](const py::function& fun,
          const std::optional<IntOrVec>& argnums,
-         const StrOrVec& argnames) {
+         const StrOrVec& argnames,
+         bool cache) {
         auto [argnums_vec, argnames_vec] =
             validate_argnums_argnames(argnums, argnames);
         auto fn =
             py_value_and_grad(fun, argnums_vec, argnames_vec, "[grad]", true);
-        return py::cpp_function(
-            [fn](const py::args& args, const py::kwargs& kwargs) {
-              return fn(args, kwargs).second;
-            });
+        auto grad_fn = [fn](const py::args& args, const py::kwargs& kwargs) {
+          return fn(args, kwargs).second;
+        };
+        if (cache) {
+          return py::cast(PyCachedFunction(grad_fn));
+        }
+        return py::cast<py::object>(py::cpp_function(grad_fn));
       },
       "fun"_a,
       "argnums"_a = std::nullopt,
       "argnames"_a = std::vector<std::string>{},
+      "cache"_a = false,
       R"pbdoc(
         Returns a function which computes the gradient of ``fun``.
 
@@ -633,11 +1196,138 @@ void init_transforms(py::module_& m) {
             argnames (str or list(str), optional): Specify keyword arguments of
               ``fun`` to compute gradients with respect to. It defaults to [] so
               no gradients for keyword arguments by default.
+            cache (bool, optional): Record the graph of the gradients for each
+              signature of the arguments and replay it in later calls with the
+              same signature. See :func:`value_and_grad`. Default: ``False``.
 
         Returns:
             function: A function which has the same input arguments as ``fun`` and
             returns the gradient(s).
       )pbdoc");
+  m.def(
+      "jacrev",
+      [](const py::function& fun, const IntOrVec& argnums) {
+        return py::cpp_function(py_jacobian(
+            "jacrev", fun, argnums, 1, [](auto fun, auto argnums) {
+              return jacrev(fun, argnums);
+            }));
+      },
+      "fun"_a,
+      "argnums"_a = 0,
+      R"pbdoc(
+        Returns a function which computes the Jacobian of ``fun`` with
+        reverse mode differentiation.
+
+        The rows of the Jacobian are the vector-Jacobian products of the
+        basis vectors of the outputs, computed together in a single
+        vectorized graph with :func:`vmap` of :func:`vjp`. It is cheaper than
+        :func:`jacfwd` when ``fun`` has fewer outputs than inputs.
+
+        .. code-block:: python
+
+          import mlx.core as mx
+
+          def fun(x):
+              return mx.sin(x) * x.sum()
+
+          # The shape of the output followed by the shape of the input
+          jac = mx.jacrev(fun)(mx.array([0.5, 1.0, 2.0]))
+          print(jac.shape)  # (3, 3)
+
+        Each :class:`array` of the outputs of the returned function is
+        replaced by its Jacobian, whose shape is the shape of the output
+        followed by the shape of the argument. If ``argnums`` is a sequence
+        it is replaced by a tuple with the Jacobian for each argument in
+        ``argnums``.
+
+        Args:
+            fun (function): A function which takes a variable number of
+              :class:`array` or trees of :class:`array` and returns
+              a variable number of :class:`array` or trees of :class:`array`.
+            argnums (int or list(int), optional): Specify the index (or
+              indices) of the :class:`array` arguments of ``fun`` to
+              differentiate with respect to. Defaults to ``0``.
+
+        Returns:
+            function: A function which has the same input arguments as
+            ``fun`` and returns the derivatives.
+      )pbdoc");
+  m.def(
+      "jacfwd",
+      [](const py::function& fun, const IntOrVec& argnums) {
+        return py::cpp_function(py_jacobian(
+            "jacfwd", fun, argnums, 1, [](auto fun, auto argnums) {
+              return jacfwd(fun, argnums);
+            }));
+      },
+      "fun"_a,
+      "argnums"_a = 0,
+      R"pbdoc(
+        Returns a function which computes the Jacobian of ``fun`` with
+        forward mode differentiation.
+
+        The columns of the Jacobian are the Jacobian-vector products of the
+        basis vectors of the inputs, computed together in a single vectorized
+        graph with :func:`vmap` of :func:`jvp`. It is cheaper than
+        :func:`jacrev` when ``fun`` has more outputs than inputs. The
+        Jacobians are returned as for :func:`jacrev`.
+
+        Args:
+            fun (function): A function which takes a variable number of
+              :class:`array` or trees of :class:`array` and returns
+              a variable number of :class:`array` or trees of :class:`array`.
+            argnums (int or list(int), optional): Specify the index (or
+              indices) of the :class:`array` arguments of ``fun`` to
+              differentiate with respect to. Defaults to ``0``.
+
+        Returns:
+            function: A function which has the same input arguments as
+            ``fun`` and returns the derivatives.
+      )pbdoc");
+  m.def(
+      "hessian",
+      [](const py::function& fun, const IntOrVec& argnums) {
+        return py::cpp_function(py_jacobian(
+            "hessian", fun, argnums, 2, [](auto fun, auto argnums) {
+              return hessian(fun, argnums);
+            }));
+      },
+      "fun"_a,
+      "argnums"_a = 0,
+      R"pbdoc(
+        Returns a function which computes the Hessian of ``fun``.
+
+        The Hessian is computed as the forward mode Jacobian of the reverse
+        mode Jacobian, :func:`jacfwd` of :func:`jacrev`.
+
+        .. code-block:: python
+
+          import mlx.core as mx
+
+          def fun(x):
+              return (x**3).sum()
+
+          hess = mx.hessian(fun)(mx.array([1.0, 2.0]))
+          print(hess)  # [[6, 0], [0, 12]]
+
+        Each :class:`array` of the outputs of the returned function is
+        replaced by its Hessian, whose shape is the shape of the output
+        followed by the shape of the argument twice. If ``argnums`` is a
+        sequence it is replaced by a tuple of tuples with the second
+        derivatives for each pair of arguments in ``argnums``.
+
+        Args:
+            fun (function): A function which takes a variable number of
+              :class:`array` or trees of :class:`array` and returns
+              a variable number of :class:`array` or trees of :class:`array`.
+            argnums (int or list(int), optional): Specify the index (or
+              indices) of the :class:`array` arguments of ``fun`` to
+              differentiate with respect to. Defaults to ``0``.
+
+        Returns:
+            function: A function which has the same input arguments as
+            ``fun`` and returns the derivatives.
+      )pbdoc");
   m.def(
       "vmap",
       [](const py::function& fun,
@@ -667,6 +1357,96 @@ void init_transforms(py::module_& m) {
         Returns:
             function: The vectorized function.
       )pbdoc");
+  m.def(
+      "compile",
+      [](const py::function& fun) {
+        return py::cpp_function(py_compile(fun));
+      },
+      "fun"_a,
+      R"pbdoc(
+        Returns a compiled version of ``fun``.
+
+        The function is traced the first time it is called with a given set
+        of input shapes and dtypes. Later calls with the same shapes and
+        dtypes reuse the traced graph without calling ``fun`` again. Chains
+        of elementwise operations that run on the CPU are fused so that they
+        make a single pass over memory.
+
+        .. code-block:: python
+
+          import math
+          import mlx.core as mx
+
+          @mx.compile
+          def gelu(x):
+              return x * (1 + mx.erf(x / math.sqrt(2))) / 2
+
+          x = mx.random.uniform(shape=(32, 1024))
+          y = gelu(x)  # Traces gelu
+          y = gelu(x)  # Reuses the traced graph
+
+        .. note::
+
+          Arrays that ``fun`` uses from its enclosing scope (and random
+          numbers generated in ``fun``) are captured as constants when the
+          function is traced. Pass arrays which change between calls as
+          arguments.
+
+        Args:
+            fun (function): A function which takes a variable number of
+              :class:`array` or trees of :class:`array` and returns
+              a variable number of :class:`array` or trees of :class:`array`.
+
+        Returns:
+            function: The compiled function.
+      )pbdoc");
+  m.def(
+      "checkpoint",
+      [](const py::function& fun) {
+        return py::cpp_function(py_checkpoint(fun));
+      },
+      "fun"_a,
+      R"pbdoc(
+        Returns a checkpointed version of ``fun``.
+
+        The checkpointed function computes the same outputs as ``fun`` but
+        does not keep the intermediate arrays of ``fun`` alive for the
+        gradient. Instead ``fun`` is called again to recompute them during
+        the backward pass. This trades computation for memory when training
+        deep models.
+
+        .. code-block:: python
+
+          import mlx.core as mx
+
+          def block(x, w):
+              return mx.tanh(x @ w) @ w.T
+
+          def loss(x, w):
+              for _ in range(10):
+                  x = mx.checkpoint(block)(x, w)
+              return x.sum()
+
+          x = mx.random.uniform(shape=(32, 128))
+          w = mx.random.uniform(shape=(128, 512))
+          dw = mx.grad(loss, argnums=1)(x, w)
+
+        .. note::
+
+          Gradients only flow to the :class:`array` arguments of ``fun`` and
+          not to arrays ``fun`` uses from its enclosing scope. Random numbers
+          drawn from the default key are the same when ``fun`` is
+          recomputed. See :func:`mlx.nn.checkpoint` to checkpoint a
+          module.
+
+        Args:
+            fun (function): A function which takes a variable number of
+              :class:`array` or trees of :class:`array` and returns
+              a variable number of :class:`array` or trees of :class:`array`.
+
+        Returns:
+            function: The checkpointed function.
+      )pbdoc");
   m.def(
       "simplify",
       [](const py::args& args) {
@@ -704,6 +1484,67 @@ void init_transforms(py::module_& m) {
         Args:
           args: Any number of arrays and/or trees of arrays to be simplified.
       )pbdoc");
+  m.def(
+      "optimize",
+      [](const py::args& args, int level) {
+        auto removed = optimize(tree_flatten(args), level);
+        py::dict report;
+        for (auto& [name, n] : removed) {
+          report[name.c_str()] = n;
+        }
+        return report;
+      },
+      "level"_a = 1,
+      R"pbdoc(
+        Optimize the graph that computes the arrays.
+
+        Runs a pipeline of graph optimization passes. The passes of level 1
+        evaluate small arrays whose inputs are already computed, skip
+        multiplications by one and additions of zero, collapse chains of
+        reshapes, transposes and casts, replace reductions of broadcasted
+        arrays with cheaper operations and release the graphs of computed
+        arrays. Level 2 also runs :func:`simplify`. The arrays themselves
+        are not replaced, only the graphs computing them.
+
+        .. code-block:: python
+
+          import mlx.core as mx
+
+          x = mx.ones((10, 10))
+          y = (x.T.T * mx.array(1.0)).sum()
+
+          # The number of operations removed by each pass
+          print(mx.optimize(y))
+
+        Args:
+            *args (arrays or trees of arrays): The arrays whose graph to
+              optimize.
+            level (int, optional): The level of the passes to run.
+              Default: ``1``.
+
+        Returns:
+            dict: The number of operations each pass removed from the graph.
+      )pbdoc");
+  m.def(
+      "set_optimization_level",
+      &set_optimization_level,
+      "level"_a,
+      R"pbdoc(
+        Set the level of the optimization passes :func:`eval` runs.
+
+        Before computing a graph :func:`eval` runs the passes of
+        :func:`optimize` of the given level on it. The default level ``0``
+        runs none of them.
+
+        Args:
+            level (int): The level of the passes to run.
+      )pbdoc");
+  m.def(
+      "get_optimization_level",
+      &get_optimization_level,
+      R"pbdoc(
+        Get the level of the optimization passes :func:`eval` runs.
+      )pbdoc");
   m.def(
       "export_to_dot",
       [](py::object file, const py::args& args) {
@@ -160,6 +160,45 @@ class TestAutograd(mlx_tests.MLXTestCase):
         with self.assertRaises(ValueError):
             _ = fun_grad(mx.ones((2, 2)), mx.ones((2, 2)))
 
+    def test_cached_value_and_grad(self):
+        n_calls = 0
+
+        def fun(params, x, scale=1.0):
+            nonlocal n_calls
+            n_calls += 1
+            l = (scale * params["w"] * x).sum()
+            return l, {"l": l, "tag": "foo"}
+
+        value_grad_fn = mx.value_and_grad(fun, cache=True)
+        x = mx.array([1.0, 2.0])
+        for i in range(3):
+            w = mx.array([float(i), 1.0])
+            (l, aux), grads = value_grad_fn({"w": w}, x)
+            self.assertEqual(l.item(), i + 2.0)
+            self.assertEqual(aux["l"].item(), i + 2.0)
+            self.assertEqual(aux["tag"], "foo")
+            self.assertTrue(mx.array_equal(grads["w"], x))
+        self.assertEqual(n_calls, 1)
+        self.assertEqual(value_grad_fn.cache_info()["hits"], 2)
+        self.assertEqual(value_grad_fn.cache_info()["misses"], 1)
+
+        # A new shape, tree or non array argument traces again
+        (l, _), _ = value_grad_fn({"w": mx.ones((3,))}, mx.ones((3,)))
+        self.assertEqual(l.item(), 3.0)
+        (l, _), _ = value_grad_fn({"w": w}, x, scale=2.0)
+        self.assertEqual(l.item(), 8.0)
+        (l, _), _ = value_grad_fn({"w": w, "b": x}, x)
+        self.assertEqual(l.item(), 4.0)
+        self.assertEqual(n_calls, 4)
+        self.assertEqual(value_grad_fn.cache_info()["misses"], 4)
+        self.assertEqual(value_grad_fn.cache_info()["size"], 4)
+
+        dfdx = mx.grad(lambda x, y: (x * y).sum(), cache=True)
+        for i in range(2):
+            y = mx.array([float(i), 3.0])
+            self.assertTrue(mx.array_equal(dfdx(x, y), y))
+        self.assertEqual(dfdx.cache_info()["hits"], 1)
+
     def test_grad_kwargs(self):
         fun = lambda x, y: x * y
         a, b = mx.array(0.5), mx.array(2.0)
@@ -259,6 +298,134 @@ class TestAutograd(mlx_tests.MLXTestCase):
 
         self.assertTrue(mx.allclose(vjps[0], mx.zeros(shape_in)))
 
+    def test_checkpoint(self):
+        def fun(x, w):
+            for _ in range(3):
+                x = mx.tanh(x @ w)
+            return x
+
+        def loss(fn, x, w):
+            return fn(x, w).sum()
+
+        x = mx.random.uniform(shape=(4, 8))
+        w = mx.random.uniform(shape=(8, 8))
+        expected = mx.grad(loss, argnums=(1, 2))(fun, x, w)
+        out = mx.grad(loss, argnums=(1, 2))(mx.checkpoint(fun), x, w)
+        self.assertTrue(mx.allclose(out[0], expected[0]))
+        self.assertTrue(mx.allclose(out[1], expected[1]))
+
+        # Trees of arrays and other arguments
+        def tree_fun(inputs, scale):
+            return {"y": inputs["x"] * scale, "z": mx.sin(inputs["w"])}
+
+        x = mx.array([1.0, 2.0])
+        w = mx.array([0.5, 0.25])
+        g = mx.grad(
+            lambda x, w: mx.checkpoint(tree_fun)({"x": x, "w": w}, 3.0)["z"].sum(),
+            argnums=(0, 1),
+        )(x, w)
+        self.assertTrue(mx.allclose(g[0], mx.zeros_like(x)))
+        self.assertTrue(mx.allclose(g[1], mx.cos(w)))
+
+        # Random numbers are the same when recomputed
+        def noisy(x):
+            return x * mx.random.uniform(shape=x.shape)
+
+        (y,), (dx,) = mx.vjp(mx.checkpoint(noisy), [x], [mx.ones_like(x)])
+        self.assertTrue(mx.allclose(y, x * dx))
+
+    def test_custom_function(self):
+        @mx.custom_function
+        def softplus(x):
+            return mx.logaddexp(x, 0)
+
+        @softplus.vjp
+        def softplus_vjp(primals, cotangent, output):
+            return cotangent * (1 - mx.exp(-output))
+
+        x = mx.array([-1.0, 0.0, 2.0])
+        self.assertTrue(mx.allclose(softplus(x), mx.logaddexp(x, 0)))
+        dx = mx.grad(lambda x: softplus(x).sum())(x)
+        self.assertTrue(mx.allclose(dx, mx.sigmoid(x)))
+
+        # Several arguments and outputs and arguments which are not arrays
+        @mx.custom_function
+        def fun(x, y, scale):
+            return {"a": x * y * scale, "b": x + y}
+
+        @fun.vjp
+        def fun_vjp(primals, cotangents, outputs):
+            x, y, scale = primals
+            da, db = cotangents["a"], cotangents["b"]
+            return 2 * da * y * scale + db, da * x * scale + db, None
+
+        @fun.jvp
+        def fun_jvp(primals, tangents):
+            x, y, scale = primals
+            tx, ty, _ = tangents
+            return {"a": (tx * y + x * ty) * scale, "b": tx + ty}
+
+        y = mx.array([3.0, 1.0, 0.5])
+        dx, dy = mx.grad(
+            lambda x, y: fun(x, y, 2.0)["a"].sum(), argnums=(0, 1)
+        )(x, y)
+        self.assertTrue(mx.allclose(dx, 4 * y))
+        self.assertTrue(mx.allclose(dy, 2 * x))
+
+        def unary(x):
+            out = fun(x, y, 2.0)
+            return out["a"], out["b"]
+
+        _, (ta, tb) = mx.jvp(unary, [x], [mx.ones_like(x)])
+        self.assertTrue(mx.allclose(ta, 2 * y))
+        self.assertTrue(mx.allclose(tb, mx.ones_like(x)))
+
+        # Without a vjp function the function is differentiated
+        @mx.custom_function
+        def square(x):
+            return x * x
+
+        dx = mx.grad(lambda x: square(x).sum())(x)
+        self.assertTrue(mx.allclose(dx, 2 * x))
+
+        # Vectorizing vectorizes the function
+        out = mx.vmap(softplus)(x.reshape(3, 1))
+        self.assertTrue(mx.allclose(out.reshape(3), mx.logaddexp(x, 0)))
+
+    def test_jacobians(self):
+        def fun(x, w):
+            return mx.sin(w @ x), x.sum()
+
+        x = mx.array([0.5, -1.0, 2.0])
+        w = mx.arange(6).reshape(2, 3) * 0.1
+        c = mx.cos(w @ x)
+        expected = [
+            (c[:, None] * w, c[:, None, None] * mx.eye(2)[:, :, None] * x),
+            (mx.ones((3,)), mx.zeros((2, 3))),
+        ]
+        for jac_fun in [mx.jacrev, mx.jacfwd]:
+            jacobians = jac_fun(fun, argnums=(0, 1))(x, w)
+            for jac, e in zip(jacobians, expected):
+                self.assertEqual(jac[0].shape, e[0].shape)
+                self.assertTrue(mx.allclose(jac[0], e[0]))
+                self.assertEqual(jac[1].shape, e[1].shape)
+                self.assertTrue(mx.allclose(jac[1], e[1]))
+
+            # A single argument and trees of outputs
+            out = jac_fun(lambda x: {"y": mx.exp(x)})(x)
+            self.assertTrue(mx.allclose(out["y"], mx.eye(3) * mx.exp(x)))
+
+        with self.assertRaises(ValueError):
+            mx.jacrev(fun, argnums=2)(x, w)
+        with self.assertRaises(ValueError):
+            mx.jacfwd(fun)([x], w)
+
+        hess = mx.hessian(lambda x: (x**3).sum())(x)
+        self.assertTrue(mx.allclose(hess, mx.eye(3) * 6 * x))
+        hess = mx.hessian(lambda x, y: (x * y).sum(), argnums=(0, 1))(x, x)
+        self.assertTrue(mx.allclose(hess[0][0], mx.zeros((3, 3))))
+        self.assertTrue(mx.allclose(hess[0][1], mx.eye(3)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -12,7 +12,7 @@ import numpy as np
 class TestBlas(mlx_tests.MLXTestCase):
     @property
     def dtypes(self):
-        return ["float32", "float16"] if mx.metal.is_available() else ["float32"]
+        return ["float32", "float16"]
 
     def __gemm_test(
         self,
@@ -167,6 +167,19 @@ class TestBlas(mlx_tests.MLXTestCase):
 
             self.assertTrue(np.allclose(c_mlx, c_npy, atol=1e-6))
 
+    def test_matmul_bfloat16(self):
+        a_npy = np.random.normal(0.0, 1.0, (4, 1, 16, 32)).astype(np.float32)
+        b_npy = np.random.normal(0.0, 1.0, (3, 32, 8)).astype(np.float32)
+        a_mlx = mx.array(a_npy, dtype=mx.bfloat16)
+        b_mlx = mx.array(b_npy, dtype=mx.bfloat16)
+
+        c_npy = a_npy @ b_npy
+        c_mlx = a_mlx @ b_mlx
+        self.assertEqual(c_mlx.dtype, mx.bfloat16)
+        self.assertTrue(
+            np.allclose(np.array(c_mlx.astype(mx.float32)), c_npy, atol=0.5)
+        )
+
     def test_matmul_batched(self):
         np.random.seed(0)
         # Batched matmul
@@ -0,0 +1,108 @@
+# Copyright © 2023 Apple Inc.
+
+import math
+import unittest
+
+import mlx.core as mx
+import mlx_tests
+
+
+class TestCompile(mlx_tests.MLXTestCase):
+    def test_simple_compile(self):
+        def fun(x, y):
+            return x + y
+
+        compiled_fn = mx.compile(fun)
+        x = mx.array(1.0)
+        y = mx.array(1.0)
+        out = compiled_fn(x, y)
+        self.assertEqual(out.item(), 2.0)
+
+        # Try again
+        out = compiled_fn(x, y)
+        self.assertEqual(out.item(), 2.0)
+
+        # Change sizes
+        x = mx.array([1.0, 2.0])
+        out = compiled_fn(x, y)
+        self.assertTrue(mx.array_equal(out, mx.array([2.0, 3.0])))
+
+        y = mx.array([1.0, 2.0])
+        out = compiled_fn(x, y)
+        self.assertTrue(mx.array_equal(out, mx.array([2.0, 4.0])))
+
+        # Change types
+        x = mx.array([1, 2], mx.int32)
+        y = mx.array([1, 2], mx.int32)
+        out = compiled_fn(x, y)
+        self.assertEqual(out.dtype, mx.int32)
+        self.assertTrue(mx.array_equal(out, mx.array([2, 4])))
+
+    def test_traced_once(self):
+        n_calls = 0
+
+        def fun(x):
+            nonlocal n_calls
+            n_calls += 1
+            return mx.exp(x) * 2
+
+        compiled_fn = mx.compile(fun)
+        x = mx.array([1.0, 2.0])
+        for _ in range(3):
+            compiled_fn(x)
+        self.assertEqual(n_calls, 1)
+
+        compiled_fn(mx.array([1.0, 2.0, 3.0]))
+        self.assertEqual(n_calls, 2)
+
+    def test_fused_elementwise(self):
+        def gelu(x):
+            return x * (1 + mx.erf(x / math.sqrt(2))) / 2
+
+        compiled_gelu = mx.compile(gelu)
+        for shape in [(4,), (3, 5), (64, 1031)]:
+            x = mx.random.normal(shape)
+            self.assertTrue(mx.allclose(compiled_gelu(x), gelu(x)))
+
+        # Inputs that are not contiguous
+        x = mx.random.normal((64, 1031)).T
+        self.assertTrue(mx.allclose(compiled_gelu(x), gelu(x)))
+
+        # Broadcast inputs and intermediate values used more than once
+        def fun(x, y):
+            z = mx.exp(x + y)
+            return z * mx.sin(z) - mx.abs(x), z
+
+        compiled_fn = mx.compile(fun)
+        x = mx.random.uniform(shape=(16, 1000))
+        y = mx.random.uniform(shape=(1000,))
+        for a, b in zip(compiled_fn(x, y), fun(x, y)):
+            self.assertTrue(mx.allclose(a, b))
+
+    def test_compile_with_trees(self):
+        def fun(inputs):
+            return {"sum": inputs["a"] + inputs["b"], "neg": [-inputs["a"]]}
+
+        compiled_fn = mx.compile(fun)
+        a = mx.array([1.0, 2.0])
+        b = mx.array([3.0, 4.0])
+        out = compiled_fn({"a": a, "b": b})
+        self.assertTrue(mx.array_equal(out["sum"], mx.array([4.0, 6.0])))
+        self.assertTrue(mx.array_equal(out["neg"][0], mx.array([-1.0, -2.0])))
+
+    def test_compile_with_transforms(self):
+        def fun(x):
+            return mx.sum(mx.sin(x) * mx.exp(x))
+
+        compiled_fn = mx.compile(fun)
+        x = mx.array([0.5, 1.0, 1.5])
+        self.assertTrue(mx.allclose(mx.grad(compiled_fn)(x), mx.grad(fun)(x)))
+        self.assertTrue(
+            mx.allclose(
+                mx.vmap(compiled_fn)(x[:, None]), mx.vmap(fun)(x[:, None])
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
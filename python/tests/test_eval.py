@@ -1,5 +1,6 @@
 # Copyright © 2023 Apple Inc.
 
+import sys
 import unittest
 from functools import partial
 
@@ -29,6 +30,123 @@ class TestEval(mlx_tests.MLXTestCase):
         y = dfun_dx_2(mx.array(1.0))
         self.assertEqual(y.item(), 6.0)
 
+    def test_async_eval(self):
+        x = mx.ones((64, 64))
+        y = x
+        for _ in range(10):
+            y = mx.exp(y @ x / 64)
+        mx.async_eval(y)
+
+        # Build on and access the array while it may still be computed
+        z = mx.sum(y)
+        mx.async_eval(z)
+        expected = mx.ones((64, 64))
+        for _ in range(10):
+            expected = mx.exp(expected @ x / 64)
+        self.assertTrue(mx.allclose(y, expected))
+        self.assertTrue(mx.allclose(z, expected.sum()))
+
+        # Trees of arrays
+        out = {"a": mx.ones((4,)) * 2, "b": [mx.arange(4)]}
+        mx.async_eval(out)
+        self.assertEqual(out["a"].tolist(), [2, 2, 2, 2])
+        self.assertEqual(out["b"][0].tolist(), [0, 1, 2, 3])
+
+    def test_max_concurrency(self):
+        max_concurrency = mx.get_max_concurrency()
+        with self.assertRaises(ValueError):
+            mx.set_max_concurrency(0)
+
+        x = mx.arange(4096).astype(mx.float32).reshape(64, 64)
+
+        def fun():
+            outs = []
+            for i in range(8):
+                y = mx.multiply(x.T, i, stream=mx.cpu)
+                y = mx.matmul(x, y, stream=mx.cpu)
+                y = mx.multiply(y, 1e-9, stream=mx.cpu)
+                outs.append(mx.exp(y, stream=mx.cpu))
+            total = outs[0]
+            for out in outs[1:]:
+                total = mx.add(total, out, stream=mx.cpu)
+            return outs + [total]
+
+        mx.set_max_concurrency(1)
+        self.assertEqual(mx.get_max_concurrency(), 1)
+        expected = fun()
+        mx.eval(expected)
+        mx.set_max_concurrency(4)
+        self.assertEqual(mx.get_max_concurrency(), 4)
+        for _ in range(10):
+            outs = fun()
+            mx.eval(outs)
+            for out, e in zip(outs, expected):
+                self.assertTrue(mx.array_equal(out, e))
+
+        mx.set_max_concurrency(max_concurrency)
+
+    def test_stream_affinity(self):
+        n_nodes = mx.get_num_numa_nodes()
+        self.assertTrue(n_nodes >= 1)
+        with self.assertRaises(ValueError):
+            mx.get_numa_node_cpus(n_nodes)
+        if mx.metal.is_available():
+            with self.assertRaises(ValueError):
+                mx.set_stream_affinity(mx.default_stream(mx.gpu), [0])
+        if not sys.platform.startswith("linux"):
+            return
+
+        s = mx.new_stream(mx.cpu)
+        cpus = mx.get_numa_node_cpus(0)
+        self.assertTrue(len(cpus) > 0)
+        mx.set_stream_affinity(s, cpus)
+        mx.set_thread_pool_affinity(cpus)
+        x = mx.arange(100, stream=s)
+        self.assertEqual(mx.sum(x * x, stream=s).item(), 328350)
+        mx.set_stream_affinity(s, [])
+        mx.set_thread_pool_affinity([])
+
+    def test_max_pending_depth(self):
+        mx.set_max_pending_depth(10)
+        self.assertEqual(mx.get_max_pending_depth(), 10)
+        count = mx.get_auto_eval_count()
+        x = mx.zeros((4,))
+        for _ in range(100):
+            x = x + 1
+        self.assertTrue(mx.get_auto_eval_count() - count >= 9)
+        self.assertTrue(mx.array_equal(x, mx.full((4,), 100)))
+
+        # Arrays in function transforms are not evaluated
+        count = mx.get_auto_eval_count()
+
+        def fun(x):
+            for _ in range(100):
+                x = mx.sin(x)
+            return x
+
+        mx.grad(fun)(mx.array(1.0))
+        self.assertEqual(mx.get_auto_eval_count(), count)
+        mx.set_max_pending_depth(0)
+
+    def test_optimize(self):
+        x = mx.arange(120.0).reshape(10, 12)
+        y = mx.exp((x.T.T * 1.0).astype(mx.float32))
+        removed = mx.optimize(y)
+        self.assertTrue(removed["peephole"] > 0)
+        self.assertTrue("simplify" not in removed)
+        self.assertTrue(mx.allclose(y, mx.exp(x)))
+
+        removed = mx.optimize(mx.exp(x) + mx.exp(x), level=2)
+        self.assertTrue("simplify" in removed)
+
+        with self.assertRaises(ValueError):
+            mx.set_optimization_level(-1)
+        mx.set_optimization_level(2)
+        self.assertEqual(mx.get_optimization_level(), 2)
+        y = mx.broadcast_to(x, (4, 10, 12)).sum(axis=0) * mx.array(1.0)
+        self.assertTrue(mx.allclose(y, 4 * x))
+        mx.set_optimization_level(0)
+
 
 if __name__ == "__main__":
     unittest.main()
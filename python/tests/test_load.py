@@ -91,6 +91,25 @@ class TestLoad(mlx_tests.MLXTestCase):
                             mx.array_equal(load_dict["test"], save_dict["test"])
                         )
 
+    def test_load_from_path_after_delete(self):
+        if not os.path.isdir(self.test_dir):
+            os.mkdir(self.test_dir)
+
+        save_dict = {
+            "a": mx.random.normal(shape=(33, 7)),
+            "b": mx.arange(10, dtype=mx.int16),
+            "c": mx.ones((3,), dtype=mx.bool_),
+        }
+        save_file = os.path.join(self.test_dir, "mapped.safetensors")
+        mx.save_safetensors(save_file, save_dict)
+        load_dict = mx.load(save_file)
+        mx.eval(load_dict)
+
+        # Loaded arrays keep their data after the file is removed
+        os.remove(save_file)
+        for k, v in save_dict.items():
+            self.assertTrue(mx.array_equal(load_dict[k], v))
+
     def test_save_and_load_fs(self):
 
         if not os.path.isdir(self.test_dir):
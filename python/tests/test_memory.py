@@ -0,0 +1,63 @@
+# Copyright © 2023 Apple Inc.
+
+import unittest
+
+import mlx.core as mx
+import mlx_tests
+
+
+class TestMemory(mlx_tests.MLXTestCase):
+    def test_memory_info(self):
+        old_limit = mx.set_cache_limit(1 << 30)
+
+        a = mx.zeros((4096,))
+        mx.eval(a)
+        active = mx.get_active_memory()
+        self.assertGreaterEqual(active, 4096 * 4)
+        self.assertGreaterEqual(mx.get_peak_memory(), active)
+
+        del a
+        self.assertLessEqual(mx.get_active_memory(), active - 4096 * 4)
+        self.assertGreaterEqual(mx.get_cache_memory(), 4096 * 4)
+
+        mx.clear_cache()
+        self.assertEqual(mx.get_cache_memory(), 0)
+
+        self.assertEqual(mx.set_cache_limit(0), 1 << 30)
+        b = mx.zeros((4096,))
+        mx.eval(b)
+        del b
+        self.assertEqual(mx.get_cache_memory(), 0)
+
+        mx.set_cache_limit(old_limit)
+
+    def test_memory_efficient_eval(self):
+        self.assertFalse(mx.get_memory_efficient_eval())
+        x = mx.ones((1000,))
+        mx.eval(x)
+        self.assertEqual(mx.estimate_peak_memory(mx.exp(mx.exp(mx.exp(x)))), 8000)
+        self.assertEqual(mx.estimate_peak_memory(x), 0)
+
+        def fun(x, y):
+            p = mx.exp(x)
+            e = mx.exp(mx.exp(y))
+            q = mx.concatenate([e, e]).reshape(2000, 1)
+            return p @ q
+
+        a = mx.ones((1, 2000))
+        b = mx.ones((1000,))
+        mx.eval(a, b)
+        expected = fun(a, b)
+        depth_first_peak = mx.estimate_peak_memory(expected)
+        mx.eval(expected)
+
+        mx.set_memory_efficient_eval(True)
+        self.assertTrue(mx.get_memory_efficient_eval())
+        out = fun(a, b)
+        self.assertLess(mx.estimate_peak_memory({"out": out}), depth_first_peak)
+        self.assertTrue(mx.allclose(out, expected))
+        mx.set_memory_efficient_eval(False)
+
+
+if __name__ == "__main__":
+    unittest.main()
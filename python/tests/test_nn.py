@@ -18,6 +18,47 @@ class TestNN(mlx_tests.MLXTestCase):
         outputs = layer(inputs)
         self.assertEqual(tuple(outputs.shape), (10, 8))
 
+    def test_cached_value_and_grad(self):
+        model = nn.Linear(input_dims=4, output_dims=2)
+        x = mx.random.normal((8, 4))
+        y = mx.random.normal((8, 2))
+        loss_fn = lambda x, y: nn.losses.mse_loss(model(x), y)
+
+        value_grad_fn = nn.value_and_grad(model, loss_fn)
+        cached_value_grad_fn = nn.value_and_grad(model, loss_fn, cache=True)
+        for _ in range(3):
+            loss, grads = value_grad_fn(x, y)
+            cached_loss, cached_grads = cached_value_grad_fn(x, y)
+            self.assertTrue(mx.allclose(loss, cached_loss))
+            flat_grads = zip(tree_flatten(grads), tree_flatten(cached_grads))
+            for (_, g), (_, cg) in flat_grads:
+                self.assertTrue(mx.allclose(g, cg))
+            params = tree_map(lambda p, g: p - 0.1 * g, model.parameters(), grads)
+            model.update(params)
+        self.assertEqual(cached_value_grad_fn.cache_info()["misses"], 1)
+        self.assertEqual(cached_value_grad_fn.cache_info()["hits"], 2)
+
+    def test_checkpoint(self):
+        layer = nn.TransformerEncoderLayer(dims=8, num_heads=2, mlp_dims=16)
+        x = mx.random.normal((2, 4, 8))
+        mask = nn.MultiHeadAttention.create_additive_causal_mask(4)
+
+        def loss_fn(fn):
+            return lambda x: fn(x, mask).sum()
+
+        loss, grads = nn.value_and_grad(layer, loss_fn(layer))(x)
+        ck_loss, ck_grads = nn.value_and_grad(
+            layer, loss_fn(nn.checkpoint(layer))
+        )(x)
+        self.assertTrue(mx.allclose(loss, ck_loss))
+        flat_grads = zip(tree_flatten(grads), tree_flatten(ck_grads))
+        for (_, g), (_, cg) in flat_grads:
+            self.assertTrue(mx.allclose(g, cg, atol=1e-5))
+
+        encoder = nn.TransformerEncoder(2, 8, 2, 16, checkpoint=True)
+        y = encoder(x, mask)
+        self.assertEqual(y.shape, x.shape)
+
     def test_cross_entropy(self):
         logits = mx.array([[0.0, -float("inf")], [-float("inf"), 0.0]])
         targets = mx.array([0, 1])
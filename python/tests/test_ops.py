@@ -1547,6 +1547,27 @@ class TestOps(mlx_tests.MLXTestCase):
         expected_3 = np.repeat(data_3, 2, axis=0)
         self.assertEqualArray(repeat_3, mx.array(expected_3))
 
+    def test_num_threads(self):
+        n_threads = mx.get_num_threads()
+        with self.assertRaises(ValueError):
+            mx.set_num_threads(0)
+
+        x = mx.arange(1 << 20).astype(mx.float32).reshape(1024, 1024)
+
+        def fun():
+            return [mx.exp(x * 1e-7), x + x.T, x.T - mx.ones((1024, 1))]
+
+        mx.set_num_threads(1)
+        self.assertEqual(mx.get_num_threads(), 1)
+        expected = fun()
+        mx.eval(expected)
+        mx.set_num_threads(4)
+        self.assertEqual(mx.get_num_threads(), 4)
+        for out, e in zip(fun(), expected):
+            self.assertTrue(mx.array_equal(out, e))
+
+        mx.set_num_threads(n_threads)
+
 
 if __name__ == "__main__":
     unittest.main()
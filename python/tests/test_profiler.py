@@ -0,0 +1,48 @@
+# Copyright © 2023 Apple Inc.
+
+import json
+import os
+import tempfile
+import unittest
+
+import mlx.core as mx
+import mlx_tests
+
+
+class TestProfiler(mlx_tests.MLXTestCase):
+    def test_profiler(self):
+        x = mx.ones((16, 32))
+        w = mx.ones((32, 8))
+        mx.eval(x, w)
+
+        with mx.profiler() as prof:
+            y = mx.exp(mx.matmul(x, w, stream=mx.cpu), stream=mx.cpu)
+            mx.eval(y)
+        mx.eval(y + y)
+
+        events = prof.events
+        self.assertEqual([e["name"] for e in events], ["Matmul", "Exp"])
+        self.assertEqual(events[0]["input_shapes"], [[16, 32], [32, 8]])
+        self.assertEqual(events[0]["output_shape"], [16, 8])
+        self.assertEqual(events[0]["bytes_allocated"], 16 * 8 * 4)
+        self.assertEqual(events[0]["stream"], mx.default_stream(mx.cpu))
+        for e in events:
+            self.assertLessEqual(e["enqueue_time"], e["start_time"])
+            self.assertLessEqual(e["start_time"], e["end_time"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            prof.save_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        names = [e["name"] for e in trace["traceEvents"]]
+        self.assertEqual(names, ["Matmul", "Exp"])
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+
+        summary = prof.summary()
+        self.assertIn("Matmul", summary)
+        self.assertIn("Exp", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -76,6 +76,34 @@ class TestQuantized(mlx_tests.MLXTestCase):
                             self.assertEqual(y_q.shape, y_hat.shape)
                             self.assertLess((y_q - y_hat).abs().max(), 1e-3)
 
+    def test_qmm_half_precision(self):
+        key = mx.random.key(0)
+        k1, k2 = mx.random.split(key)
+        group_size = 64
+        bits = 4
+        w = mx.random.normal(shape=(96, 256), key=k2)
+        w_q, scales, biases = mx.quantize(w, group_size, bits)
+        w_hat = mx.dequantize(w_q, scales, biases, group_size, bits)
+        for dtype in [mx.float16, mx.bfloat16]:
+            for M in [1, 5]:
+                with self.subTest(dtype=dtype, M=M):
+                    x = mx.random.normal(shape=(M, 256), key=k1)
+                    y_q = mx.quantized_matmul(
+                        x.astype(dtype),
+                        w_q.T,
+                        scales.astype(dtype),
+                        biases.astype(dtype),
+                        group_size,
+                        bits,
+                    )
+                    y_hat = x @ w_hat.T
+                    self.assertEqual(y_q.dtype, dtype)
+                    self.assertEqual(y_q.shape, y_hat.shape)
+                    rel = (y_q.astype(mx.float32) - y_hat).abs().max() / (
+                        y_hat.abs().max()
+                    )
+                    self.assertLess(rel, 2e-2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -114,6 +114,33 @@ class TestReduce(mlx_tests.MLXTestCase):
                     b = getattr(np, op)(data)
                     self.assertEqual(a.item(), b)
 
+    def test_large_reductions(self):
+        x_npy = np.random.rand(256, 4096).astype(np.float32)
+        x_mlx = mx.array(x_npy)
+        for axis in [None, 0, 1]:
+            with self.subTest(axis=axis):
+                z_npy = np.sum(x_npy, axis=axis, dtype=np.float64)
+                z_mlx = mx.sum(x_mlx, axis=axis)
+                self.assertTrue(np.allclose(z_npy, np.array(z_mlx), rtol=1e-5))
+
+                z_npy = np.max(x_npy.T, axis=axis)
+                z_mlx = mx.max(x_mlx.T, axis=axis)
+                self.assertTrue(np.array_equal(z_npy, np.array(z_mlx)))
+
+        # The results do not depend on the number of threads
+        n_threads = mx.get_num_threads()
+        mx.set_num_threads(1)
+        expected = mx.sum(x_mlx, axis=0)
+        mx.eval(expected)
+        mx.set_num_threads(4)
+        out = mx.sum(x_mlx, axis=0)
+        mx.eval(out)
+        mx.set_num_threads(n_threads)
+        self.assertTrue(mx.array_equal(out, expected).item())
+
+        # Accurate large float sums
+        self.assertEqual(mx.sum(mx.ones((1 << 24,))).item(), float(1 << 24))
+
 
 if __name__ == "__main__":
     unittest.main(failfast=True)
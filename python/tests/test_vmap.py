@@ -219,5 +219,35 @@ class TestVmap(mlx_tests.MLXTestCase):
         self.assertTrue(mx.array_equal(out, expected))
 
 
+    def test_vmap_matmul(self):
+        a = mx.random.uniform(shape=(4, 2, 3))
+        b = mx.random.uniform(shape=(4, 3, 5))
+        out = mx.vmap(mx.matmul, in_axes=(0, 0))(a, b)
+        self.assertTrue(mx.allclose(out, a @ b))
+
+        out = mx.vmap(mx.matmul, in_axes=(None, 0))(a[0], b)
+        self.assertTrue(mx.allclose(out, a[0] @ b))
+
+        out = mx.vmap(mx.matmul, in_axes=(0, None))(a, b[0])
+        self.assertTrue(mx.allclose(out, a @ b[0]))
+
+    def test_vmap_conv(self):
+        x = mx.random.uniform(shape=(2, 1, 8, 3))
+        w = mx.random.uniform(shape=(2, 4, 3, 3))
+        for in_axes in [(0, None), (None, 0), (0, 0)]:
+            out = mx.vmap(mx.conv1d, in_axes=in_axes)(
+                x if in_axes[0] == 0 else x[0], w if in_axes[1] == 0 else w[0]
+            )
+            expected = mx.stack(
+                [
+                    mx.conv1d(
+                        x[i] if in_axes[0] == 0 else x[0],
+                        w[i] if in_axes[1] == 0 else w[0],
+                    )
+                    for i in range(2)
+                ]
+            )
+            self.assertTrue(mx.allclose(out, expected, atol=1e-5))
+
 if __name__ == "__main__":
     unittest.main()
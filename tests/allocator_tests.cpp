@@ -41,3 +41,45 @@ TEST_CASE("test large allocations") {
   // Shouldn't be able to allocate an exabyte anytime soon.
   CHECK_THROWS_AS(allocator::malloc(1ull << 60), std::runtime_error);
 }
+
+TEST_CASE("test buffer cache and memory stats") {
+  clear_cache();
+  CHECK_EQ(get_cache_memory(), 0);
+
+  size_t active = get_active_memory();
+  auto buffer = allocator::malloc(1000);
+  CHECK_GE(get_active_memory(), active + 1000);
+  CHECK_GE(get_peak_memory(), get_active_memory());
+  void* ptr = buffer.ptr();
+  allocator::free(buffer);
+  CHECK_EQ(get_active_memory(), active);
+  CHECK_GE(get_cache_memory(), 1000);
+
+  // A buffer of the same size class is reused
+  buffer = allocator::malloc(990);
+  CHECK_EQ(buffer.ptr(), ptr);
+  CHECK_EQ(get_cache_memory(), 0);
+  allocator::free(buffer);
+
+  // The cache is limited
+  size_t old_limit = set_cache_limit(0);
+  CHECK_EQ(get_cache_memory(), 0);
+  buffer = allocator::malloc(1000);
+  allocator::free(buffer);
+  CHECK_EQ(get_cache_memory(), 0);
+
+  set_cache_limit(4096);
+  std::vector<allocator::Buffer> buffers;
+  for (int i = 0; i < 8; i++) {
+    buffers.push_back(allocator::malloc(1024));
+  }
+  for (auto& b : buffers) {
+    allocator::free(b);
+  }
+  CHECK_LE(get_cache_memory(), 4096);
+  CHECK_GT(get_cache_memory(), 0);
+
+  clear_cache();
+  CHECK_EQ(get_cache_memory(), 0);
+  CHECK_EQ(set_cache_limit(old_limit), 4096);
+}
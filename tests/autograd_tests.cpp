@@ -1192,3 +1192,182 @@ TEST_CASE("test scan grads") {
     CHECK(array_equal(out, expected).item<bool>());
   }
 }
+
+TEST_CASE("test checkpoint grads") {
+  auto fun = [](std::vector<array> inputs) {
+    auto& x = inputs[0];
+    auto& w = inputs[1];
+    return std::vector<array>{sin(matmul(x, w)) * x};
+  };
+  auto loss = [](auto fn) {
+    return [fn](std::vector<array> inputs) {
+      return sum(fn(inputs)[0]);
+    };
+  };
+
+  auto x = reshape(arange(4.0f), {2, 2});
+  auto w = array({0.5f, -1.0f, 2.0f, 0.25f}, {2, 2});
+  auto expected = grad(loss(fun), {0, 1})({x, w});
+  auto out = grad(loss(checkpoint(fun)), {0, 1})({x, w});
+  CHECK(allclose(out[0], expected[0]).item<bool>());
+  CHECK(allclose(out[1], expected[1]).item<bool>());
+
+  // The output depends on the inputs and the computed output
+  auto y = checkpoint(fun)({x, w})[0];
+  CHECK_EQ(y.inputs().size(), 3);
+  eval(y);
+  CHECK(allclose(y, fun({x, w})[0]).item<bool>());
+
+  // Second order gradients
+  auto d2 = grad([&](std::vector<array> inputs) {
+    return sum(grad(loss(checkpoint(fun)))(inputs)[0]);
+  })({x, w});
+  auto d2_expected = grad([&](std::vector<array> inputs) {
+    return sum(grad(loss(fun))(inputs)[0]);
+  })({x, w});
+  CHECK(allclose(d2[0], d2_expected[0]).item<bool>());
+
+  // Forward mode
+  auto unary = [&fun, &w](array x) { return fun({x, w})[0]; };
+  auto unary_checkpoint = [&fun, &w](array x) {
+    return checkpoint(fun)({x, w})[0];
+  };
+  auto t = ones({2, 2});
+  CHECK(allclose(jvp(unary_checkpoint, x, t).second, jvp(unary, x, t).second)
+            .item<bool>());
+
+  // Random numbers are the same when recomputed
+  auto noisy = [](std::vector<array> inputs) {
+    return std::vector<array>{inputs[0] * random::uniform({2, 2})};
+  };
+  auto [outputs, vjps] = vjp(checkpoint(noisy), {x}, {ones({2, 2})});
+  CHECK(allclose(outputs[0], x * vjps[0]).item<bool>());
+}
+
+TEST_CASE("test custom function grads") {
+  // A vjp which scales the cotangent instead of differentiating exp
+  auto fun = [](std::vector<array> inputs) {
+    return std::vector<array>{exp(inputs[0]) * inputs[1]};
+  };
+  int n_calls = 0;
+  auto fun_vjp = [&n_calls](
+                     std::vector<array> primals,
+                     std::vector<array> cotans,
+                     std::vector<array> outputs) {
+    n_calls++;
+    return std::vector<array>{
+        cotans[0] * outputs[0], cotans[0] * exp(primals[0]) * array(2.0f)};
+  };
+  auto custom_fun = custom_function(fun, fun_vjp);
+
+  auto x = array({0.5f, -1.0f, 2.0f});
+  auto y = array({2.0f, 3.0f, -1.0f});
+  auto out = custom_fun({x, y})[0];
+  CHECK(allclose(out, fun({x, y})[0]).item<bool>());
+  CHECK_EQ(out.inputs().size(), 3);
+
+  auto loss = [&custom_fun](std::vector<array> inputs) {
+    return sum(custom_fun(inputs)[0]);
+  };
+  auto grads = grad(loss, {0, 1})({x, y});
+  CHECK_EQ(n_calls, 1);
+  CHECK(allclose(grads[0], exp(x) * y).item<bool>());
+  CHECK(allclose(grads[1], exp(x) * array(2.0f)).item<bool>());
+
+  // Forward mode differentiates the function without a jvp function
+  auto t = array({1.0f, 1.0f, 1.0f});
+  auto [outs, jvps] = jvp(custom_fun, {x, y}, {t, zeros_like(y)});
+  CHECK(allclose(jvps[0], exp(x) * y).item<bool>());
+
+  // A jvp function
+  auto fun_jvp = [](std::vector<array> primals, std::vector<array> tangents) {
+    return std::vector<array>{zeros_like(primals[0]) + tangents[0]};
+  };
+  std::tie(outs, jvps) =
+      jvp(custom_function(fun, fun_vjp, fun_jvp), {x, y}, {t, t});
+  CHECK(array_equal(jvps[0], t).item<bool>());
+
+  // Several outputs with a single vjp call for each output with a gradient
+  auto two_outputs = [](std::vector<array> inputs) {
+    return std::vector<array>{sin(inputs[0]), cos(inputs[0])};
+  };
+  auto two_outputs_vjp = [](std::vector<array> primals,
+                            std::vector<array> cotans,
+                            std::vector<array> outputs) {
+    return std::vector<array>{cotans[0] * array(2.0f) + cotans[1]};
+  };
+  auto [vals, vjps] =
+      vjp(custom_function(two_outputs, two_outputs_vjp), {x}, {ones({3}), t});
+  CHECK(allclose(vjps[0], full({3}, 3.0f)).item<bool>());
+
+  // Mismatching vjps throw
+  auto bad_vjp = [](std::vector<array> primals,
+                    std::vector<array> cotans,
+                    std::vector<array> outputs) {
+    return std::vector<array>{cotans[0]};
+  };
+  CHECK_THROWS_AS(
+      grad(
+          [&](std::vector<array> inputs) {
+            return sum(custom_function(fun, bad_vjp)(inputs)[0]);
+          },
+          {0, 1})({x, y}),
+      std::invalid_argument);
+
+  // Vectorizing vectorizes the function
+  auto vout = vmap(custom_fun)({reshape(x, {3, 1}), reshape(y, {3, 1})})[0];
+  CHECK(allclose(reshape(vout, {3}), exp(x) * y).item<bool>());
+}
+
+TEST_CASE("test jacobians") {
+  auto fun = [](std::vector<array> inputs) {
+    auto& x = inputs[0];
+    auto& w = inputs[1];
+    return std::vector<array>{sin(matmul(w, x)), sum(x)};
+  };
+  auto x = array({0.5f, -1.0f, 2.0f});
+  auto w = reshape(arange(6.0f), {2, 3}) * array(0.1f);
+  auto c = cos(matmul(w, x));
+
+  // The Jacobians of each output with respect to each input
+  std::vector<array> expected = {
+      reshape(c, {2, 1}) * w,
+      reshape(c, {2, 1, 1}) * reshape(eye(2), {2, 2, 1}) *
+          reshape(x, {1, 1, 3}),
+      ones({3}),
+      zeros({2, 3})};
+  for (auto jac_fun : {jacrev(fun, {0, 1}), jacfwd(fun, {0, 1})}) {
+    auto jacobians = jac_fun({x, w});
+    CHECK_EQ(jacobians.size(), 4);
+    for (int i = 0; i < 4; i++) {
+      CHECK_EQ(jacobians[i].shape(), expected[i].shape());
+      CHECK(allclose(jacobians[i], expected[i]).item<bool>());
+    }
+  }
+
+  // Negative and invalid argument numbers
+  auto jacobians = jacrev(fun, {-1})({x, w});
+  CHECK(allclose(jacobians[0], expected[1]).item<bool>());
+  CHECK_THROWS_AS(jacrev(fun, {2})({x, w}), std::invalid_argument);
+  CHECK_THROWS_AS(jacfwd(fun, {0, 0})({x, w}), std::invalid_argument);
+
+  // Unary functions
+  auto jac = jacrev([](array x) { return exp(x); })(x);
+  CHECK(allclose(jac, eye(3) * exp(x)).item<bool>());
+  jac = jacfwd([](array x) { return exp(x); })(x);
+  CHECK(allclose(jac, eye(3) * exp(x)).item<bool>());
+
+  // Hessians
+  auto hess = hessian([](array x) { return sum(x * x * x); })(x);
+  CHECK_EQ(hess.shape(), std::vector<int>{3, 3});
+  CHECK(allclose(hess, eye(3) * x * array(6.0f)).item<bool>());
+
+  auto hessians = hessian(
+      [](std::vector<array> inputs) {
+        return std::vector<array>{sum(inputs[0] * inputs[1])};
+      },
+      {0, 1})({x, x});
+  CHECK_EQ(hessians.size(), 4);
+  CHECK(allclose(hessians[0], zeros({3, 3})).item<bool>());
+  CHECK(allclose(hessians[1], eye(3)).item<bool>());
+}
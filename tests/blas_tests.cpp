@@ -108,3 +108,31 @@ TEST_CASE("test matmul") {
   out = matmul(transpose(a, {0, 2, 1}), transpose(b, {0, 2, 1}));
   CHECK(array_equal(out, full({2, 4, 4}, 2.0f)).item<bool>());
 }
+
+TEST_CASE("test matmul half precision and strided batches") {
+  auto a = random::normal({4, 1, 16, 32}, random::key(0));
+  auto b = random::normal({1, 3, 32, 8}, random::key(1));
+  auto expected = matmul(a, b);
+
+  for (auto t : {float16, bfloat16}) {
+    auto out = matmul(astype(a, t), astype(b, t));
+    CHECK_EQ(out.dtype(), t);
+    CHECK_EQ(out.shape(), std::vector<int>{4, 3, 16, 8});
+    CHECK(allclose(astype(out, float32), expected, 1e-1, 1e-1).item<bool>());
+  }
+
+  // Row and column slices are used in place
+  auto x = random::normal({16, 64}, random::key(2));
+  auto y = random::normal({64, 32}, random::key(3));
+  auto xs = slice(x, {0, 8}, {16, 40});
+  auto ys = slice(y, {8, 4}, {40, 12});
+  auto out = matmul(xs, ys);
+  expected = matmul(copy(xs), copy(ys));
+  CHECK(allclose(out, expected, 1e-5, 1e-5).item<bool>());
+  out = matmul(transpose(ys), transpose(xs));
+  CHECK(allclose(out, transpose(expected), 1e-5, 1e-5).item<bool>());
+
+  // Empty inner dimension
+  out = matmul(zeros({2, 3, 0}, float16), zeros({2, 0, 4}, float16));
+  CHECK(array_equal(out, zeros({2, 3, 4}, float16)).item<bool>());
+}
@@ -0,0 +1,56 @@
+// Copyright © 2023 Apple Inc.
+
+#include "doctest/doctest.h"
+
+#include "mlx/mlx.h"
+
+using namespace mlx::core;
+
+TEST_CASE("test simple compile") {
+  int n_calls = 0;
+  auto fun = [&n_calls](const std::vector<array>& inputs) {
+    n_calls++;
+    return std::vector<array>{inputs[0] + inputs[1]};
+  };
+  auto cfun = compile(fun);
+
+  auto out = cfun({array(1.0f), array(2.0f)})[0];
+  CHECK_EQ(out.item<float>(), 3.0f);
+  out = cfun({array(3.0f), array(2.0f)})[0];
+  CHECK_EQ(out.item<float>(), 5.0f);
+  CHECK_EQ(n_calls, 1);
+
+  // New shapes and dtypes are traced again
+  out = cfun({array({1.0f, 2.0f}), array({3.0f, 4.0f})})[0];
+  CHECK(array_equal(out, array({4.0f, 6.0f})).item<bool>());
+  out = cfun({array({1, 2}), array({3, 4})})[0];
+  CHECK_EQ(out.dtype(), int32);
+  CHECK(array_equal(out, array({4, 6})).item<bool>());
+  CHECK_EQ(n_calls, 3);
+}
+
+TEST_CASE("test compile elementwise fusion") {
+  auto s = default_stream(Device::cpu);
+  auto fun = [s](const std::vector<array>& inputs) {
+    auto& x = inputs[0];
+    auto& y = inputs[1];
+    auto z = exp(multiply(x, y, s), s);
+    return std::vector<array>{
+        subtract(multiply(z, sin(z, s), s), abs(x, s), s), z};
+  };
+  auto cfun = compile(fun);
+
+  auto x = random::uniform({16, 1000});
+  for (auto& y : {random::uniform({16, 1000}), array(2.0f)}) {
+    auto expected = fun({x, y});
+    auto out = cfun({x, y});
+    CHECK(allclose(out[0], expected[0]).item<bool>());
+    CHECK(allclose(out[1], expected[1]).item<bool>());
+  }
+
+  // Inputs that are not contiguous
+  auto y = transpose(random::uniform({1000, 16}));
+  auto expected = fun({x, y});
+  auto out = cfun({x, y});
+  CHECK(allclose(out[0], expected[0]).item<bool>());
+}
@@ -97,3 +97,215 @@ TEST_CASE("test eval graph retention") {
   CHECK(!a.has_primitive());
   CHECK(a.is_evaled());
 }
+
+TEST_CASE("test eval buffer donation") {
+  auto s = default_stream(Device::cpu);
+
+  // Intermediate results are computed in place
+  auto x = array({1.0f, 2.0f, 3.0f, 4.0f});
+  eval(x);
+  auto ptr = x.data<float>();
+  auto y = exp(x, s);
+  x = array(0.0f);
+  y = sqrt(multiply(log(y, s), array(4.0f), s), s);
+  eval(y);
+  CHECK_EQ(y.data<float>(), ptr);
+  CHECK(allclose(y, array({2.0f, 2.8284271f, 3.4641016f, 4.0f})).item<bool>());
+
+  // Arrays that are still referenced are not overwritten
+  x = array({1.0f, 2.0f, 3.0f, 4.0f});
+  y = exp(x, s);
+  eval(y);
+  CHECK_NE(y.data<float>(), x.data<float>());
+  CHECK(array_equal(x, array({1.0f, 2.0f, 3.0f, 4.0f})).item<bool>());
+
+  // Nor are the inputs of a retained graph
+  x = array({1.0f, 2.0f, 3.0f, 4.0f});
+  ptr = x.data<float>();
+  y = exp(x, s);
+  x = array(0.0f);
+  eval({y}, true);
+  CHECK_NE(y.data<float>(), ptr);
+}
+
+TEST_CASE("test async eval") {
+  auto x = ones({64, 64});
+  auto y = x;
+  for (int i = 0; i < 10; i++) {
+    y = exp(divide(matmul(y, x), array(64.0f)));
+  }
+  async_eval(y);
+
+  // Arrays which depend on pending arrays wait for them
+  auto z = sum(y);
+  auto w = add(y, array(1.0f));
+  async_eval(z);
+  eval(w);
+  CHECK(y.is_evaled());
+  CHECK(allclose(subtract(w, y), array(1.0f)).item<bool>());
+  CHECK_EQ(z.item<float>(), doctest::Approx(sum(y).item<float>()));
+
+  // Evaluating twice is a no-op
+  async_eval(y);
+  CHECK(y.is_evaled());
+}
+
+TEST_CASE("test concurrent eval") {
+  int max_concurrency = get_max_concurrency();
+  CHECK_THROWS_AS(set_max_concurrency(0), std::invalid_argument);
+
+  // Independent branches which share inputs and join at the end
+  auto x = reshape(astype(arange(4096, Device::cpu), float32), {64, 64});
+  auto w = ones({64, 64});
+  auto run = [&]() {
+    std::vector<array> branches;
+    for (int i = 0; i < 8; i++) {
+      auto y = matmul(x, multiply(w, array(i + 1.0f)), Device::cpu);
+      branches.push_back(exp(multiply(y, array(1e-6f)), Device::cpu));
+    }
+    auto out = branches[0];
+    for (int i = 1; i < branches.size(); i++) {
+      out = add(out, branches[i], Device::cpu);
+    }
+    branches.push_back(out);
+    return branches;
+  };
+
+  set_max_concurrency(1);
+  CHECK_EQ(get_max_concurrency(), 1);
+  auto expected = run();
+  eval(expected);
+
+  set_max_concurrency(4);
+  CHECK_EQ(get_max_concurrency(), 4);
+  for (int k = 0; k < 10; k++) {
+    auto out = run();
+    eval(out);
+    for (int i = 0; i < out.size(); i++) {
+      CHECK(array_equal(out[i], expected[i]).item<bool>());
+    }
+  }
+
+  set_max_concurrency(max_concurrency);
+}
+
+TEST_CASE("test stream affinity") {
+  int n_nodes = get_num_numa_nodes();
+  CHECK(n_nodes >= 1);
+  for (int node = 0; node < n_nodes; node++) {
+    CHECK_FALSE(get_numa_node_cpus(node).empty());
+  }
+  CHECK_THROWS_AS(get_numa_node_cpus(-1), std::invalid_argument);
+  CHECK_THROWS_AS(get_numa_node_cpus(n_nodes), std::invalid_argument);
+  CHECK_THROWS_AS(
+      set_stream_affinity(Stream(0, Device::gpu), {0}), std::invalid_argument);
+
+#ifdef __linux__
+  auto s = new_stream(Device::cpu);
+  CHECK_THROWS_AS(set_stream_affinity(s, {-1}), std::invalid_argument);
+
+  auto cpus = get_numa_node_cpus(0);
+  set_stream_affinity(s, cpus);
+  set_thread_pool_affinity(cpus);
+  auto x = astype(arange(10000, s), float32, s);
+  auto y = sum(multiply(x, x, s), s);
+  CHECK_EQ(y.item<float>(), doctest::Approx(3.33283335e11f));
+
+  // Let the threads run anywhere again
+  set_stream_affinity(s, {});
+  set_thread_pool_affinity({});
+  CHECK(array_equal(sum(multiply(x, x, s), s), y).item<bool>());
+#endif
+}
+
+TEST_CASE("test eval deep graph") {
+  // Deep enough to overflow the stack with a recursive traversal
+  int depth = 200000;
+  auto x = array(1.0f);
+  auto y = x;
+  for (int i = 0; i < depth; i++) {
+    y = add(y, x);
+  }
+  simplify(y);
+  eval(y);
+  CHECK_EQ(y.item<float>(), depth + 1.0f);
+
+  auto fn = [depth](array x) {
+    auto y = x;
+    for (int i = 0; i < depth; i++) {
+      y = multiply(y, array(1.0f));
+    }
+    return y;
+  };
+  auto dfdx = grad(fn)(array(2.0f));
+  CHECK_EQ(dfdx.item<float>(), 1.0f);
+
+  // Dropping an unevaluated deep graph does not recurse either
+  {
+    auto z = x;
+    for (int i = 0; i < depth; i++) {
+      z = add(z, x);
+    }
+  }
+}
+
+TEST_CASE("test memory efficient eval") {
+  CHECK_FALSE(get_memory_efficient_eval());
+
+  // Each array of a chain is freed once the next one is computed
+  auto x = ones({1000});
+  eval(x);
+  CHECK_EQ(estimate_peak_memory({exp(exp(exp(x)))}), 2 * 1000 * 4);
+  CHECK_EQ(estimate_peak_memory({x}), 0);
+
+  // In depth-first order p is computed first and stays alive while q and
+  // its intermediates are computed
+  auto make = [](const array& x, const array& y) {
+    auto p = exp(x);
+    auto e = exp(exp(y));
+    auto q = reshape(concatenate({e, e}, 0), {2000, 1});
+    return matmul(p, q);
+  };
+  auto a = ones({1, 2000});
+  auto b = ones({1000});
+  eval(a, b);
+  auto expected = make(a, b);
+  size_t depth_first_peak = estimate_peak_memory({expected});
+  eval(expected);
+
+  set_memory_efficient_eval(true);
+  CHECK(get_memory_efficient_eval());
+  auto out = make(a, b);
+  CHECK_LT(estimate_peak_memory({out}), depth_first_peak);
+  eval(out);
+  CHECK(allclose(out, expected).item<bool>());
+  set_memory_efficient_eval(false);
+}
+
+TEST_CASE("test max pending depth") {
+  CHECK_THROWS(set_max_pending_depth(-1));
+  set_max_pending_depth(10);
+  CHECK_EQ(get_max_pending_depth(), 10);
+  auto count = get_auto_eval_count();
+
+  // The loop is evaluated every 10 arrays
+  auto x = zeros({4});
+  for (int i = 0; i < 100; i++) {
+    x = x + 1.0f;
+  }
+  CHECK_GE(get_auto_eval_count() - count, 9);
+  CHECK(array_equal(x, full({4}, 100.0f)).item<bool>());
+
+  // Tracers are not evaluated
+  count = get_auto_eval_count();
+  auto fun = [](array x) {
+    for (int i = 0; i < 100; i++) {
+      x = sin(x);
+    }
+    return x;
+  };
+  auto [y, dy] = vjp(fun, array(1.0f), array(1.0f));
+  CHECK_EQ(get_auto_eval_count(), count);
+  set_max_pending_depth(0);
+  CHECK(allclose(y, fun(array(1.0f))).item<bool>());
+}
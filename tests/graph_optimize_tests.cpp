@@ -23,6 +23,25 @@ TEST_CASE("test simplify") {
   CHECK(b.inputs()[0].id() == b.inputs()[1].id());
 }
 
+TEST_CASE("test simplify multiple levels") {
+  auto a = array({1.0f, 2.0f});
+  auto b = exp(sin(a) * 2.0f) + exp(sin(a) * 2.0f);
+  simplify(b);
+  CHECK(b.inputs()[0].id() == b.inputs()[1].id());
+
+  // Many consumers of the same array
+  std::vector<array> outs;
+  for (int i = 0; i < 100; i++) {
+    outs.push_back(exp(reshape(a, {1, 2})) + array(float(i % 10)));
+  }
+  auto c = concatenate(outs);
+  simplify(c);
+  for (int i = 0; i < 100; i++) {
+    CHECK(c.inputs()[i].id() == c.inputs()[i % 10].id());
+  }
+  CHECK(array_equal(c, concatenate(outs)).item<bool>());
+}
+
 TEST_CASE("test no simplify") {
   auto a = array({1.0f, 2.0f});
   auto b = cos(a) + sin(a);
@@ -30,3 +49,87 @@ TEST_CASE("test no simplify") {
   eval(b);
   CHECK(b.inputs()[0].id() != b.inputs()[1].id());
 }
+
+TEST_CASE("test optimize peephole") {
+  // Large enough not to be folded
+  auto x = reshape(arange(120.0f), {10, 12});
+
+  // Transposes which cancel and multiplications by one
+  auto y = transpose(transpose(x)) * array(1.0f);
+  auto z = exp(y);
+  auto removed = optimize({z});
+  CHECK_EQ(removed[1].first, "peephole");
+  CHECK(removed[1].second > 0);
+  CHECK_EQ(z.inputs()[0].id(), x.id());
+  CHECK(allclose(z, exp(x)).item<bool>());
+
+  // Casts through a wider type
+  auto h = astype(x, float16);
+  auto c = exp(astype(astype(h, float32), float16));
+  optimize({c});
+  CHECK_EQ(c.inputs()[0].id(), h.id());
+
+  // Broadcasts which are reduced right away
+  auto b = exp(sum(broadcast_to(x, {4, 10, 12}), 0));
+  optimize({b});
+  CHECK(allclose(b, exp(4 * x)).item<bool>());
+  b = exp(max(broadcast_to(reshape(x, {10, 1, 12}), {10, 5, 12}), 1));
+  optimize({b});
+  CHECK(allclose(b, exp(x)).item<bool>());
+  b = exp(sum(broadcast_to(x, {4, 10, 12}), 2));
+  optimize({b});
+  CHECK(allclose(b, exp(broadcast_to(sum(x, 1), {4, 10}))).item<bool>());
+}
+
+TEST_CASE("test optimize constants") {
+  auto x = full({10, 10}, 2.0f);
+  eval(x);
+
+  // Small arrays computed from evaluated arrays are folded
+  auto one = exp(array(0.0f));
+  auto y = exp(x * one);
+  optimize({y});
+  CHECK(one.is_evaled());
+  CHECK_EQ(y.inputs()[0].id(), x.id());
+
+  // The graphs of evaluated arrays are released
+  auto a = exp(x);
+  auto b = sin(a);
+  eval({a}, true);
+  auto removed = optimize({b});
+  CHECK_FALSE(a.has_primitive());
+  CHECK_EQ(removed.back().first, "dead_node_elimination");
+  CHECK_EQ(removed.back().second, 1);
+
+  // Level 2 also runs simplify
+  auto c = exp(x) + exp(x);
+  optimize({c}, 2);
+  CHECK_EQ(c.inputs()[0].id(), c.inputs()[1].id());
+
+  // The passes run on eval when enabled
+  set_optimization_level(1);
+  auto d = exp(transpose(transpose(x * array(1.0f))));
+  eval(d);
+  set_optimization_level(0);
+  CHECK(array_equal(d, exp(x)).item<bool>());
+}
+
+TEST_CASE("test optimize keeps gradients") {
+  auto fun = [](array x) {
+    auto y = transpose(transpose(x)) * array(1.0f);
+    auto z = sum(y * y);
+    optimize({z});
+    return z;
+  };
+  auto x = reshape(arange(4.0f), {2, 2});
+  auto g = grad(fun)(x);
+  CHECK(allclose(g, 2 * x).item<bool>());
+
+  // Tracers are not taken as constants
+  auto scale = [](array s) {
+    auto y = sum(array({1.0f, 2.0f}) * s);
+    optimize({y});
+    return y;
+  };
+  CHECK_EQ(grad(scale)(array(1.0f)).item<float>(), 3.0f);
+}
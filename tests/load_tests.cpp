@@ -2,6 +2,7 @@
 
 #include <filesystem>
 #include <stdexcept>
+#include <thread>
 #include <vector>
 
 #include "doctest/doctest.h"
@@ -101,3 +102,80 @@ TEST_CASE("test single array serialization") {
     CHECK(array_equal(a, b).item<bool>());
   }
 }
+
+TEST_CASE("test memory mapped loading") {
+  std::string file_path = get_temp_file("test_mapped_arr.npy");
+  auto a = random::uniform(-5.f, 5.f, {64, 32}, float32);
+  save(file_path, a);
+
+  auto reader = std::make_shared<io::MappedFileReader>(file_path);
+  CHECK(reader->is_open());
+  CHECK_EQ(
+      reader->mapped_file()->size(), std::filesystem::file_size(file_path));
+
+  auto b = load(reader);
+  reader.reset();
+  eval(b);
+  CHECK(array_equal(a, b).item<bool>());
+
+  // The loaded array keeps the mapping alive after the file is removed
+  std::filesystem::remove(file_path);
+  auto c = add(b, array(1.0f));
+  CHECK(array_equal(c, add(a, array(1.0f))).item<bool>());
+
+  // Reading past the end of the file is an error
+  file_path = get_temp_file("test_mapped_short.bin");
+  {
+    std::ofstream f(file_path, std::ios::binary);
+    f << "abc";
+  }
+  io::MappedFileReader short_reader(file_path);
+  char buf[8];
+  short_reader.read(buf, 3);
+  CHECK(short_reader.good());
+  short_reader.read(buf, 1);
+  CHECK_FALSE(short_reader.good());
+  std::filesystem::remove(file_path);
+
+  CHECK_FALSE(io::MappedFileReader(get_temp_file("does_not_exist")).is_open());
+}
+
+TEST_CASE("test concurrent positional reads") {
+  std::string file_path = get_temp_file("test_positional_arr.safetensors");
+  auto map = std::unordered_map<std::string, array>();
+  // Large enough to be read in several chunks
+  map.insert({"a", random::uniform({1 << 21}, random::key(0))});
+  map.insert({"b", arange(1000)});
+  map.insert({"c", random::uniform({1 << 20}, random::key(1))});
+  save_safetensors(file_path, map);
+
+  // Loads sharing one reader evaluated on different streams
+  auto loaded = load_safetensors(std::make_shared<io::FileReader>(file_path));
+  auto s2 = new_stream(default_device());
+  auto a = add(loaded.at("a"), array(0.0f));
+  auto c = add(loaded.at("c"), array(0.0f), s2);
+  auto b = loaded.at("b");
+  eval({a, b, c});
+  CHECK(array_equal(a, map.at("a")).item<bool>());
+  CHECK(array_equal(b, map.at("b")).item<bool>());
+  CHECK(array_equal(c, map.at("c")).item<bool>());
+
+  // Positional reads do not move the position of the reader
+  io::FileReader reader(file_path);
+  char header[8];
+  reader.read(header, 8);
+  std::vector<std::thread> threads;
+  std::vector<std::vector<char>> results(4, std::vector<char>(8));
+  for (int i = 0; i < 4; i++) {
+    threads.emplace_back([&, i]() { reader.read(results[i].data(), 8, 0); });
+  }
+  for (auto& t : threads) {
+    t.join();
+  }
+  for (auto& r : results) {
+    CHECK(std::equal(r.begin(), r.end(), header));
+  }
+  CHECK_EQ(reader.tell(), 8);
+
+  std::filesystem::remove(file_path);
+}
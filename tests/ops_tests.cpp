@@ -23,6 +23,48 @@ TEST_CASE("test copy") {
   CHECK(array_equal(y, x).item<bool>());
 }
 
+TEST_CASE("test strided copy") {
+  // Transposes large enough to be copied in tiles
+  int n = 67;
+  auto x = reshape(arange(3 * n * n), {3, n, n});
+  std::vector<int> expected;
+  for (int b = 0; b < 3; b++) {
+    for (int i = 0; i < n; i++) {
+      for (int j = 0; j < n; j++) {
+        expected.push_back(b * n * n + j * n + i);
+      }
+    }
+  }
+  auto y = reshape(transpose(x, {0, 2, 1}), {-1});
+  CHECK(array_equal(y, array(expected.begin(), {3 * n * n})).item<bool>());
+  y = reshape(astype(transpose(x, {0, 2, 1}), float32), {-1});
+  CHECK(array_equal(y, array(expected.begin(), {3 * n * n})).item<bool>());
+
+  // Dims which collapse with their neighbours and dims of size 1
+  x = reshape(arange(2 * 3 * 4 * 5), {2, 1, 3, 4, 5});
+  expected.clear();
+  for (int i = 0; i < 2; i++) {
+    for (int l = 0; l < 5; l++) {
+      for (int j = 0; j < 3; j++) {
+        for (int k = 0; k < 4; k++) {
+          expected.push_back(((i * 3 + j) * 4 + k) * 5 + l);
+        }
+      }
+    }
+  }
+  y = reshape(transpose(x, {0, 1, 4, 2, 3}), {-1});
+  CHECK(array_equal(y, array(expected.begin(), {120})).item<bool>());
+
+  // Broadcasted inputs
+  x = broadcast_to(reshape(arange(5), {5, 1}), {5, 40});
+  y = astype(x, float32);
+  expected.clear();
+  for (int i = 0; i < 5; i++) {
+    expected.insert(expected.end(), 40, i);
+  }
+  CHECK(array_equal(y, array(expected.begin(), {5, 40})).item<bool>());
+}
+
 TEST_CASE("test reshape") {
   array x(1.0);
   CHECK_EQ(reshape(x, {}).shape(), std::vector<int>{});
@@ -2277,4 +2319,77 @@ TEST_CASE("test repeat") {
 
   // negative repeats
   CHECK_THROWS_AS(repeat(data_3, -3, 0), std::invalid_argument);
-}
\ No newline at end of file
+}
+
+TEST_CASE("test multithreaded elementwise") {
+  int n_threads = get_num_threads();
+  CHECK_THROWS_AS(set_num_threads(0), std::invalid_argument);
+
+  auto x = reshape(astype(arange(1 << 20), float32), {1024, 1024});
+  auto y = transpose(x);
+  auto z = ones({1024, 1});
+  auto run = [&]() {
+    return std::vector<array>{
+        exp(multiply(x, array(1e-7f))),
+        add(x, y),
+        subtract(y, z),
+        maximum(x, array(1000.0f)),
+        negative(y),
+    };
+  };
+
+  set_num_threads(1);
+  CHECK_EQ(get_num_threads(), 1);
+  auto expected = run();
+  eval(expected);
+
+  set_num_threads(4);
+  CHECK_EQ(get_num_threads(), 4);
+  auto out = run();
+  eval(out);
+  for (int i = 0; i < out.size(); i++) {
+    CHECK(array_equal(out[i], expected[i]).item<bool>());
+  }
+
+  set_num_threads(n_threads);
+}
+
+TEST_CASE("test multithreaded reductions") {
+  int n_threads = get_num_threads();
+
+  auto x = reshape(
+      astype(random::uniform({1 << 20}, random::key(0)), float32), {512, 2048});
+  auto xt = transpose(x);
+  auto i = reshape(arange(1 << 20), {16, 256, 256});
+  auto run = [&]() {
+    return std::vector<array>{
+        sum(x),
+        sum(x, 1),
+        sum(x, 0),
+        sum(xt, 1),
+        max(x, 0),
+        min(xt),
+        sum(i, {0, 2}),
+        prod(astype(less(x, array(0.9f)), int32), 0),
+    };
+  };
+
+  set_num_threads(1);
+  auto expected = run();
+  eval(expected);
+
+  // Reductions accumulate in fixed blocks so the results do not depend on the
+  // number of threads
+  set_num_threads(4);
+  auto out = run();
+  eval(out);
+  for (int j = 0; j < out.size(); j++) {
+    CHECK(array_equal(out[j], expected[j]).item<bool>());
+  }
+
+  // Blocked pairwise summation stays accurate for large sums
+  auto ones_sum = sum(ones({1 << 24}));
+  CHECK_EQ(ones_sum.item<float>(), float(1 << 24));
+
+  set_num_threads(n_threads);
+}
@@ -0,0 +1,55 @@
+// Copyright © 2023 Apple Inc.
+
+#include <sstream>
+
+#include "doctest/doctest.h"
+
+#include "mlx/mlx.h"
+
+using namespace mlx::core;
+
+TEST_CASE("test profiler") {
+  auto x = ones({16, 32}, float32, Device::cpu);
+  auto w = ones({32, 8}, float32, Device::cpu);
+  eval(x, w);
+
+  // Nothing is recorded while the profiler is disabled
+  CHECK_FALSE(profiler::is_enabled());
+  eval(add(x, x, Device::cpu));
+  profiler::start();
+  CHECK(profiler::is_enabled());
+  CHECK(profiler::events().empty());
+
+  auto y = exp(matmul(x, w, Device::cpu), Device::cpu);
+  eval(y);
+  profiler::stop();
+  eval(add(y, y, Device::cpu));
+
+  auto events = profiler::events();
+  REQUIRE_EQ(events.size(), 2);
+  CHECK_EQ(events[0].name, "Matmul");
+  CHECK_EQ(events[0].stream, default_stream(Device::cpu));
+  CHECK_EQ(
+      events[0].input_shapes,
+      std::vector<std::vector<int>>({{16, 32}, {32, 8}}));
+  CHECK_EQ(events[0].output_shape, std::vector<int>({16, 8}));
+  CHECK_EQ(events[0].bytes_allocated, 16 * 8 * 4);
+  CHECK_EQ(events[1].name, "Exp");
+  for (auto& e : events) {
+    CHECK_LE(e.enqueue_time, e.start_time);
+    CHECK_LE(e.start_time, e.end_time);
+  }
+  // The exp is computed in place of the output of the matmul
+  CHECK_EQ(events[1].bytes_allocated, 0);
+  CHECK_LE(events[0].end_time, events[1].start_time);
+
+  std::ostringstream trace;
+  profiler::export_chrome_trace(trace, events);
+  CHECK_NE(trace.str().find("\"name\": \"Matmul\""), std::string::npos);
+  CHECK_NE(trace.str().find("\"ph\": \"X\""), std::string::npos);
+
+  std::ostringstream summary;
+  profiler::print_summary(summary, events);
+  CHECK_NE(summary.str().find("Matmul"), std::string::npos);
+  CHECK_NE(summary.str().find("Exp"), std::string::npos);
+}
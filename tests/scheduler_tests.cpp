@@ -1,5 +1,7 @@
 // Copyright © 2023 Apple Inc.
 
+#include <numeric>
+
 #include "doctest/doctest.h"
 
 #include "mlx/mlx.h"
@@ -119,3 +121,32 @@ TEST_CASE("test scheduler races") {
   }
   eval(a, y);
 }
+
+TEST_CASE("test batched launch") {
+  auto s = new_stream(Device::cpu);
+
+  // The tasks of a batch run in order after the tasks enqueued before it
+  std::vector<int> order;
+  scheduler::enqueue(s, [&order]() { order.push_back(0); });
+  std::vector<std::function<void()>> tasks;
+  for (int i = 1; i < 100; i++) {
+    tasks.push_back([&order, i]() { order.push_back(i); });
+  }
+  scheduler::enqueue_batch(s, std::move(tasks));
+  scheduler::enqueue_batch(s, {});
+  auto p = std::make_shared<std::promise<void>>();
+  auto f = p->get_future();
+  scheduler::enqueue(s, [p]() { p->set_value(); });
+  f.wait();
+
+  std::vector<int> expected(100);
+  std::iota(expected.begin(), expected.end(), 0);
+  CHECK_EQ(order, expected);
+
+  // The active tasks are counted without locking
+  int n = scheduler::n_active_tasks();
+  scheduler::notify_new_task(s);
+  CHECK_EQ(scheduler::n_active_tasks(), n + 1);
+  scheduler::notify_task_completion(s);
+  CHECK_EQ(scheduler::n_active_tasks(), n);
+}
@@ -349,3 +349,109 @@ TEST_CASE("test vmap gather") {
     CHECK_EQ(out.shape(), std::vector<int>{2, 3, 2, 2});
   }
 }
+
+TEST_CASE("test vmap matmul") {
+  auto a = reshape(arange(24.0f), {4, 2, 3});
+  auto b = reshape(arange(60.0f), {4, 3, 5});
+  auto fun = [](const array& x, const array& y) { return matmul(x, y); };
+
+  // Both batched
+  auto out = vmap(fun)(a, b);
+  CHECK(array_equal(out, matmul(a, b)).item<bool>());
+
+  // Batched on a different axis
+  out = vmap(fun, 1, 0)(transpose(a, {1, 0, 2}), b);
+  CHECK(array_equal(out, matmul(a, b)).item<bool>());
+
+  // Unbatched left operand
+  auto a0 = slice(a, {0, 0, 0}, {1, 2, 3});
+  out = vmap(fun, -1, 0)(reshape(a0, {2, 3}), b);
+  CHECK(array_equal(out, matmul(a0, b)).item<bool>());
+  out = vmap(fun, -1, 2)(reshape(a0, {2, 3}), transpose(b, {1, 2, 0}));
+  CHECK(array_equal(out, matmul(a0, b)).item<bool>());
+
+  // Unbatched right operand
+  auto b0 = slice(b, {0, 0, 0}, {1, 3, 5});
+  out = vmap(fun, 0, -1)(a, reshape(b0, {3, 5}));
+  CHECK(array_equal(out, matmul(a, b0)).item<bool>());
+}
+
+TEST_CASE("test vmap reductions") {
+  auto x = reshape(arange(24.0f), {2, 3, 4});
+  auto out = vmap([](array x) { return sum(x, 0); }, 1)(x);
+  CHECK(array_equal(out, sum(x, 0)).item<bool>());
+  out = vmap([](array x) { return max(x, 1); }, 0)(x);
+  CHECK(array_equal(out, max(x, 2)).item<bool>());
+  out = vmap([](array x) { return argmax(x, 0); }, 2)(x);
+  CHECK(array_equal(out, transpose(argmax(x, 0))).item<bool>());
+  out = vmap([](array x) { return argmin(x); }, 1)(x);
+  CHECK(array_equal(out, zeros({3}, uint32)).item<bool>());
+}
+
+TEST_CASE("test vmap scatter") {
+  auto fun = [](std::vector<array> inputs) {
+    auto out = scatter_add(inputs[0], inputs[1], inputs[2], 0);
+    return std::vector<array>{out};
+  };
+  auto src = zeros({3, 2});
+  auto indices = array({0, 2, 0, 1, 1, 1}, {2, 3});
+  auto updates = ones({2, 3, 1, 2});
+
+  // Batched indices and updates
+  auto out = vmap(fun, {-1, 0, 0})({src, indices, updates})[0];
+  auto expected = array(
+      {2.0f, 2.0f, 0.0f, 0.0f, 1.0f, 1.0f, 0.0f, 0.0f, 3.0f, 3.0f, 0.0f, 0.0f},
+      {2, 3, 2});
+  CHECK(array_equal(out, expected).item<bool>());
+
+  // Batched source only
+  src = zeros({4, 2, 3});
+  indices = array({1, 1});
+  updates = ones({2, 1, 3});
+  out = vmap(fun, {0, -1, -1})({src, indices, updates})[0];
+  expected = broadcast_to(array({0.0f, 2.0f}, {2, 1}), {4, 2, 3});
+  CHECK(array_equal(out, expected).item<bool>());
+}
+
+TEST_CASE("test vmap convolution") {
+  auto x = reshape(arange(48.0f), {2, 1, 8, 3});
+  auto w = reshape(arange(36.0f), {2, 2, 3, 3});
+  auto fun = [](const array& x, const array& w) { return conv1d(x, w); };
+  auto looped = [&](int ax_x, int ax_w) {
+    std::vector<array> outs;
+    for (int i = 0; i < 2; i++) {
+      int j = ax_x < 0 ? 0 : i;
+      int k = ax_w < 0 ? 0 : i;
+      auto xi = reshape(slice(x, {j, 0, 0, 0}, {j + 1, 1, 8, 3}), {1, 8, 3});
+      auto wi = reshape(slice(w, {k, 0, 0, 0}, {k + 1, 2, 3, 3}), {2, 3, 3});
+      outs.push_back(conv1d(xi, wi));
+    }
+    return stack(outs);
+  };
+
+  auto x0 = reshape(slice(x, {0, 0, 0, 0}, {1, 1, 8, 3}), {1, 8, 3});
+  auto w0 = reshape(slice(w, {0, 0, 0, 0}, {1, 2, 3, 3}), {2, 3, 3});
+  auto out = vmap(fun, 0, -1)(x, w0);
+  CHECK(allclose(out, looped(0, -1)).item<bool>());
+  out = vmap(fun, -1, 0)(x0, w);
+  CHECK(allclose(out, looped(-1, 0)).item<bool>());
+  out = vmap(fun, 0, 0)(x, w);
+  CHECK(allclose(out, looped(0, 0)).item<bool>());
+}
+
+TEST_CASE("test vmap pad and partition") {
+  auto x = reshape(arange(6.0f), {2, 3});
+  auto fun = [](const array& x, const array& v) { return pad(x, 1, v); };
+  auto out = vmap(fun, 0, 0)(x, array({-1.0f, -2.0f}));
+  auto expected = array(
+      {-1.0f, 0.0f, 1.0f, 2.0f, -1.0f, -2.0f, 3.0f, 4.0f, 5.0f, -2.0f}, {2, 5});
+  CHECK(array_equal(out, expected).item<bool>());
+  out = vmap(fun, 0, -1)(x, array(-1.0f));
+  CHECK(array_equal(out, pad(x, {{0, 0}, {1, 1}}, array(-1.0f))).item<bool>());
+
+  x = array({3, 1, 2, 6, 5, 4}, {2, 3});
+  out = vmap([](array x) { return partition(x, 1); }, 0)(x);
+  CHECK(array_equal(out, partition(x, 1, 1)).item<bool>());
+  out = vmap([](array x) { return partition(x, 1); }, 1)(transpose(x));
+  CHECK(array_equal(out, partition(x, 1, 1)).item<bool>());
+}